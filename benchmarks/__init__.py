@@ -0,0 +1,16 @@
+"""
+benchmarks
+----------
+Performance benchmarks for the review agents.
+
+- `corpus` generates synthetic Python modules of a chosen size, with
+  controllable densities of the patterns the agents look for.
+- `run` times the runners, every individual rule and the full
+  orchestrator (with a stubbed LLM) on those modules, writes the results
+  as JSON and compares them against a stored baseline.
+
+Usage:
+    python -m benchmarks.run --lines 1000 --lines 100000 -o results.json
+    python -m benchmarks.run --lines 10000 --save-baseline
+    python -m benchmarks.run --lines 10000 --baseline benchmarks/baseline.json --threshold 0.25
+"""
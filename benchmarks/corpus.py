@@ -0,0 +1,177 @@
+"""
+Benchmarks — Synthetic Corpus
+-----------------------------
+Generates valid Python modules of a requested size for benchmarking.
+
+The bulk of a module is plain, finding-free helper functions. Pattern
+blocks are mixed in at the densities of a `CorpusSpec`, each given as
+occurrences per 1,000 lines:
+
+- `eval`        — `eval()` on a parameter (SEC001)
+- `sql`         — a concatenated query passed to `cursor.execute` (SEC005)
+- `taint`       — `request.args` flowing into `os.system` (taint rules)
+- `long_line`   — a constant longer than the 100-character limit (S100)
+- `deep_nesting`— `nesting_depth` nested `if`/`for` blocks (complexity)
+
+Generation is seeded, so the same spec always yields the same code.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List
+
+HEADER = '''"""Synthetic benchmark module."""
+
+import os
+import subprocess
+
+'''
+
+# CPython refuses more than 20 statically nested loops/try blocks, so
+# only every fourth nesting level is a `for`; the rest are `if`s.
+MAX_NESTING_DEPTH = 60
+
+
+@dataclass
+class CorpusSpec:
+    """
+    Size and pattern mix of a synthetic corpus.
+
+    Densities are occurrences per 1,000 lines; `files` splits the total
+    `lines` evenly over that many modules.
+    """
+
+    lines: int = 10_000
+    eval_density: float = 2.0
+    sql_density: float = 2.0
+    taint_density: float = 2.0
+    long_line_density: float = 5.0
+    deep_nesting_density: float = 1.0
+    nesting_depth: int = 12
+    files: int = 1
+    seed: int = 0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+# ------------------------------------
+# Block templates
+# ------------------------------------
+def _plain(i: int, rng: random.Random) -> str:
+    return (
+        f"def helper_{i}(values, scale={rng.randint(1, 9)}):\n"
+        f"    total = 0\n"
+        f"    for value in values:\n"
+        f"        total += value * scale\n"
+        f"    return total\n\n\n"
+    )
+
+
+def _eval(i: int, rng: random.Random) -> str:
+    return (
+        f"def evaluate_{i}(expression):\n"
+        f"    result = eval(expression)\n"
+        f"    return result\n\n\n"
+    )
+
+
+def _sql(i: int, rng: random.Random) -> str:
+    return (
+        f"def find_user_{i}(cursor, name):\n"
+        f"    cursor.execute(\"SELECT * FROM users WHERE name = '\" + name + \"'\")\n"
+        f"    return cursor.fetchall()\n\n\n"
+    )
+
+
+def _taint(i: int, rng: random.Random) -> str:
+    return (
+        f"def handle_{i}(request):\n"
+        f"    command = request.args.get(\"cmd\")\n"
+        f"    os.system(command)\n\n\n"
+    )
+
+
+def _long_line(i: int, rng: random.Random) -> str:
+    words = " ".join(rng.choice(("alpha", "beta", "gamma", "delta")) for _ in range(24))
+    return f'MESSAGE_{i} = "{words}"\n\n\n'
+
+
+def _deep_nesting(depth: int):
+    depth = max(1, min(depth, MAX_NESTING_DEPTH))
+
+    def block(i: int, rng: random.Random) -> str:
+        lines = [f"def nested_{i}(data):"]
+        for level in range(depth):
+            indent = "    " * (level + 1)
+            if level % 4 == 3:
+                lines.append(f"{indent}for item_{level} in data:")
+            else:
+                lines.append(f"{indent}if data and len(data) > {level}:")
+        lines.append("    " * (depth + 1) + "return data")
+        lines.append("    return None")
+        return "\n".join(lines) + "\n\n\n"
+
+    return block
+
+
+def _line_count(block: str) -> int:
+    return block.count("\n")
+
+
+# ------------------------------------
+# Generation
+# ------------------------------------
+def generate_module(spec: CorpusSpec, index: int = 0) -> str:
+    """
+    One module of about `spec.lines / spec.files` lines (it stops at the
+    first block that reaches the target, so it may overshoot by a few).
+    """
+    rng = random.Random(f"{spec.seed}:{index}")
+    target = max(spec.lines // max(spec.files, 1), 1)
+
+    makers = {
+        "eval": (_eval, spec.eval_density),
+        "sql": (_sql, spec.sql_density),
+        "taint": (_taint, spec.taint_density),
+        "long_line": (_long_line, spec.long_line_density),
+        "deep_nesting": (_deep_nesting(spec.nesting_depth), spec.deep_nesting_density),
+    }
+
+    # 1️⃣ The pattern blocks this module's density asks for
+    blocks: List[str] = []
+    for make, density in makers.values():
+        count = round(density * target / 1000)
+        blocks += [make(len(blocks), rng) for _ in range(count)]
+
+    # 2️⃣ Plain helpers fill the remaining lines
+    used = _line_count(HEADER) + sum(_line_count(b) for b in blocks)
+    while used < target:
+        block = _plain(len(blocks), rng)
+        blocks.append(block)
+        used += _line_count(block)
+
+    # 3️⃣ Spread the patterns over the whole module
+    rng.shuffle(blocks)
+    return HEADER + "".join(blocks)
+
+
+def generate_corpus(spec: CorpusSpec) -> Dict[str, str]:
+    """All modules of a corpus, as {relative path: code}."""
+    return {
+        f"module_{i:04d}.py": generate_module(spec, i)
+        for i in range(max(spec.files, 1))
+    }
+
+
+def write_corpus(spec: CorpusSpec, root: str) -> List[Path]:
+    """Write the corpus under `root` and return the written paths."""
+    base = Path(root)
+    base.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, code in generate_corpus(spec).items():
+        path = base / name
+        path.write_text(code, encoding="utf-8")
+        paths.append(path)
+    return paths
@@ -0,0 +1,329 @@
+"""
+Benchmarks — Runner
+-------------------
+Times the review agents on synthetic corpora and guards against
+performance regressions.
+
+For every corpus size it measures:
+
+- `parse`               — building the shared SourceDocument views
+- `static.<rule>`       — each static rule alone, on a pre-parsed document
+- `security.<scanner>`  — each security scanner alone, likewise
+- `run_static` / `run_security` — the agent runners, parsing included
+- `run_static.warm`     — `run_static` again, with the metrics memo warm
+- `orchestrator`        — `review_file` end to end, with the LLM stubbed out
+
+Each benchmark runs `repeat` times; the median and the minimum are
+recorded. Every run starts cold: rules get freshly parsed documents,
+so each one pays for its own function metrics and symbol table instead
+of reading those cached by the rule before it, and the metrics memo is
+cleared, except in the `.warm` benchmark. Results are written as JSON and can be compared against a
+stored baseline: a benchmark whose median grew by more than `threshold`
+is a regression, and the run exits with status 1.
+
+Usage:
+    python -m benchmarks.run --lines 1000 --lines 100000 -o results.json
+    python -m benchmarks.run --lines 10000 --save-baseline
+    python -m benchmarks.run --lines 10000 --baseline benchmarks/baseline.json
+"""
+
+import io
+import json
+import platform
+import statistics
+import time
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from reviewer_core import __version__, orchestrator
+from reviewer_core.security.patterns import pattern_scan, regex_scan
+from reviewer_core.security.runner import run_security
+from reviewer_core.security.taint import taint_scan
+from reviewer_core.source import SourceDocument
+from reviewer_core.static_analysis import complexity, metrics, registry, style_rules
+from reviewer_core.static_analysis.registry import dispatcher
+from reviewer_core.static_analysis.runner import run_static
+
+from .corpus import CorpusSpec, generate_corpus
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.20
+# Medians below this are dominated by timer noise and never regress
+NOISE_FLOOR_SECONDS = 0.001
+
+# Every individual rule, by benchmark name (registered style rules run
+# through their own single-rule dispatcher)
+RULES: Dict[str, Callable] = {
+    **{f"static.{rule.name}": dispatcher([rule.rule_id]).run for rule in registry.RULES.values()},
+    "static.check_cyclomatic_complexity": complexity.check_cyclomatic_complexity,
+    "static.check_function_length": complexity.check_function_length,
+    "static.check_nesting_depth": complexity.check_nesting_depth,
+    "static.check_parameter_count": complexity.check_parameter_count,
+    "security.pattern_scan": pattern_scan,
+    "security.regex_scan": regex_scan,
+    "security.taint_scan": taint_scan,
+}
+
+app = typer.Typer(help="⏱️ Code reviewer benchmarks")
+console = Console()
+
+
+# ------------------------------------
+# Measuring
+# ------------------------------------
+@dataclass
+class Measurement:
+    """Timings of one benchmark on one corpus size (seconds)."""
+
+    name: str
+    lines: int
+    median: float
+    min: float
+    findings: int
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "lines": self.lines,
+            "median": self.median,
+            "min": self.min,
+            "findings": self.findings,
+        }
+
+
+def measure(name: str, lines: int, func: Callable[[object], int], repeat: int,
+            setup: Callable[[], object] = lambda: None) -> Measurement:
+    """
+    Run `func` (which returns a finding count) `repeat` times, each time
+    on a new, untimed `setup()`.
+    """
+    times, findings = [], 0
+    for _ in range(max(repeat, 1)):
+        arg = setup()
+        start = time.perf_counter()
+        findings = func(arg)
+        times.append(time.perf_counter() - start)
+    return Measurement(name, lines, statistics.median(times), min(times), findings)
+
+
+def _parsed(filepath: str, code: str) -> SourceDocument:
+    """A document with every view the agents use already computed."""
+    doc = SourceDocument(filepath, code)
+    doc.lines, doc.line_index, doc.tokens, doc.ast_tree, doc.ts_tree
+    return doc
+
+
+@contextmanager
+def stubbed_llm():
+    """Replace the orchestrator's LLM call with one that returns nothing."""
+    original = orchestrator.review_code
+    orchestrator.review_code = lambda *args, **kwargs: []
+    try:
+        yield
+    finally:
+        orchestrator.review_code = original
+
+
+def bench_corpus(modules: Dict[str, str], lines: int, repeat: int = 3) -> List[Measurement]:
+    """
+    Run every benchmark over all `modules` of one corpus; a benchmark's
+    time is the total over the modules.
+    """
+    def over_modules(run: Callable[[str, object], object]):
+        return lambda sources: sum(len(run(name, source)) for name, source in sources.items())
+
+    def cold_docs():
+        metrics.clear_memo()
+        return {name: _parsed(name, code) for name, code in modules.items()}
+
+    def cold_sources():
+        metrics.clear_memo()
+        return modules
+
+    results = []
+
+    # 1️⃣ Parsing, then each rule on pre-parsed documents of its own
+    def parse_all(_):
+        for name, code in modules.items():
+            _parsed(name, code)
+        return 0
+
+    results.append(measure("parse", lines, parse_all, repeat))
+    for rule_name, rule in RULES.items():
+        results.append(measure(rule_name, lines, over_modules(rule), repeat, cold_docs))
+    results.append(measure("static.style_rules", lines, over_modules(style_rules.run_style_rules), repeat, cold_docs))
+
+    # 2️⃣ The agent runners, from raw source
+    results.append(measure("run_static", lines, over_modules(run_static), repeat, cold_sources))
+    results.append(measure("run_security", lines, over_modules(run_security), repeat, cold_sources))
+    over_modules(run_static)(modules)  # warms the metrics memo
+    results.append(measure("run_static.warm", lines, over_modules(run_static), repeat, lambda: modules))
+
+    # 3️⃣ The whole orchestrator, minus the network
+    def review(name, code):
+        bundle = orchestrator.review_file(name, code)
+        return [*bundle.static_findings, *bundle.security_findings]
+
+    with stubbed_llm(), redirect_stdout(io.StringIO()):
+        results.append(measure("orchestrator", lines, over_modules(review), repeat, cold_sources))
+
+    return results
+
+
+def run_benchmarks(spec: CorpusSpec, sizes: List[int], repeat: int = 3) -> Dict:
+    """Benchmark every corpus size and return the JSON results document."""
+    results = []
+    for lines in sizes:
+        modules = generate_corpus(replace(spec, lines=lines))
+        results += bench_corpus(modules, lines, repeat)
+
+    meta_spec = spec.to_dict()
+    meta_spec.pop("lines")
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "sizes": sizes,
+            "spec": meta_spec,
+        },
+        "results": [m.to_dict() for m in results],
+    }
+
+
+# ------------------------------------
+# Baseline comparison
+# ------------------------------------
+@dataclass
+class Regression:
+    name: str
+    lines: int
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def compare(
+    current: Dict,
+    baseline: Dict,
+    threshold: float = DEFAULT_THRESHOLD,
+    noise_floor: float = NOISE_FLOOR_SECONDS,
+) -> List[Regression]:
+    """
+    Benchmarks whose median is more than `threshold` (a fraction) slower
+    than in `baseline`. Benchmarks missing from either side are skipped.
+    """
+    def key(row) -> Tuple[str, int]:
+        return row["name"], row["lines"]
+
+    before = {key(row): row["median"] for row in baseline.get("results", [])}
+    regressions = []
+    for row in current.get("results", []):
+        old = before.get(key(row))
+        if old is None or max(old, row["median"]) < noise_floor:
+            continue
+        if row["median"] > max(old, noise_floor) * (1 + threshold):
+            regressions.append(Regression(row["name"], row["lines"], old, row["median"]))
+    return regressions
+
+
+def load_results(path: Path) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_results(results: Dict, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+def print_results(results: Dict, baseline: Optional[Dict]):
+    before = {(r["name"], r["lines"]): r["median"] for r in (baseline or {}).get("results", [])}
+    table = Table(title="⏱️ Benchmarks", show_header=True, header_style="bold magenta")
+    table.add_column("Benchmark", style="cyan", no_wrap=True)
+    table.add_column("Lines", justify="right")
+    table.add_column("Median (ms)", justify="right", style="yellow")
+    table.add_column("Min (ms)", justify="right")
+    table.add_column("Findings", justify="right")
+    table.add_column("vs baseline", justify="right")
+    for row in results["results"]:
+        old = before.get((row["name"], row["lines"]))
+        change = f"{(row['median'] / old - 1) * 100:+.1f}%" if old else "—"
+        table.add_row(
+            row["name"], f"{row['lines']:,}", f"{row['median'] * 1000:.2f}",
+            f"{row['min'] * 1000:.2f}", str(row["findings"]), change,
+        )
+    console.print(table)
+
+
+# ------------------------------------
+# CLI
+# ------------------------------------
+@app.command()
+def main(
+    lines: List[int] = typer.Option([1_000, 10_000], "--lines", "-n", help="Corpus size in lines (repeatable, 1k–1M)"),
+    files: int = typer.Option(1, help="Split each corpus over this many modules"),
+    repeat: int = typer.Option(3, "--repeat", "-r", help="Runs per benchmark"),
+    seed: int = typer.Option(0, help="Corpus generator seed"),
+    eval_density: float = typer.Option(2.0, help="eval() calls per 1,000 lines"),
+    sql_density: float = typer.Option(2.0, help="Raw SQL queries per 1,000 lines"),
+    taint_density: float = typer.Option(2.0, help="Source → sink flows per 1,000 lines"),
+    long_line_density: float = typer.Option(5.0, help="Over-long lines per 1,000 lines"),
+    deep_nesting_density: float = typer.Option(1.0, help="Deeply nested functions per 1,000 lines"),
+    nesting_depth: int = typer.Option(12, help="Nesting depth of those functions"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write the results JSON here"),
+    baseline: Path = typer.Option(DEFAULT_BASELINE, help="Baseline results to compare against"),
+    save_baseline: bool = typer.Option(False, "--save-baseline", help="Store these results as the baseline"),
+    threshold: float = typer.Option(DEFAULT_THRESHOLD, help="Allowed slowdown before failing (0.2 = 20%)"),
+):
+    """
+    Benchmark the agents on synthetic corpora and compare with the baseline.
+    """
+    spec = CorpusSpec(
+        files=files, seed=seed,
+        eval_density=eval_density, sql_density=sql_density, taint_density=taint_density,
+        long_line_density=long_line_density, deep_nesting_density=deep_nesting_density,
+        nesting_depth=nesting_depth,
+    )
+    results = run_benchmarks(spec, lines, repeat)
+    stored = None if save_baseline else load_results(baseline)
+    print_results(results, stored)
+
+    if output:
+        save_results(results, output)
+        console.print(f"\n📝 Results written to {output}")
+    if save_baseline:
+        save_results(results, baseline)
+        console.print(f"\n📌 Baseline saved to {baseline}")
+        return
+    if stored is None:
+        console.print(f"\n[yellow]No baseline at {baseline}; run with --save-baseline to create one.[/yellow]")
+        return
+
+    regressions = compare(results, stored, threshold)
+    if regressions:
+        console.print(f"\n[red]❌ {len(regressions)} benchmark(s) regressed by more than {threshold:.0%}:[/red]")
+        for r in regressions:
+            console.print(
+                f"  {r.name} @ {r.lines:,} lines: {r.baseline * 1000:.2f} ms → {r.current * 1000:.2f} ms "
+                f"({(r.ratio - 1) * 100:+.1f}%)"
+            )
+        raise typer.Exit(code=1)
+    console.print(f"\n[green]✅ No regressions beyond {threshold:.0%}.[/green]")
+
+
+if __name__ == "__main__":
+    app()
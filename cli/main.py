@@ -6,34 +6,44 @@ directly from the terminal.
 
 Usage:
     python -m cli.main review <path_to_file>
+    python -m cli.main review src/ "tests/**/*.py" --output review.json
+    python -m cli.main review app.py --format ndjson   # one JSON event per line
+    python -m cli.main review src/ -o review.sarif.gz    # gzip-compressed SARIF for CI
+    python -m cli.main review --diff origin/main..HEAD
+    python -m cli.main review src/ --profile --profile-trace trace.json   # where the time goes
+    git diff origin/main | python -m cli.main review --diff -
+    python -m cli.main serve    # language server over stdio, for editors
 """
 
 import json
-import pathlib
+import subprocess
+import sys
+from contextlib import nullcontext, redirect_stdout
+from itertools import chain
+from pathlib import Path
+from typing import Iterator, List, Optional
+
 import typer
 from rich.console import Console
 from rich.table import Table
-from reviewer_core.orchestrator import review_file
+from reviewer_core import profiling
+from reviewer_core.cache import DEFAULT_CACHE_DIR, FindingsCache
+from reviewer_core.diff import git_diff, git_reader, parse_unified_diff, review_diff
+from reviewer_core.llm.cache import configure_response_cache, get_response_cache
+from reviewer_core.models import ReviewBundle, ReviewEvent
+from reviewer_core.orchestrator import stream_review
+from reviewer_core.reports import WRITERS, ReportStats, dumps, open_report
+from reviewer_core.repo import FileResult, discover_files, review_paths
+from reviewer_core.server import serve_stdio
 
 app = typer.Typer(help="🤖 Multi-Agent Code Review CLI")
 console = Console()
 
 
-@app.command()
-def review(path: str):
+def print_file_report(bundle):
     """
-    Run a full multi-agent review on the specified Python file.
+    Print the detailed tables for a single reviewed file.
     """
-    file_path = pathlib.Path(path)
-    if not file_path.exists():
-        console.print(f"[red]❌ File not found:[/red] {path}")
-        raise typer.Exit(code=1)
-
-    console.print(f"[bold cyan]🔍 Starting code review for:[/bold cyan] {file_path.name}\n")
-
-    code = file_path.read_text(encoding="utf-8")
-    bundle = review_file(str(file_path), code)
-
     # --------------------------
     # Section 1: Static Findings
     # --------------------------
@@ -68,20 +78,275 @@ def review(path: str):
     # Section 3: LLM Reviewer Comments
     # --------------------------
     console.print("\n🤖 [bold magenta]Gemini Code Review:[/bold magenta]")
-    llm_comment = bundle.llm_comments[0].message if bundle.llm_comments else "(No comments)"
-    console.print(f"\n{llm_comment}")
+    if not bundle.llm_comments:
+        console.print("\n(No comments)")
+    for comment in bundle.llm_comments:
+        if len(bundle.llm_comments) > 1:
+            end_line = (comment.meta or {}).get("end_line", comment.line)
+            console.print(f"\n[bold]Lines {comment.line}-{end_line}[/bold]")
+        console.print(f"\n{comment.message}")
 
-    # --------------------------
-    # Optional JSON output
-    # --------------------------
-    output_path = file_path.with_suffix(".review.json")
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump({
-            "static": [f.__dict__ for f in bundle.static_findings],
-            "security": [f.__dict__ for f in bundle.security_findings],
-            "llm": [f.__dict__ for f in bundle.llm_comments],
-        }, f, indent=2)
-    console.print(f"\n💾 Review saved to [bold green]{output_path}[/bold green]\n")
+
+def print_summary(stats: ReportStats):
+    """
+    Print a per-run summary for multi-file reviews.
+    """
+    table = Table(title="📊 Review Summary", show_header=True, header_style="bold cyan")
+    table.add_column("Files", style="white")
+    table.add_column("Static", style="magenta")
+    table.add_column("Security", style="red")
+    table.add_column("Errors", style="yellow")
+    table.add_row(str(stats.files), str(stats.static), str(stats.security), str(stats.errors))
+    console.print(table)
+
+
+@app.command()
+def review(
+    paths: Optional[List[str]] = typer.Argument(None, help="Python files, directories or glob patterns."),
+    diff: Optional[str] = typer.Option(
+        None, "--diff", help="Review only the changes in a git range (base..head), or a unified diff on stdin (-)."
+    ),
+    output: str = typer.Option(
+        "review-report.json", "--output", "-o", help="Run report (.json, .ndjson or .sarif; add .gz to compress)."
+    ),
+    report_format: Optional[str] = typer.Option(
+        None, "--report-format", help="Report format: json, ndjson or sarif (default: from the --output extension)."
+    ),
+    workers: Optional[int] = typer.Option(None, help="Local-agent processes (default: CPU count)."),
+    llm: bool = typer.Option(True, "--llm/--no-llm", help="Request Gemini reviews."),
+    llm_concurrency: int = typer.Option(4, help="Maximum concurrent Gemini requests."),
+    llm_batch_tokens: int = typer.Option(
+        0, help="Pack small files into shared Gemini requests up to this many tokens (0 = off)."
+    ),
+    cache_dir: str = typer.Option(str(DEFAULT_CACHE_DIR), help="Findings cache directory."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore the findings and LLM response caches."),
+    cross_module: bool = typer.Option(
+        True, "--cross-module/--no-cross-module", help="Report taint flows that cross files."
+    ),
+    output_format: str = typer.Option(
+        "table", "--format", help="'table' (rich tables) or 'ndjson' (one JSON event per line, as it happens)."
+    ),
+    profile: bool = typer.Option(False, "--profile", help="Print the time spent per agent, rule and LLM call."),
+    profile_trace: Optional[str] = typer.Option(
+        None, "--profile-trace", help="Write a Chrome trace (chrome://tracing, Perfetto) of the run to this file."
+    ),
+):
+    """
+    Run a full multi-agent review on Python files, directories or globs,
+    or a diff-scoped review of a pull request with --diff.
+    """
+    if output_format not in ("table", "ndjson"):
+        console.print(f"[red]❌ Unknown format:[/red] {output_format}")
+        raise typer.Exit(code=1)
+    if report_format is not None and report_format not in WRITERS:
+        console.print(f"[red]❌ Unknown report format:[/red] {report_format}")
+        raise typer.Exit(code=1)
+    ndjson = output_format == "ndjson"
+    stdout = sys.stdout
+
+    def emit(event: dict):
+        stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+        stdout.flush()
+
+    profiler = profiling.enable(trace=profile_trace is not None) if profile or profile_trace else None
+
+    # In NDJSON mode stdout carries only events; progress goes to stderr
+    with redirect_stdout(sys.stderr) if ndjson else nullcontext():
+        results = _run_review(
+            paths, diff, emit if ndjson else None, workers, llm, llm_concurrency,
+            llm_batch_tokens, cache_dir, no_cache, cross_module,
+        )
+        first = next(results, None)  # input errors surface before the report is created
+
+        # Each result is written to the report and dropped, so memory
+        # does not grow with the size of the run
+        last = None
+        with open_report(output, report_format) as report:
+            for result in chain([first] if first is not None else [], results):
+                report.add(result.filepath, result.bundle, result.error)
+                last = result
+        finish_report(report.stats, last, output, llm, tables=not ndjson)
+
+        if profiler is not None:
+            profiling.disable()
+            if profile:
+                print_profile(profiler)
+            if profile_trace:
+                Path(profile_trace).write_bytes(dumps(profiler.chrome_trace()))
+                console.print(f"⏱️ Profile trace saved to [bold green]{profile_trace}[/bold green]\n")
+
+
+def _run_review(
+    paths, diff, emit, workers, llm, llm_concurrency, llm_batch_tokens, cache_dir, no_cache, cross_module
+) -> Iterator[FileResult]:
+    """
+    Run the requested review, yielding results as they complete; with
+    `emit`, also stream NDJSON events.
+    """
+    if diff is not None:
+        for result in review_changes(diff, paths or [], llm, llm_concurrency, no_cache, cache_dir):
+            if emit is not None:
+                for event in result_events(result):
+                    emit(event)
+            yield result
+        return
+    if not paths:
+        console.print("[red]❌ Give files to review, or --diff RANGE.[/red]")
+        raise typer.Exit(code=1)
+
+    files = discover_files(paths)
+    if not files:
+        console.print(f"[red]❌ No Python files found:[/red] {' '.join(paths)}")
+        raise typer.Exit(code=1)
+
+    console.print(f"[bold cyan]🔍 Starting code review for:[/bold cyan] {len(files)} file(s)\n")
+
+    configure_response_cache(cache_dir, enabled=not no_cache)
+
+    # A single file streams each agent's findings and the LLM text live
+    if emit is not None and len(files) == 1:
+        yield stream_file(files[0], llm, None if no_cache else FindingsCache(cache_dir), emit)
+        return
+
+    results_iter = review_paths(
+        files,
+        workers=workers,
+        llm=llm,
+        llm_concurrency=llm_concurrency,
+        llm_batch_tokens=llm_batch_tokens,
+        cache_dir=None if no_cache else cache_dir,
+        cross_module=cross_module,
+    )
+    for result in results_iter:
+        if result.error:
+            console.print(f"[red]❌ {result.filepath}:[/red] {result.error}")
+        if emit is not None:
+            for event in result_events(result):
+                emit(event)
+        yield result
+
+
+def result_events(result: FileResult) -> Iterator[dict]:
+    """
+    NDJSON events for a file reviewed as a whole: its findings, then "done".
+    """
+    bundle = result.bundle
+    for finding in bundle.static_findings + bundle.security_findings + bundle.llm_comments:
+        yield ReviewEvent("finding", result.filepath, finding.agent, finding=finding).to_dict()
+    done = ReviewEvent("done", result.filepath).to_dict()
+    if result.error:
+        done["error"] = result.error
+    yield done
+
+
+def stream_file(filepath: str, llm: bool, cache: Optional[FindingsCache], emit) -> FileResult:
+    """
+    Review one file, emitting each event as soon as it happens.
+    """
+    try:
+        code = Path(filepath).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as e:
+        result = FileResult(filepath, ReviewBundle([], [], []), f"{type(e).__name__}: {e}")
+        for event in result_events(result):
+            emit(event)
+        return result
+
+    bundle = None
+    for event in stream_review(filepath, code, llm=llm, cache=cache):
+        emit(event.to_dict())
+        if event.kind == "done":
+            bundle = event.bundle
+    return FileResult(filepath, bundle)
+
+
+def review_changes(
+    rev_range: str, paths: List[str], llm: bool, llm_concurrency: int, no_cache: bool, cache_dir: str
+) -> Iterator[FileResult]:
+    """
+    Diff-scoped review: findings on changed lines only, hunks-only LLM prompts.
+    """
+    try:
+        if rev_range == "-":
+            diffs, read = parse_unified_diff(sys.stdin.read()), git_reader("")
+        else:
+            diffs, read = parse_unified_diff(git_diff(rev_range)), git_reader(rev_range)
+    except (OSError, subprocess.CalledProcessError) as e:
+        console.print(f"[red]❌ Could not read the diff:[/red] {getattr(e, 'stderr', None) or e}")
+        raise typer.Exit(code=1)
+
+    if paths:
+        prefixes = tuple(p.rstrip("/") for p in paths)
+        diffs = [
+            d for d in diffs
+            if d.path and any(d.path == p or d.path.startswith(p + "/") for p in prefixes)
+        ]
+
+    console.print(f"[bold cyan]🔍 Starting diff review for:[/bold cyan] {len(diffs)} changed file(s)\n")
+    configure_response_cache(cache_dir, enabled=not no_cache)
+
+    for result in review_diff(diffs, read, llm=llm, llm_concurrency=llm_concurrency):
+        if result.error:
+            console.print(f"[red]❌ {result.filepath}:[/red] {result.error}")
+        yield result
+
+
+def finish_report(stats: ReportStats, last: Optional[FileResult], output: str, llm: bool, tables: bool = True):
+    """
+    Print the end-of-run report (details for a single file, else a summary).
+    """
+    if tables and stats.files == 1:
+        print_file_report(last.bundle)
+    elif tables:
+        print_summary(stats)
+
+    llm_cache = get_response_cache()
+    if llm and llm_cache is not None:
+        console.print(f"\n🗄️ LLM cache: {llm_cache.hits} hit(s), {llm_cache.misses} miss(es)")
+
+    console.print(f"\n💾 Review saved to [bold green]{output}[/bold green]\n")
+
+
+def print_profile(profiler: profiling.Profiler):
+    """
+    Print where the run spent its time (slowest self time first) and the counters.
+    """
+    table = Table(title="⏱️ Profile", show_header=True, header_style="bold magenta")
+    table.add_column("Span", style="cyan", no_wrap=True)
+    table.add_column("Kind", style="white")
+    table.add_column("Calls", justify="right")
+    table.add_column("Self (ms)", justify="right", style="yellow")
+    table.add_column("Total (ms)", justify="right")
+    table.add_column("Mean (ms)", justify="right")
+    table.add_column("Max (ms)", justify="right")
+    for row in profiler.summary():
+        table.add_row(
+            row["name"], row["category"], str(row["calls"]),
+            *(f"{row[key] * 1000:.2f}" for key in ("self", "total", "mean", "max")),
+        )
+    console.print(table)
+
+    if profiler.counters:
+        counters = Table(title="🔢 Counters", show_header=True, header_style="bold magenta")
+        counters.add_column("Counter", style="cyan", no_wrap=True)
+        counters.add_column("Value", justify="right")
+        for name, value in sorted(profiler.counters.items()):
+            counters.add_row(name, f"{value:,}")
+        console.print(counters)
+
+
+@app.command()
+def serve(
+    workers: int = typer.Option(4, help="Concurrent requests and diagnostics runs."),
+    debounce: float = typer.Option(0.15, help="Seconds to wait for more edits before analysing."),
+    cache_dir: str = typer.Option(str(DEFAULT_CACHE_DIR), help="Findings cache directory."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore the findings and LLM response caches."),
+):
+    """
+    Run a long-lived review server (Language Server Protocol over stdio).
+    """
+    configure_response_cache(cache_dir, enabled=not no_cache)
+    cache = None if no_cache else FindingsCache(cache_dir)
+    raise typer.Exit(code=serve_stdio(workers=workers, debounce=debounce, cache=cache))
 
 
 if __name__ == "__main__":
@@ -3,8 +3,32 @@ reviewer_core
 -------------
 Main package for the Multi-Agent Code Reviewer system.
 This module coordinates static, security, and LLM-based code review.
+
+The entry points below are imported on first use, so importing a
+submodule (e.g. `reviewer_core.parsing`) does not load the agents or the
+Gemini SDK.
 """
 
+import importlib
+
 __version__ = "0.1.0"
 
-from .orchestrator import review_file
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "review_file": "orchestrator",
+    "review_file_async": "orchestrator",
+    "stream_review": "orchestrator",
+    "stream_review_async": "orchestrator",
+    "IncrementalReview": "incremental",
+    "TextEdit": "incremental",
+}
+
+__all__ = ["__version__", *_EXPORTS]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
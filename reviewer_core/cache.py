@@ -0,0 +1,233 @@
+"""
+Findings Cache
+--------------
+A persistent, content-addressed cache of per-file agent findings.
+
+Entries are keyed by the SHA-256 of the file content plus a fingerprint
+of the agent (tool version, Python version and the source of the agent's
+rule modules, which includes its patterns and thresholds). Editing a
+rule therefore invalidates only that agent's entries, and an unchanged
+file is never re-analysed.
+
+Entries live in a SQLite database (`DiskLRU`) and are evicted
+least-recently-used once the stored payloads exceed `max_bytes`.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from . import __version__
+from .findings import FindingTable
+from .models import Finding
+from .profiling import count, span
+from .source import SourceDocument
+
+DEFAULT_CACHE_DIR = Path(os.getenv("REVIEWER_CACHE_DIR", Path.home() / ".cache" / "code-reviewer"))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Recency is only worth a write when it has gone this stale (seconds), and
+# hits are recorded in batches of this many
+TOUCH_INTERVAL = 60.0
+TOUCH_BATCH = 256
+
+# Rule packages whose source makes up each agent's fingerprint
+AGENT_PACKAGES = {
+    "static": "static_analysis",
+    "security": "security",
+}
+
+
+@lru_cache(maxsize=None)
+def agent_fingerprint(agent: str) -> str:
+    """
+    Hash of everything that can change an agent's output for a given file.
+    """
+    base = Path(__file__).resolve().parent
+    digest = hashlib.sha256(f"{__version__}|{sys.version_info[:2]}|{agent}".encode())
+    sources = sorted((base / AGENT_PACKAGES.get(agent, agent)).rglob("*.py"))
+    sources += [base / "source.py", base / "models.py"]
+    for path in sources:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _encode(findings: Sequence[Finding]) -> bytes:
+    rows = []
+    for f in findings:
+        row = f.to_dict()
+        row.pop("filepath")  # content-addressed: the same file may live at many paths
+        rows.append(row)
+    return zlib.compress(json.dumps(rows, default=str).encode("utf-8"))
+
+
+def _decode(payload: bytes, filepath: str) -> FindingTable:
+    # Straight into columns: no per-finding objects are built
+    table = FindingTable()
+    for row in json.loads(zlib.decompress(payload)):
+        table.append_values(filepath=filepath, **row)
+    return table
+
+
+class DiskLRU:
+    """
+    A small SQLite key/value store with size-bounded LRU eviction and an
+    optional time-to-live.
+
+    A hit does not write: recency (`last_used`) is refreshed only once it
+    is `TOUCH_INTERVAL` old, and those refreshes are written together,
+    `TOUCH_BATCH` at a time or before the next store or eviction.
+
+    Safe to share between threads; each process opens its own instance.
+    """
+
+    def __init__(self, path, max_bytes: int = DEFAULT_MAX_BYTES, ttl: Optional[float] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> last use not yet written
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used)")
+        self._db.commit()
+        self._total = self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Return the stored payload, or None on a miss or an expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, created, last_used FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._touched.pop(key, None)
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[2] > TOUCH_INTERVAL:
+                self._touched[key] = now
+                if len(self._touched) >= TOUCH_BATCH:
+                    self._flush_touched()
+            self.hits += 1
+        return row[0]
+
+    def _flush_touched(self):
+        """Write the pending recency updates in one transaction (lock held)."""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            self._db.commit()
+            self._touched.clear()
+
+    def put_bytes(self, key: str, payload: bytes):
+        """Store `payload` under `key`, evicting old entries if over budget."""
+        now = time.time()
+        with self._lock:
+            self._touched.pop(key, None)
+            self._flush_touched()
+            replaced = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, payload, size, created, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self._db.commit()
+            self._total += len(payload) - (replaced[0] if replaced else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Other processes write too, so re-read the real total before evicting
+        self._total = self._stored_bytes()
+        target = int(self.max_bytes * 0.9)
+        stale = []
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if self._total <= target:
+                break
+            stale.append((key,))
+            self._total -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", stale)
+        self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+        self._db.close()
+
+
+class FindingsCache(DiskLRU):
+    """
+    Per-agent findings keyed by file content hash and agent fingerprint.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        super().__init__(self.cache_dir / "findings.sqlite3", max_bytes)
+
+    @staticmethod
+    def key(agent: str, content_hash: str) -> str:
+        return f"{agent}:{agent_fingerprint(agent)}:{content_hash}"
+
+    def get(self, agent: str, content_hash: str, filepath: str) -> Optional[FindingTable]:
+        """Return the cached findings for this content, or None on a miss."""
+        payload = self.get_bytes(self.key(agent, content_hash))
+        return None if payload is None else _decode(payload, filepath)
+
+    def put(self, agent: str, content_hash: str, findings: Sequence[Finding]):
+        """Store an agent's findings for this content."""
+        self.put_bytes(self.key(agent, content_hash), _encode(findings))
+
+
+def run_cached(
+    cache: Optional[FindingsCache],
+    agent: str,
+    run: Callable[[str, SourceDocument], List[Finding]],
+    filepath: str,
+    doc: SourceDocument,
+) -> Sequence[Finding]:
+    """
+    Run one agent through the cache; a hit skips the agent entirely.
+    """
+    with span(f"agent.{agent}", "agent"):
+        if cache is None:
+            return run(filepath, doc)
+        findings = cache.get(agent, doc.content_hash, filepath)
+        count(f"cache.{agent}.{'misses' if findings is None else 'hits'}")
+        if findings is None:
+            findings = run(filepath, doc)
+            cache.put(agent, doc.content_hash, findings)
+        return findings
@@ -0,0 +1,261 @@
+"""
+Diff-Scoped Review
+------------------
+Reviews only what a pull request touches.
+
+- `parse_unified_diff` turns `git diff` output (or any unified diff)
+  into per-file hunks and the new-side line numbers they add.
+- `review_diff` runs the unit rules (naming, complexity and function
+  length, security patterns) only on the top-level functions and
+  statements that contain changes. It runs the whole-file rules (the
+  name rules such as unused imports, and taint) once per file, keeps
+  only findings on changed lines, and sends the LLM just the changed
+  hunks.
+
+Run time and tokens therefore grow with the size of the PR, not the repo.
+"""
+
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Set
+
+from .incremental import FILE_STATIC_CHECKS, UNIT_STATIC_CHECKS
+from .llm.chunking import top_level_spans
+from .llm.gemini_client import review_diff as llm_review_diff
+from .models import Finding, ReviewBundle
+from .repo import FileResult
+from .security.patterns import pattern_scan
+from .security.taint import taint_scan
+from .source import SourceDocument
+
+# Unchanged lines `git diff` shows around each hunk
+DIFF_CONTEXT = 3
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+@dataclass
+class Hunk:
+    """
+    One `@@` block of a unified diff.
+    """
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    lines: List[str] = field(default_factory=list)  # header first, then " ", "+", "-" lines
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+@dataclass
+class FileDiff:
+    """
+    The changes to one file: its hunks, the new-side lines they add, and
+    the new-side lines where something was removed.
+    """
+    path: Optional[str]  # None when the file was deleted
+    old_path: Optional[str] = None
+    hunks: List[Hunk] = field(default_factory=list)
+    added_lines: Set[int] = field(default_factory=set)
+    removal_points: Set[int] = field(default_factory=set)
+
+    @property
+    def touched_lines(self) -> Set[int]:
+        return self.added_lines | self.removal_points
+
+
+def _diff_path(value: str) -> Optional[str]:
+    value = value.split("\t", 1)[0].strip()
+    if value == "/dev/null":
+        return None
+    if value[:2] in ("a/", "b/"):
+        value = value[2:]
+    return value
+
+
+def parse_unified_diff(text: str) -> List[FileDiff]:
+    """
+    Parse unified-diff text into one FileDiff per changed file.
+    """
+    files: List[FileDiff] = []
+    current: Optional[FileDiff] = None
+    hunk: Optional[Hunk] = None
+    old_path = None
+    new_line = old_left = new_left = 0
+
+    for line in text.splitlines():
+        if line.startswith("diff --git "):
+            current, hunk = None, None
+        elif line.startswith("--- ") and hunk is None:
+            old_path = _diff_path(line[4:])
+        elif line.startswith("+++ ") and hunk is None:
+            current = FileDiff(path=_diff_path(line[4:]), old_path=old_path)
+            files.append(current)
+        elif line.startswith("@@") and current is not None:
+            match = _HUNK_HEADER.match(line)
+            if match is None:
+                continue
+            old_start, old_count, new_start, new_count = match.groups()
+            hunk = Hunk(
+                int(old_start),
+                int(old_count) if old_count is not None else 1,
+                int(new_start),
+                int(new_count) if new_count is not None else 1,
+                [line],
+            )
+            current.hunks.append(hunk)
+            new_line = hunk.new_start
+            old_left, new_left = hunk.old_count, hunk.new_count
+        elif hunk is not None and line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        elif hunk is not None and line[:1] in (" ", "+", "-", ""):
+            hunk.lines.append(line)
+            if line.startswith("+"):
+                current.added_lines.add(new_line)
+                new_line += 1
+                new_left -= 1
+            elif line.startswith("-"):
+                current.removal_points.add(max(new_line, 1))
+                old_left -= 1
+            else:
+                new_line += 1
+                old_left -= 1
+                new_left -= 1
+            if old_left <= 0 and new_left <= 0:
+                hunk = None  # the hunk is complete
+    return files
+
+
+def git_diff(rev_range: str, cwd: Optional[str] = None, context: int = DIFF_CONTEXT) -> str:
+    """
+    `git diff` output for `rev_range` ("base..head", or "base" for the
+    working tree), limited to Python files anywhere in the repository.
+    """
+    result = subprocess.run(
+        ["git", "diff", "--no-color", "--no-ext-diff", f"--unified={context}", rev_range, "--", ":(top)*.py"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    return result.stdout
+
+
+def git_toplevel(cwd: Optional[str] = None) -> Optional[str]:
+    """The root of the work tree containing `cwd`, or None outside one."""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=cwd, capture_output=True, text=True)
+    except OSError:
+        return None  # no git: a patch read from stdin is applied to `cwd`
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def git_reader(rev_range: str, cwd: Optional[str] = None) -> Callable[[str], str]:
+    """
+    Reader for the new side of `rev_range`: the head commit's blobs for
+    "base..head", the working tree otherwise. Diff paths are relative to
+    the repository root, wherever inside the repository `cwd` is.
+    """
+    head = rev_range.split("..", 1)[1] if ".." in rev_range else ""
+    head = head.lstrip(".")  # "base...head" compares against the merge base
+    if not head:
+        root = git_toplevel(cwd) or cwd or "."
+        return lambda path: Path(root, path).read_text(encoding="utf-8")
+
+    def read(path: str) -> str:
+        return subprocess.run(
+            ["git", "show", f"{head}:{path}"], cwd=cwd, capture_output=True, text=True, check=True,
+        ).stdout
+
+    return read
+
+
+# ------------------------------------
+# Reviewing the changes
+# ------------------------------------
+def _affected_spans(doc: SourceDocument, touched: Set[int]):
+    """Top-level units (with their leading lines) that contain a touched line."""
+    spans = []
+    next_line = 1
+    for _, end in top_level_spans(doc) or [(1, len(doc.line_index))]:
+        if end >= next_line:
+            spans.append((next_line, end))
+            next_line = end + 1
+    if next_line <= len(doc.line_index):
+        spans.append((next_line, len(doc.line_index)))
+    return [(start, end) for start, end in spans if any(start <= line <= end for line in touched)]
+
+
+def local_diff_findings(filepath: str, code: str, file_diff: FileDiff):
+    """
+    Static and security findings on the lines `file_diff` adds.
+    """
+    doc = SourceDocument(filepath, code)
+    index = doc.line_index
+    static: List[Finding] = []
+    security: List[Finding] = []
+
+    # 1️⃣ Unit rules, only on the functions/statements that changed
+    for start, end in _affected_spans(doc, file_diff.touched_lines):
+        stop = index.line_start(end + 1) if end < len(index) else len(code)
+        unit = SourceDocument(filepath, code[index.line_start(start):stop])
+        offset = start - 1
+        static += [replace(f, line=f.line + offset) for check in UNIT_STATIC_CHECKS for f in check(filepath, unit)]
+        security += [replace(f, line=f.line + offset) for f in pattern_scan(filepath, unit)]
+
+    # 2️⃣ Whole-file rules, run once
+    for check in FILE_STATIC_CHECKS:
+        static += check(filepath, doc)
+    security += taint_scan(filepath, doc)
+
+    # 3️⃣ Keep what lands on changed lines
+    changed = file_diff.added_lines
+    static = sorted((f for f in static if f.line in changed), key=lambda f: f.line)
+    security = sorted((f for f in security if f.line in changed), key=lambda f: f.line)
+    return static, security
+
+
+def review_diff(
+    diffs: List[FileDiff],
+    read: Callable[[str], str],
+    llm: bool = True,
+    llm_concurrency: int = 4,
+) -> Iterator[FileResult]:
+    """
+    Review the Python files changed by `diffs`, yielding one FileResult
+    per file in diff order. `read(path)` returns a file's new content.
+    """
+    targets = [d for d in diffs if d.path and d.path.endswith(".py") and d.added_lines]
+
+    with ThreadPoolExecutor(max_workers=max(1, llm_concurrency), thread_name_prefix="review-llm") as llm_pool:
+        pending = []
+        for file_diff in targets:
+            try:
+                static, security = local_diff_findings(file_diff.path, read(file_diff.path), file_diff)
+            except Exception as e:  # unreadable file or an agent failure: one file's error, not the run's
+                pending.append((file_diff.path, [], [], None, f"{type(e).__name__}: {e}"))
+                continue
+            future = None
+            if llm:
+                future = llm_pool.submit(
+                    llm_review_diff,
+                    file_diff.path,
+                    "\n".join(hunk.text for hunk in file_diff.hunks),
+                    min(file_diff.added_lines),
+                    static,
+                    security,
+                )
+            pending.append((file_diff.path, static, security, future, None))
+
+        for filepath, static, security, future, error in pending:
+            bundle = ReviewBundle(
+                static_findings=static,
+                security_findings=security,
+                llm_comments=future.result() if future is not None else [],
+            )
+            yield FileResult(filepath=filepath, bundle=bundle, error=error)
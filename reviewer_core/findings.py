@@ -0,0 +1,277 @@
+"""
+Finding Table
+-------------
+Columnar storage for large numbers of findings (repository runs).
+
+Instead of one object per finding, a `FindingTable` keeps one array per
+field:
+
+- `line` / `col` are unsigned 32-bit arrays and `severity` a byte array
+  of codes (0 info, 1 warning, 2 error), so it sorts by rank.
+- The string fields (agent, rule ID, message, path, snippet, suggestion)
+  are dictionary-encoded: each distinct value is stored once and rows
+  hold a 32-bit code.
+- `meta` is sparse: only rows that carry metadata have an entry.
+
+Filtering, sorting and grouping produce new tables that share the
+dictionaries and copy only the code arrays. A table is a read-only
+`Sequence[Finding]`; indexing or iterating materializes findings on
+demand, so code written for lists keeps working.
+"""
+
+import threading
+from array import array
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .models import Finding
+
+SEVERITIES = ("info", "warning", "error")
+_SEVERITY_CODE = {name: code for code, name in enumerate(SEVERITIES)}
+
+# Dictionary-encoded string columns
+STRING_COLUMNS = ("agent", "rule_id", "message", "filepath", "code_snippet", "suggestion")
+
+
+class _Dictionary:
+    """
+    Distinct values of one column and their codes. Tables derived from
+    one another share it, so new values are added under a lock.
+    """
+
+    __slots__ = ("values", "codes", "_lock")
+
+    def __init__(self, values: Iterable[Optional[str]] = ()):
+        self.values: List[Optional[str]] = list(values)
+        self.codes: Dict[Optional[str], int] = {value: code for code, value in enumerate(self.values)}
+        self._lock = threading.Lock()
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(value)
+                if code is None:
+                    self.values.append(value)
+                    code = self.codes[value] = len(self.values) - 1
+        return code
+
+    def __getstate__(self):
+        return self.values
+
+    def __setstate__(self, values):
+        self.__init__(values)
+
+
+class FindingTable(Sequence[Finding]):
+    """
+    Column-oriented, read-only sequence of findings.
+    """
+
+    def __init__(self, findings: Iterable[Finding] = (), _dictionaries: Optional[Dict[str, _Dictionary]] = None):
+        self._dictionaries = _dictionaries or {name: _Dictionary() for name in STRING_COLUMNS}
+        self._codes = {name: array("I") for name in STRING_COLUMNS}
+        self.line = array("I")
+        self.col = array("I")
+        self.severity = array("B")
+        self._meta: Dict[int, Dict[str, Any]] = {}
+        for finding in findings:
+            self.append(finding)
+
+    @classmethod
+    def of(cls, findings: Iterable[Finding]) -> "FindingTable":
+        """`findings` as a table (returned as is when it already is one)."""
+        return findings if isinstance(findings, cls) else cls(findings)
+
+    # ------------------------------------
+    # Building
+    # ------------------------------------
+    def append(self, finding: Finding):
+        self.append_values(
+            finding.agent, finding.rule_id, finding.message, finding.severity, finding.filepath,
+            finding.line, finding.col, finding.code_snippet, finding.suggestion, finding.meta,
+        )
+
+    def append_values(
+        self,
+        agent: str,
+        rule_id: str,
+        message: str,
+        severity: str,
+        filepath: str,
+        line: int,
+        col: int,
+        code_snippet: Optional[str] = None,
+        suggestion: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ):
+        """Add one row from field values, without building a Finding."""
+        values = (agent, rule_id, message, filepath, code_snippet, suggestion)
+        for name, value in zip(STRING_COLUMNS, values):
+            self._codes[name].append(self._dictionaries[name].encode(value))
+        self.line.append(max(line, 0))
+        self.col.append(max(col, 0))
+        self.severity.append(_SEVERITY_CODE.get(severity, 0))
+        if meta is not None:
+            self._meta[len(self.line) - 1] = meta
+
+    def extend(self, findings: Iterable[Finding]):
+        for finding in findings:
+            self.append(finding)
+
+    def take(self, rows: Iterable[int]) -> "FindingTable":
+        """A new table with `rows`, in that order (dictionaries are shared)."""
+        rows = list(rows)
+        table = FindingTable(_dictionaries=self._dictionaries)
+        for name in STRING_COLUMNS:
+            codes = self._codes[name]
+            table._codes[name] = array("I", [codes[i] for i in rows])
+        table.line = array("I", [self.line[i] for i in rows])
+        table.col = array("I", [self.col[i] for i in rows])
+        table.severity = array("B", [self.severity[i] for i in rows])
+        if self._meta:
+            table._meta = {new: self._meta[old] for new, old in enumerate(rows) if old in self._meta}
+        return table
+
+    def using(self, other: "FindingTable") -> "FindingTable":
+        """
+        This table re-encoded with `other`'s dictionaries, without
+        building findings. Tables received from worker processes use it
+        to share one copy of each string for the whole run.
+        """
+        if other._dictionaries is self._dictionaries:
+            return self
+        table = FindingTable(_dictionaries=other._dictionaries)
+        for name in STRING_COLUMNS:
+            target = other._dictionaries[name]
+            mapping = [target.encode(value) for value in self._dictionaries[name].values]
+            table._codes[name] = array("I", [mapping[code] for code in self._codes[name]])
+        table.line, table.col, table.severity = array("I", self.line), array("I", self.col), array("B", self.severity)
+        table._meta = dict(self._meta)
+        return table
+
+    # ------------------------------------
+    # Sequence protocol
+    # ------------------------------------
+    def __len__(self) -> int:
+        return len(self.line)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FindingTable index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Finding]:
+        return (self._row(i) for i in range(len(self)))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __add__(self, other: Iterable[Finding]) -> "FindingTable":
+        table = self.take(range(len(self)))
+        table.extend(other)
+        return table
+
+    def __radd__(self, other: Iterable[Finding]) -> "FindingTable":
+        table = FindingTable(other)
+        table.extend(self)
+        return table
+
+    def __repr__(self) -> str:
+        return f"FindingTable({len(self)} findings)"
+
+    def _row(self, i: int) -> Finding:
+        value = {name: self._dictionaries[name].values[self._codes[name][i]] for name in STRING_COLUMNS}
+        return Finding(
+            severity=SEVERITIES[self.severity[i]],
+            line=self.line[i],
+            col=self.col[i],
+            meta=self._meta.get(i),
+            **value,
+        )
+
+    # ------------------------------------
+    # Columns and queries
+    # ------------------------------------
+    def column(self, name: str) -> Sequence:
+        """Decoded values of one column (numeric columns as their array)."""
+        if name in self._codes:
+            values = self._dictionaries[name].values
+            return [values[code] for code in self._codes[name]]
+        if name == "severity":
+            return [SEVERITIES[code] for code in self.severity]
+        if name == "meta":
+            return [self._meta.get(i) for i in range(len(self))]
+        return getattr(self, name)
+
+    def _sort_key(self, name: str) -> Sequence:
+        """Per-row values that order like the decoded column."""
+        if name in self._codes:
+            values = self._dictionaries[name].values
+            return [values[code] or "" for code in self._codes[name]]
+        return getattr(self, name)  # line, col, severity (codes sort by rank)
+
+    def filter(self, predicate: Optional[Callable[[Finding], bool]] = None, **columns) -> "FindingTable":
+        """
+        Rows whose columns equal the given values (a value may also be a
+        set, list or tuple of accepted values), e.g.
+        `filter(severity="error")` or `filter(rule_id={"S101", "S104"})`.
+        An optional `predicate` is applied to the remaining rows.
+        """
+        rows: Iterable[int] = range(len(self))
+        for name, wanted in columns.items():
+            accepted = wanted if isinstance(wanted, (set, frozenset, list, tuple)) else [wanted]
+            if name in self._codes:
+                known = self._dictionaries[name].codes
+                codes = {known[value] for value in accepted if value in known}
+                column = self._codes[name]
+            elif name == "severity":
+                codes = {_SEVERITY_CODE[value] for value in accepted if value in _SEVERITY_CODE}
+                column = self.severity
+            else:
+                codes, column = set(accepted), getattr(self, name)
+            rows = [i for i in rows if column[i] in codes]
+        if predicate is not None:
+            rows = [i for i in rows if predicate(self._row(i))]
+        return self.take(rows)
+
+    def sort(self, *columns: str, reverse: bool = False) -> "FindingTable":
+        """
+        A sorted copy, by `columns` (default: filepath, line, col).
+        """
+        keys = [self._sort_key(name) for name in (columns or ("filepath", "line", "col"))]
+        if len(keys) == 1:
+            key = keys[0].__getitem__
+        else:
+            key = lambda i: tuple(column[i] for column in keys)  # noqa: E731
+        return self.take(sorted(range(len(self)), key=key, reverse=reverse))
+
+    def group_by(self, name: str) -> Dict[Any, "FindingTable"]:
+        """Sub-tables per distinct value of one column, in first-seen order."""
+        column = self._codes[name] if name in self._codes else getattr(self, name)
+        groups: Dict[int, List[int]] = {}
+        for i, code in enumerate(column):
+            groups.setdefault(code, []).append(i)
+        return {self._decode(name, code): self.take(rows) for code, rows in groups.items()}
+
+    def count_by(self, name: str) -> Dict[Any, int]:
+        """Number of rows per distinct value of one column."""
+        column = self._codes[name] if name in self._codes else getattr(self, name)
+        return {self._decode(name, code): count for code, count in Counter(column).items()}
+
+    def _decode(self, name: str, code: int):
+        if name in self._codes:
+            return self._dictionaries[name].values[code]
+        return SEVERITIES[code] if name == "severity" else code
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """The JSON report shape of every row."""
+        return [finding.to_dict() for finding in self]
@@ -0,0 +1,348 @@
+"""
+Incremental Review
+------------------
+Re-reviews an edited buffer without re-running every agent on the
+whole file, for editors that review on every change.
+
+`IncrementalReview` keeps the previous document state. `apply(edits)`
+updates the Tree-sitter tree in place (`Tree.edit` + incremental
+`Parser.parse(old_tree)`) and splits the new text into top-level units
+(one function, class or statement each, with its leading comments).
+
+- Unit rules (the style rules registered with scope "unit", the
+  function metrics checks and the security patterns) depend only on a
+  unit's own text, so they are re-run for changed units only. Findings
+  of untouched units are kept and shifted to their new line numbers.
+- File rules (style rules of scope "file", such as unused imports)
+  are re-run on the whole buffer. They read the file's symbol table,
+  which is joined from per-unit symbols (rebuilt for changed units
+  only) instead of parsing the whole buffer again.
+- Taint analysis re-analyses only the edited functions and classes.
+  It falls back to a full pass when imports or module-level statements
+  changed, or when an edited function's summary changed.
+
+Units are matched to their previous state by text, so an edit that
+leaves a unit's text unchanged (such as lines inserted above it) only
+shifts its findings. Without Tree-sitter the whole buffer is one unit,
+which makes every edit a full review.
+
+The LLM agent is not part of incremental runs; request it separately.
+"""
+
+import ast
+from bisect import bisect_right
+from collections import defaultdict, deque
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence
+
+from .models import Finding, ReviewBundle
+from .parsing.ts_loader import TreeSitterUnavailable, get_parser, top_level_spans
+from .security.patterns import pattern_scan
+from .security.taint import TaintState, analyze_state, reanalyze
+from .source import LineIndex, SourceDocument
+from .static_analysis.complexity import run_complexity_checks
+from .static_analysis.style_rules import run_style_rules
+from .static_analysis.symbols import SymbolTable, UnitSymbols, set_symbol_table
+
+
+def _unit_style_rules(filepath: str, doc: SourceDocument) -> List[Finding]:
+    return run_style_rules(filepath, doc, scope="unit")
+
+
+def _file_style_rules(filepath: str, doc: SourceDocument) -> List[Finding]:
+    return run_style_rules(filepath, doc, scope="file")
+
+
+# Rules whose findings depend only on the text of one top-level unit
+UNIT_STATIC_CHECKS = (
+    _unit_style_rules,
+    run_complexity_checks,
+)
+
+# Rules that need the whole file (cheap enough to re-run on every edit)
+FILE_STATIC_CHECKS = (
+    _file_style_rules,
+)
+
+
+@dataclass
+class TextEdit:
+    """
+    Replace the text between two 0-based (line, character) positions,
+    like an LSP `TextDocumentContentChangeEvent`. Characters are counted
+    in Python string units. With no range, `text` replaces the buffer.
+    """
+    text: str
+    start_line: Optional[int] = None
+    start_character: int = 0
+    end_line: Optional[int] = None
+    end_character: int = 0
+
+
+@dataclass
+class _Unit:
+    """
+    One top-level unit and its findings, with unit-relative lines.
+    """
+    start_line: int
+    end_line: int
+    text: str
+    static: List[Finding]
+    security: List[Finding]
+    taint: List[Finding]
+    kind: str             # "function" | "class" | "other" | "broken"
+    name: Optional[str]
+    has_imports: bool
+    symbols: Optional[UnitSymbols] = None  # None when the unit does not parse
+    placed: Optional[tuple] = None  # (start_line, static, security) with absolute lines
+
+
+def _shift(findings: List[Finding], offset: int) -> List[Finding]:
+    if not offset:
+        return list(findings)
+    return [replace(f, line=f.line + offset) for f in findings]
+
+
+def _run_unit_rules(filepath: str, text: str, start_line: int) -> _Unit:
+    """
+    Run the unit rules on one unit and classify it for the taint pass.
+    """
+    doc = SourceDocument(filepath, text)
+    static: List[Finding] = []
+    for check in UNIT_STATIC_CHECKS:
+        static += check(filepath, doc)
+    security = pattern_scan(filepath, doc)
+
+    module = doc.ast_tree
+    symbols = None
+    if module is None:
+        kind, name, has_imports = "broken", None, False
+    else:
+        symbols = UnitSymbols.build(module.body)
+        body = module.body
+        if len(body) == 1 and isinstance(body[0], (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind, name = "function", body[0].name
+        elif len(body) == 1 and isinstance(body[0], ast.ClassDef):
+            kind, name = "class", body[0].name
+        else:
+            kind, name = "other", None
+        has_imports = any(isinstance(node, (ast.Import, ast.ImportFrom)) for node in ast.walk(module))
+
+    return _Unit(start_line, 0, text, static, security, [], kind, name, has_imports, symbols)
+
+
+class IncrementalReview:
+    """
+    Static and security findings for one buffer, kept up to date edit
+    by edit.
+    """
+
+    def __init__(self, filepath: str, code: str):
+        self.filepath = filepath
+        self.code = code
+        self._data = code.encode("utf-8")
+        try:
+            self._parser = get_parser()
+            self._tree = self._parser.parse(self._data)
+        except TreeSitterUnavailable:
+            self._parser = self._tree = None  # every edit is a full review
+        self._units: List[_Unit] = []
+        self._file_static: List[Finding] = []
+        self._taint_state: Optional[TaintState] = None
+        self._index: Optional[LineIndex] = None  # line index of the current text, if built
+        self._update(fresh=True)
+
+    # ------------------------------------
+    # Public API
+    # ------------------------------------
+    @property
+    def bundle(self) -> ReviewBundle:
+        """The current findings, with absolute line numbers."""
+        static: List[Finding] = []
+        security: List[Finding] = []
+        for unit in self._units:
+            # Units that did not move keep their already-shifted findings
+            if unit.placed is None or unit.placed[0] != unit.start_line:
+                offset = unit.start_line - 1
+                unit.placed = (
+                    unit.start_line,
+                    _shift(unit.static, offset),
+                    _shift(unit.security, offset) + _shift(unit.taint, offset),
+                )
+            static += unit.placed[1]
+            security += unit.placed[2]
+        static += self._file_static
+        static.sort(key=lambda f: f.line)
+        security.sort(key=lambda f: f.line)
+        return ReviewBundle(static_findings=static, security_findings=security, llm_comments=[])
+
+    def apply(self, edits: Sequence[TextEdit]) -> ReviewBundle:
+        """
+        Apply `edits` in order (each against the text left by the
+        previous one) and return the updated findings.
+        """
+        for edit in edits:
+            self._apply_edit(edit)
+        if self._parser is not None:
+            self._tree = self._parser.parse(self._data, self._tree)
+        self._update()
+        return self.bundle
+
+    # ------------------------------------
+    # Text and tree bookkeeping
+    # ------------------------------------
+    def _offset(self, index: LineIndex, line: int, character: int) -> int:
+        """Character offset of an LSP position, clamped to its line."""
+        if line >= len(index.starts):
+            return len(self.code)
+        start = index.starts[line]
+        line_end = index.starts[line + 1] - 1 if line + 1 < len(index.starts) else len(self.code)
+        return min(start + character, line_end)
+
+    def _byte(self, offset: int) -> int:
+        if len(self._data) == len(self.code):  # ASCII: characters are bytes
+            return offset
+        return len(self.code[:offset].encode("utf-8"))
+
+    def _point(self, offset: int):
+        """(row, byte column) of a character offset, as Tree-sitter expects."""
+        line_start = self.code.rfind("\n", 0, offset) + 1
+        column = self.code[line_start:offset]
+        return self.code.count("\n", 0, offset), len(column.encode("utf-8"))
+
+    def _apply_edit(self, edit: TextEdit):
+        index = self._index or LineIndex(self.code)
+        self._index = None
+        if edit.start_line is None:
+            start, end = 0, len(self.code)
+        else:
+            start = self._offset(index, edit.start_line, edit.start_character)
+            end = self._offset(index, edit.end_line, edit.end_character)
+            end = max(end, start)
+
+        start_byte, old_end_byte = self._byte(start), self._byte(end)
+        start_point, old_end_point = self._point(start), self._point(end)
+        inserted = edit.text.encode("utf-8")
+
+        newlines = edit.text.count("\n")
+        if newlines:
+            new_end_point = (start_point[0] + newlines, len(edit.text.rsplit("\n", 1)[1].encode("utf-8")))
+        else:
+            new_end_point = (start_point[0], start_point[1] + len(inserted))
+
+        self.code = self.code[:start] + edit.text + self.code[end:]
+        self._data = self._data[:start_byte] + inserted + self._data[old_end_byte:]
+        if self._tree is None:
+            return
+        self._tree.edit(
+            start_byte=start_byte,
+            old_end_byte=old_end_byte,
+            new_end_byte=start_byte + len(inserted),
+            start_point=start_point,
+            old_end_point=old_end_point,
+            new_end_point=new_end_point,
+        )
+
+    def _split_units(self, index: LineIndex):
+        """(start_line, end_line, text) of every unit, covering every line."""
+        total = len(index)
+        ranges = []
+        next_line = 1
+        spans = top_level_spans(self._tree) if self._tree is not None else []
+        for _, end in spans:
+            if end >= next_line:
+                ranges.append((next_line, min(end, total)))
+                next_line = end + 1
+        if next_line <= total:
+            ranges.append((next_line, total))
+
+        units = []
+        for start, end in ranges:
+            stop = index.starts[end] if end < total else len(self.code)
+            units.append((start, end, self.code[index.starts[start - 1]:stop]))
+        return units
+
+    # ------------------------------------
+    # Re-running rules
+    # ------------------------------------
+    def _update(self, fresh: bool = False):
+        doc = SourceDocument(self.filepath, self.code)
+        self._index = doc.line_index
+
+        # Match unchanged units to their previous state, in order
+        previous = defaultdict(deque)
+        for unit in self._units:
+            previous[unit.text].append(unit)
+
+        units: List[_Unit] = []
+        added: List[_Unit] = []
+        for start, end, text in self._split_units(doc.line_index):
+            old = previous[text].popleft() if previous.get(text) else None
+            if old is None:
+                unit = _run_unit_rules(self.filepath, text, start)
+                added.append(unit)
+            else:
+                unit = replace(old, start_line=start)
+            unit.end_line = end
+            units.append(unit)
+        removed = [unit for queue in previous.values() for unit in queue]
+        self._units = units
+
+        # File rules read a symbol table joined from the units' symbols
+        if all(unit.symbols is not None for unit in units):
+            set_symbol_table(doc, SymbolTable([(unit.start_line - 1, unit.symbols) for unit in units]))
+
+        self._file_static = []
+        for check in FILE_STATIC_CHECKS:
+            self._file_static += check(self.filepath, doc)
+
+        if fresh or not self._update_taint_incrementally(doc, added, removed):
+            self._update_taint_fully(doc)
+
+    def _assign_taint(self, findings: List[Finding], units: List[_Unit]):
+        """Store absolute-line taint findings on the units containing them."""
+        starts = [unit.start_line for unit in units]
+        for unit in units:
+            unit.taint = []
+            unit.placed = None
+        for finding in findings:
+            unit = units[max(0, bisect_right(starts, finding.line) - 1)]
+            unit.taint.append(replace(finding, line=finding.line - unit.start_line + 1))
+
+    def _update_taint_fully(self, doc: SourceDocument):
+        findings, self._taint_state = analyze_state(self.filepath, doc)
+        self._assign_taint(findings, self._units)
+
+    def _update_taint_incrementally(self, doc: SourceDocument, added: List[_Unit], removed: List[_Unit]) -> bool:
+        """
+        Re-analyse only edited functions and classes; False when a full
+        pass is needed instead.
+        """
+        if self._taint_state is None:
+            return False
+        changed = added + removed
+        if any(unit.kind not in ("function", "class") or unit.has_imports for unit in changed):
+            return False
+        # The set of top-level functions (what calls resolve to) must not change
+        names = sorted(unit.name for unit in self._units if unit.kind == "function")
+        if len(set(names)) != len(names) or set(names) != set(self._taint_state.functions):
+            return False
+        # ... nor may a class whose methods calls resolve to disappear
+        classes = {unit.name for unit in self._units if unit.kind == "class"}
+        if any(unit.kind == "class" and unit.name not in classes for unit in removed):
+            return False
+        if not added:
+            return True
+
+        nodes = []
+        for unit in added:
+            module = ast.parse(unit.text)
+            ast.increment_lineno(module, unit.start_line - 1)
+            nodes += module.body
+
+        result = reanalyze(self._taint_state, self.filepath, doc, nodes)
+        if result is None:
+            return False
+        findings, self._taint_state = result
+        self._assign_taint(findings, added)
+        return True
@@ -0,0 +1,99 @@
+"""
+LLM Reviewer — Response Cache
+-----------------------------
+Disk-backed cache of Gemini responses, so a byte-identical prompt
+(same model, same system style, same rendered user prompt) is never
+sent twice within the TTL.
+
+The CLI and the server turn the cache on (`configure_response_cache`);
+library callers get no cache, and so no writes under the user's home
+directory, unless they set one or GEMINI_CACHE=1.
+
+Configured from the environment:
+    GEMINI_CACHE          "0" disables the cache, "1" also enables it
+                          for library use (default: CLI only)
+    GEMINI_CACHE_TTL      entry lifetime in seconds (default: 7 days)
+    GEMINI_CACHE_MAX_MB   size before LRU eviction (default: 64)
+    REVIEWER_CACHE_DIR    shared cache directory
+"""
+
+import hashlib
+import os
+import threading
+from typing import Optional
+
+from ..cache import DEFAULT_CACHE_DIR, DiskLRU
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ResponseCache(DiskLRU):
+    """
+    Gemini responses keyed by a hash of (model, system prompt, user prompt).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl: Optional[float] = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(os.path.join(cache_dir, "llm_responses.sqlite3"), max_bytes, ttl)
+
+    @staticmethod
+    def key(model_name: str, system: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model_name, system, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @classmethod
+    def from_env(cls, cache_dir=None) -> "ResponseCache":
+        """Build a cache using the GEMINI_CACHE_* environment settings."""
+        return cls(
+            cache_dir or os.getenv("REVIEWER_CACHE_DIR", str(DEFAULT_CACHE_DIR)),
+            ttl=float(os.getenv("GEMINI_CACHE_TTL", DEFAULT_TTL)),
+            max_bytes=int(float(os.getenv("GEMINI_CACHE_MAX_MB", 64)) * 1024 * 1024),
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        payload = self.get_bytes(key)
+        return None if payload is None else payload.decode("utf-8")
+
+    def put(self, key: str, text: str):
+        self.put_bytes(key, text.encode("utf-8"))
+
+
+_UNSET = object()
+_default_cache = _UNSET
+_default_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Return the process-wide response cache (None when disabled, the
+    default outside the CLI).
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is _UNSET:
+            enabled = os.getenv("GEMINI_CACHE", "0") == "1"
+            _default_cache = ResponseCache.from_env() if enabled else None
+        return _default_cache
+
+
+def configure_response_cache(cache_dir=None, enabled: bool = True) -> Optional[ResponseCache]:
+    """
+    Turn the process-wide response cache on (unless `enabled` is False or
+    GEMINI_CACHE=0) and return it; used by the CLI commands.
+    """
+    cache = ResponseCache.from_env(cache_dir) if enabled and os.getenv("GEMINI_CACHE") != "0" else None
+    set_response_cache(cache)
+    return cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]):
+    """
+    Replace the process-wide response cache (pass None to disable it).
+    """
+    global _default_cache
+    with _default_lock:
+        _default_cache = cache
@@ -0,0 +1,98 @@
+"""
+LLM Reviewer — Chunking
+-----------------------
+Splits large files into prompt-sized chunks along top-level function
+and class boundaries, so every line of a big module reaches the model
+instead of being truncated.
+
+Boundaries come from the Tree-sitter tree (falling back to the `ast`
+tree, then to plain line windows). Comments and blank lines between
+definitions travel with the definition that follows them, and a single
+definition larger than the budget is cut into line windows.
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from ..parsing.ts_loader import top_level_spans as tree_sitter_spans
+from ..source import SourceDocument
+
+
+@dataclass
+class Chunk:
+    """
+    A contiguous, 1-based inclusive line range of a file.
+    """
+    start_line: int
+    end_line: int
+    text: str
+
+
+def top_level_spans(doc: SourceDocument) -> List[Tuple[int, int]]:
+    """
+    (start_line, end_line) of every top-level statement, 1-based.
+    """
+    tree = doc.ts_tree
+    if tree is not None:
+        return tree_sitter_spans(tree)
+
+    module = doc.ast_tree
+    if module is not None:
+        spans = []
+        for node in module.body:
+            decorators = getattr(node, "decorator_list", [])
+            start = min([node.lineno] + [d.lineno for d in decorators])
+            spans.append((start, node.end_lineno))
+        return spans
+
+    return []
+
+
+def split_chunks(doc: SourceDocument, max_chars: int) -> List[Chunk]:
+    """
+    Split `doc` into chunks of at most `max_chars` characters each.
+    """
+    index = doc.line_index
+    total = len(index)
+    if total == 0:
+        return []
+
+    def size(start: int, end: int) -> int:
+        stop = index.line_start(end + 1) if end < total else len(doc.code)
+        return stop - index.line_start(start)
+
+    # 1️⃣ Contiguous units covering every line, one per top-level statement
+    units = []
+    next_line = 1
+    for _, end in top_level_spans(doc):
+        if end >= next_line:
+            units.append((next_line, end))
+            next_line = end + 1
+    if next_line <= total:
+        units.append((next_line, total))
+
+    # 2️⃣ Oversized units are cut into line windows
+    pieces = []
+    for start, end in units:
+        if size(start, end) <= max_chars:
+            pieces.append((start, end))
+            continue
+        window_start = start
+        for line in range(start, end + 1):
+            if line > window_start and size(window_start, line) > max_chars:
+                pieces.append((window_start, line - 1))
+                window_start = line
+        pieces.append((window_start, end))
+
+    # 3️⃣ Greedily merge neighbours while they fit the budget
+    merged: List[Tuple[int, int]] = []
+    for start, end in pieces:
+        if merged and size(merged[-1][0], end) <= max_chars:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    return [
+        Chunk(start, end, doc.code[index.line_start(start):index.line_start(start) + size(start, end)])
+        for start, end in merged
+    ]
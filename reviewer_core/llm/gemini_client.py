@@ -4,63 +4,433 @@ LLM Reviewer — Gemini Client
 This module connects to the Google Gemini API and
 uses the SYSTEM and USER prompts to produce
 natural-language code reviews with contextual awareness.
+
+Successful responses are stored in the disk-backed ResponseCache, so an
+identical prompt is answered locally until its entry expires.
+
+Files larger than one prompt are split along top-level definitions and
+the chunks are reviewed concurrently, each anchored at its first line.
+
+For pull requests, `review_diff` sends only the changed hunks.
+
+With an `on_text` callback, `review_code` streams the reply and passes
+each piece of text on as Gemini produces it.
+
+Small files can be reviewed in batches: `review_batch` sends several
+files (with their condensed findings) in one delimited request and
+splits the reply back into per-file findings.
+
+Requests are sent through the LLM scheduler (rate limit, adaptive
+concurrency, retries, deadlines), most severe findings first; see
+`scheduler.py`. With GEMINI_API_ENDPOINT set, requests go to that base
+URL over Gemini's REST API instead of through the SDK (e.g. a proxy or
+a local fake endpoint for tests).
 """
 
+import hashlib
+import json
 import os
+import re
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
 import google.generativeai as genai
 from ..models import Finding
-from .prompts import SYSTEM_STYLE, USER_TEMPLATE
+from ..profiling import count, profiled, span
+from ..source import Source, SourceDocument
+from .cache import ResponseCache, get_response_cache
+from .chunking import Chunk, split_chunks
+from .scheduler import DEFAULT_PRIORITY, LLMError, LLMScheduler, get_scheduler, priority_of
+from .prompts import (
+    BATCH_FILE_TEMPLATE,
+    BATCH_TEMPLATE,
+    CHUNK_TEMPLATE,
+    DIFF_TEMPLATE,
+    SYSTEM_STYLE,
+    USER_TEMPLATE,
+)
 
+# Largest amount of code sent in one prompt; bigger files are chunked
+MAX_CODE_CHARS = 16000
 
-def review_code(filepath: str, code: str, static_findings, security_findings):
-    """
-    Use Gemini to perform a natural-language code review.
+# Chunk reviews of one large file in flight at once
+CHUNK_CONCURRENCY = int(os.getenv("GEMINI_CHUNK_CONCURRENCY", 4))
 
-    Args:
-        filepath (str): Path to file being reviewed.
-        code (str): The Python code content.
-        static_findings (list[Finding]): Style & complexity issues.
-        security_findings (list[Finding]): Security issues.
+# Rough prompt-size estimate used for batching (Gemini averages ~4 chars/token)
+CHARS_PER_TOKEN = 4
 
-    Returns:
-        list[Finding]: One or more LLM-generated review comments.
-    """
-    # Configure Gemini
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-pro")
-    model = genai.GenerativeModel(model_name)
+# (filepath, code, static_findings, security_findings)
+BatchItem = Tuple[str, str, list, list]
+
+# "Line N:" comment opener requested by CHUNK_TEMPLATE (also accepts
+# list bullets, bold, "L12" and ranges such as "Lines 12-14")
+_LINE_COMMENT = re.compile(
+    r"^[ \t]*(?:[-*][ \t]+)?\**(?:Lines?|L)[ \t]*(\d+)(?:[ \t]*[-–][ \t]*\d+)?\**[ \t]*[:.)]\**", re.M
+)
+
+# Reply section header requested by BATCH_TEMPLATE; the nonce keeps a
+# reviewed file from forging another file's section
+_FILE_HEADER = r"^=====\s*FILE\s+{nonce}:\s*(.+?)\s*=====\s*$"
 
-    # Condense static/security findings for LLM context
-    condensed = "\n".join(
+
+def _condense(static_findings, security_findings) -> str:
+    """
+    Condense static/security findings for LLM context.
+    """
+    return "\n".join(
         f"- [{f.severity.upper()}] {f.rule_id} (L{f.line}): {f.message}"
         for f in (static_findings + security_findings)[:40]
     ) or "(No issues detected by automated agents.)"
 
-    # Create the full user prompt
-    prompt = USER_TEMPLATE.format(
-        filepath=filepath,
-        condensed_findings=condensed,
-        code=code[:16000]  # limit for large files
+
+# ------------------------------------
+# Transports
+# ------------------------------------
+def _sdk_send(model, prompt: str, on_text: Optional[Callable[[str], None]], timeout: float) -> str:
+    """One request through the google-generativeai SDK."""
+    options = {"timeout": timeout}
+    if on_text is None:
+        return model.generate_content([SYSTEM_STYLE, prompt], request_options=options).text
+    pieces = []
+    for chunk in model.generate_content([SYSTEM_STYLE, prompt], stream=True, request_options=options):
+        if chunk.text:
+            pieces.append(chunk.text)
+            on_text(chunk.text)
+    return "".join(pieces)
+
+
+def _reply_text(data: dict) -> str:
+    candidates = data.get("candidates") or [{}]
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+def _retry_after(headers) -> Optional[float]:
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _rest_send(
+    endpoint: str, model_name: str, prompt: str, on_text: Optional[Callable[[str], None]], timeout: float
+) -> str:
+    """
+    One request to Gemini's REST API at `endpoint` (`generateContent`,
+    or `streamGenerateContent` as server-sent events with `on_text`).
+    """
+    method = "streamGenerateContent?alt=sse" if on_text is not None else "generateContent"
+    request = urllib.request.Request(
+        f"{endpoint.rstrip('/')}/v1beta/models/{model_name}:{method}",
+        data=json.dumps({"contents": [{"role": "user", "parts": [{"text": SYSTEM_STYLE}, {"text": prompt}]}]}).encode(),
+        headers={"Content-Type": "application/json", "x-goog-api-key": os.getenv("GEMINI_API_KEY") or ""},
+        method="POST",
     )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            if on_text is None:
+                return _reply_text(json.load(response))
+            pieces = []
+            for raw in response:
+                line = raw.decode("utf-8").strip()
+                if line.startswith("data:"):
+                    piece = _reply_text(json.loads(line[5:]))
+                    if piece:
+                        pieces.append(piece)
+                        on_text(piece)
+            return "".join(pieces)
+    except urllib.error.HTTPError as e:
+        detail = e.read().decode("utf-8", "replace")[:200]
+        raise LLMError(f"HTTP {e.code}: {detail}", status=e.code, retry_after=_retry_after(e.headers)) from None
+    except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+        raise LLMError(f"request failed: {getattr(e, 'reason', e)}", retryable=True) from None
+
+
+@profiled("llm.generate", "llm")
+def _generate(
+    prompt: str,
+    on_text: Optional[Callable[[str], None]] = None,
+    priority: int = DEFAULT_PRIORITY,
+    scheduler: Optional[LLMScheduler] = None,
+) -> Tuple[str, bool]:
+    """
+    Send one prompt to Gemini (or answer it from the response cache).
+
+    With `on_text`, the reply is streamed and each piece is passed to
+    `on_text` as it arrives (a cached reply arrives as one piece).
+    The request waits its turn in `scheduler` (default: the process-wide
+    one) at the given `priority`.
+
+    Returns:
+        (text, ok): `ok` is False when the text is an error message.
+    """
+    model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-pro")
+
+    # Identical prompts are answered from the response cache
+    cache = get_response_cache()
+    cache_key = ResponseCache.key(model_name, SYSTEM_STYLE, prompt)
+    text = cache.get(cache_key) if cache is not None else None
+    if cache is not None:
+        count(f"cache.llm.{'misses' if text is None else 'hits'}")
+    if text is not None:
+        if on_text is not None:
+            on_text(text)
+        return text, True
+
+    # Configure Gemini (the SDK, unless a REST endpoint is given)
+    endpoint = os.getenv("GEMINI_API_ENDPOINT")
+    model = None
+    if not endpoint:
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        model = genai.GenerativeModel(model_name)
+
+    streamed = []
+
+    def forward(piece: str):
+        streamed.append(piece)
+        on_text(piece)
+
+    def send(timeout: float) -> str:
+        count("llm.requests")
+        count("llm.prompt_bytes", len(prompt))
+        try:
+            if endpoint:
+                return _rest_send(endpoint, model_name, prompt, forward if on_text else None, timeout)
+            return _sdk_send(model, prompt, forward if on_text else None, timeout)
+        except Exception as e:
+            if streamed:  # part of the reply is already out: a retry would repeat it
+                raise LLMError(str(e), retryable=False) from e
+            raise
 
     # Combine system and user prompts
     print("🤖 Sending code to Gemini for review...")
-
     try:
-        response = model.generate_content([SYSTEM_STYLE, prompt])
-        text = response.text or "(No response from Gemini)"
+        with span("llm.request", "llm", model=model_name):
+            reply = (scheduler or get_scheduler()).run(send, priority)
+        text = reply or "(No response from Gemini)"
+        # Only real answers are cached — never errors or empty replies
+        if cache is not None and reply:
+            cache.put(cache_key, text)
+        return text, True
     except Exception as e:
-        text = f"⚠️ Gemini API error: {e}"
+        count("llm.errors")
+        return f"⚠️ Gemini API error: {e}", False
+
 
-    # Wrap LLM output in Finding format
-    llm_finding = Finding(
+def _llm_finding(filepath: str, text: str, line: int = 1, meta=None) -> Finding:
+    """
+    Wrap LLM output in Finding format.
+    """
+    return Finding(
         agent="llm",
         rule_id="LLM000",
         message=text.strip(),
         severity="info",
         filepath=filepath,
-        line=1,
+        line=line,
         col=1,
+        meta=meta,
+    )
+
+
+def review_code(
+    filepath: str,
+    code: Source,
+    static_findings,
+    security_findings,
+    on_text: Optional[Callable[[str], None]] = None,
+    scheduler: Optional[LLMScheduler] = None,
+):
+    """
+    Use Gemini to perform a natural-language code review.
+
+    Args:
+        filepath (str): Path to file being reviewed.
+        code (str | SourceDocument): The Python code content.
+        static_findings (list[Finding]): Style & complexity issues.
+        security_findings (list[Finding]): Security issues.
+        on_text (callable): Receives the reply text as it streams in.
+            Chunked reviews of large files are not streamed.
+        scheduler (LLMScheduler): Where the requests queue (default:
+            the process-wide scheduler).
+
+    Returns:
+        list[Finding]: One or more LLM-generated review comments.
+    """
+    doc = SourceDocument.of(filepath, code)
+    if len(doc.code) > MAX_CODE_CHARS:
+        return _review_chunks(filepath, doc, static_findings, security_findings, scheduler)
+
+    # Create the full user prompt
+    prompt = USER_TEMPLATE.format(
+        filepath=filepath,
+        condensed_findings=_condense(static_findings, security_findings),
+        code=doc.code,
     )
 
-    return [llm_finding]
+    text, _ = _generate(prompt, on_text, priority_of(static_findings, security_findings), scheduler)
+    return [_llm_finding(filepath, text)]
+
+
+# ------------------------------------
+# Chunked review of large files
+# ------------------------------------
+def _review_chunks(
+    filepath: str, doc: SourceDocument, static_findings, security_findings, scheduler: Optional[LLMScheduler] = None
+):
+    """
+    Review a large file chunk by chunk, concurrently.
+
+    Each chunk only sees the findings inside its own line range. Comments
+    the model opens with "Line N:" become findings on line N; the rest of
+    the reply is anchored at the chunk's first line.
+    """
+    chunks = split_chunks(doc, MAX_CODE_CHARS)
+    total_lines = len(doc.line_index)
+
+    def review_chunk(chunk: Chunk) -> List[Finding]:
+        def in_range(findings):
+            return [f for f in findings if chunk.start_line <= f.line <= chunk.end_line]
+
+        static, security = in_range(static_findings), in_range(security_findings)
+        prompt = CHUNK_TEMPLATE.format(
+            filepath=filepath,
+            start_line=chunk.start_line,
+            end_line=chunk.end_line,
+            total_lines=total_lines,
+            condensed_findings=_condense(static, security),
+            code=chunk.text,
+        )
+        text, ok = _generate(prompt, priority=priority_of(static, security), scheduler=scheduler)
+        general, by_line = split_line_comments(text, chunk.start_line, chunk.end_line) if ok else (text, [])
+        comments = [_llm_finding(filepath, comment, line=line) for line, comment in by_line]
+        if general or not comments:
+            meta = {"end_line": chunk.end_line}
+            comments.insert(0, _llm_finding(filepath, general, line=chunk.start_line, meta=meta))
+        return comments
+
+    with ThreadPoolExecutor(max_workers=max(1, min(CHUNK_CONCURRENCY, len(chunks)))) as pool:
+        return [comment for comments in pool.map(review_chunk, chunks) for comment in comments]
+
+
+def split_line_comments(text: str, start_line: int, end_line: int) -> Tuple[str, List[Tuple[int, str]]]:
+    """
+    Split a chunk review into its general text (before the first line
+    comment) and (line, comment) pairs, one per comment opened with a
+    line reference inside `start_line`..`end_line`. An opener pointing
+    outside the chunk does not start a comment of its own.
+    """
+    openers = [m for m in _LINE_COMMENT.finditer(text) if start_line <= int(m.group(1)) <= end_line]
+    if not openers:
+        return text.strip(), []
+    by_line = []
+    for i, opener in enumerate(openers):
+        end = openers[i + 1].start() if i + 1 < len(openers) else len(text)
+        by_line.append((int(opener.group(1)), text[opener.end():end].strip()))
+    return text[:openers[0].start()].strip(), by_line
+
+
+# ------------------------------------
+# Diff-scoped review
+# ------------------------------------
+def review_diff(filepath: str, hunks: str, first_line: int, static_findings, security_findings):
+    """
+    Review only the changed hunks of a file (unified diff text).
+
+    The comment is anchored at the first changed line.
+    """
+    prompt = DIFF_TEMPLATE.format(
+        filepath=filepath,
+        condensed_findings=_condense(static_findings, security_findings),
+        hunks=hunks,
+    )
+    text, _ = _generate(prompt, priority=priority_of(static_findings, security_findings))
+    return [_llm_finding(filepath, text, line=first_line)]
+
+
+# ------------------------------------
+# Batched review of small files
+# ------------------------------------
+def batch_nonce(items: Sequence[BatchItem]) -> str:
+    """
+    Delimiter nonce of one batch request: a hash of every file in it.
+
+    A file cannot contain a header carrying the hash of its own content,
+    and identical batches get identical prompts, so replies stay
+    cacheable.
+    """
+    digest = hashlib.sha256()
+    for filepath, code, _, _ in items:
+        for part in (filepath, str(code)):
+            digest.update(part.encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _batch_section(item: BatchItem, nonce: str) -> str:
+    filepath, code, static_findings, security_findings = item
+    return BATCH_FILE_TEMPLATE.format(
+        nonce=nonce,
+        filepath=filepath,
+        condensed_findings=_condense(static_findings, security_findings),
+        code=code,
+    )
+
+
+def estimate_tokens(text_or_chars) -> int:
+    """
+    Approximate token count of a string (or of a character count).
+    """
+    chars = text_or_chars if isinstance(text_or_chars, int) else len(text_or_chars)
+    return chars // CHARS_PER_TOKEN + 1
+
+
+def split_batch_reply(text: str, filepaths: Sequence[str], nonce: str) -> Dict[str, Optional[str]]:
+    """
+    Split a delimited batch reply into per-file review text. Only headers
+    carrying the request's `nonce` start a section.
+
+    Files the model did not answer map to None.
+    """
+    sections: Dict[str, Optional[str]] = {path: None for path in filepaths}
+    headers = list(re.finditer(_FILE_HEADER.format(nonce=re.escape(nonce)), text, re.M))
+    for i, header in enumerate(headers):
+        path = header.group(1).strip().strip("`\"'")
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        if path in sections:
+            sections[path] = text[header.end():end].strip()
+    return sections
+
+
+def review_batch(items: Sequence[BatchItem], scheduler: Optional[LLMScheduler] = None) -> Dict[str, List[Finding]]:
+    """
+    Review several small files with a single Gemini request (sent at the
+    priority of its most severe finding).
+
+    Returns:
+        dict[str, list[Finding]]: LLM comments keyed by file path.
+    """
+    if len(items) == 1:
+        filepath, code, static_findings, security_findings = items[0]
+        return {filepath: review_code(filepath, code, static_findings, security_findings, scheduler=scheduler)}
+
+    nonce = batch_nonce(items)
+    prompt = BATCH_TEMPLATE.format(
+        count=len(items),
+        nonce=nonce,
+        files="\n".join(_batch_section(item, nonce) for item in items),
+    )
+    priority = min(priority_of(static, security) for _, _, static, security in items)
+    text, ok = _generate(prompt, priority=priority, scheduler=scheduler)
+
+    filepaths = [item[0] for item in items]
+    if not ok:
+        return {path: [_llm_finding(path, text)] for path in filepaths}
+
+    sections = split_batch_reply(text, filepaths, nonce)
+    return {
+        path: [_llm_finding(path, section if section is not None else "(No comments)")]
+        for path, section in sections.items()
+    }
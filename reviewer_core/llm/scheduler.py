@@ -0,0 +1,451 @@
+"""
+LLM Reviewer — Request Scheduler
+--------------------------------
+Every Gemini request goes through an `LLMScheduler`, which decides when
+it is sent:
+
+- Rate limit: a token bucket allows `rate` requests per second on
+  average, with bursts of up to `burst`.
+- Adaptive concurrency (AIMD): the number of requests in flight grows by
+  about one per round of successful replies, up to `max_concurrency`,
+  and is halved whenever the API pushes back (429 or 5xx).
+- Retries: throttled, unavailable and timed-out requests are retried
+  with exponential backoff and full jitter (or after the server's
+  `Retry-After`, if longer), up to `max_attempts` attempts.
+- Deadlines: a request that cannot finish within its deadline (queueing
+  and retries included) fails with `DeadlineExceeded` instead of
+  waiting forever. The time left is passed to the transport; if a call
+  still outlives it, the request is abandoned: its slot is released and
+  a new worker replaces the one left blocked in the call.
+- Priority: queued requests are sent lowest `priority` first (files with
+  error-severity findings before the rest), in submission order within
+  one priority.
+
+Requests are callables taking the time left before their deadline (in
+seconds, for the transport's own timeout). They raise `LLMError` with
+the HTTP status when the API refuses them; any other exception is
+treated as final unless it is a timeout or a connection error.
+
+Settings come from the environment: GEMINI_RPS, GEMINI_BURST,
+GEMINI_MAX_CONCURRENCY, GEMINI_MAX_ATTEMPTS and GEMINI_DEADLINE.
+"""
+
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from ..profiling import count
+
+# HTTP statuses worth retrying, and those that mean "slow down"
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Error-severity findings first, then warnings, then the rest
+SEVERITY_PRIORITY = {"error": 0, "warning": 1}
+DEFAULT_PRIORITY = 2
+
+
+class LLMError(Exception):
+    """
+    A request the API refused or that failed in transit.
+
+    `status` is the HTTP status (None for transport errors),
+    `retry_after` the server's requested wait in seconds, and
+    `retryable` overrides the status-based decision when set.
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None,
+                 retry_after: Optional[float] = None, retryable: Optional[bool] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+class DeadlineExceeded(LLMError):
+    """The request's deadline passed before it could complete."""
+
+    def __init__(self, message: str = "deadline exceeded"):
+        super().__init__(message, retryable=False)
+
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """HTTP status of an error (ours or google.api_core's `.code`)."""
+    status = getattr(exc, "status", None)
+    if status is None:
+        status = getattr(exc, "code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    retryable = getattr(exc, "retryable", None)
+    if retryable is not None:
+        return retryable
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRY_STATUSES
+    return isinstance(exc, (TimeoutError, ConnectionError))
+
+
+def is_throttle(exc: BaseException) -> bool:
+    return error_status(exc) in THROTTLE_STATUSES
+
+
+def priority_of(*finding_lists) -> int:
+    """Scheduling priority of a request about these findings."""
+    return min(
+        (SEVERITY_PRIORITY.get(f.severity, DEFAULT_PRIORITY) for findings in finding_lists for f in findings),
+        default=DEFAULT_PRIORITY,
+    )
+
+
+# ------------------------------------
+# Rate limit
+# ------------------------------------
+class TokenBucket:
+    """
+    `rate` tokens per second, holding at most `burst`. A rate of 0 or
+    less disables the limit.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """
+        Take one token and return how long to wait before using it (0
+        when one was available). Tokens may be borrowed from the future,
+        so concurrent callers get successive slots.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(self.clock())
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds: float):
+        """Hand out no token for `seconds` (e.g. a server's Retry-After)."""
+        if self.rate <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self._refill(self.clock())
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+# ------------------------------------
+# Adaptive concurrency
+# ------------------------------------
+class AIMDLimit:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+    """
+
+    def __init__(self, initial: float, minimum: int = 1, maximum: int = 4, decrease: float = 0.5):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.decrease = decrease
+        self.value = float(min(max(initial, minimum), self.maximum))
+
+    @property
+    def current(self) -> int:
+        return int(self.value)
+
+    def on_success(self):
+        # +1 per `value` successes: about one more slot per round of replies
+        self.value = min(self.maximum, self.value + 1.0 / self.value)
+
+    def on_throttle(self):
+        self.value = max(self.minimum, self.value * self.decrease)
+
+
+# ------------------------------------
+# Scheduler
+# ------------------------------------
+@dataclass(order=True)
+class _Request:
+    priority: int
+    seq: int
+    call: Callable[[float], Any] = field(compare=False)
+    deadline: float = field(compare=False)
+    future: Future = field(compare=False)
+    attempt: int = field(default=0, compare=False)
+    not_before: float = field(default=0.0, compare=False)
+    worker: Optional[threading.Thread] = field(default=None, compare=False)  # while it is being sent
+    abandoned: bool = field(default=False, compare=False)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class LLMScheduler:
+    """
+    Sends requests through a rate limit and an adaptive concurrency
+    limit, highest priority first, retrying transient failures.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: float = 4.0,
+        max_concurrency: int = 4,
+        initial_concurrency: Optional[int] = None,
+        max_attempts: int = 4,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        deadline: float = 120.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+    ):
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.limit = AIMDLimit(initial_concurrency or max_concurrency, 1, max_concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.deadline = deadline
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+
+        self._queue: List[_Request] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._workers: List[threading.Thread] = []
+        self._worker_ids = itertools.count()
+        self._closed = False
+
+    @classmethod
+    def from_env(cls, **overrides) -> "LLMScheduler":
+        settings = dict(
+            rate=_env_float("GEMINI_RPS", 2.0),
+            burst=_env_float("GEMINI_BURST", 4.0),
+            max_concurrency=int(_env_float("GEMINI_MAX_CONCURRENCY", 4)),
+            max_attempts=int(_env_float("GEMINI_MAX_ATTEMPTS", 4)),
+            deadline=_env_float("GEMINI_DEADLINE", 120.0),
+        )
+        settings.update(overrides)
+        return cls(**settings)
+
+    # ------------------------------------
+    # Public API
+    # ------------------------------------
+    def submit(self, call: Callable[[float], Any], priority: int = DEFAULT_PRIORITY,
+               deadline: Optional[float] = None) -> Future:
+        """
+        Queue `call` and return a Future for its result. `deadline` is in
+        seconds from now (default: the scheduler's).
+        """
+        return self._enqueue(call, priority, deadline).future
+
+    def run(self, call: Callable[[float], Any], priority: int = DEFAULT_PRIORITY,
+            deadline: Optional[float] = None) -> Any:
+        """Submit `call` and wait for its result (or its final error)."""
+        budget = self.deadline if deadline is None else deadline
+        request = self._enqueue(call, priority, budget)
+        try:
+            return request.future.result(timeout=budget + 1.0)
+        except FutureTimeout:
+            self._abandon(request)
+            count("llm.deadline_exceeded")
+            raise DeadlineExceeded(f"no reply within {budget:g}s") from None
+
+    def close(self):
+        """Finish the queued requests, then stop the workers."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    # ------------------------------------
+    # Workers
+    # ------------------------------------
+    def _enqueue(self, call: Callable[[float], Any], priority: int, deadline: Optional[float]) -> _Request:
+        request = _Request(
+            priority=priority,
+            seq=next(self._seq),
+            call=call,
+            deadline=self.clock() + (self.deadline if deadline is None else deadline),
+            future=Future(),
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is closed")
+            self._queue.append(request)
+            self._start_workers()
+            self._cond.notify_all()
+        return request
+
+    def _abandon(self, request: _Request):
+        """
+        Forget a request its caller gave up on. If a worker is still
+        blocked in its call, the slot is released and a new worker takes
+        its place; the old one exits once the call returns.
+        """
+        request.future.cancel()
+        with self._cond:
+            request.abandoned = True
+            if request in self._queue:
+                self._queue.remove(request)  # a retry still backing off
+            worker, request.worker = request.worker, None
+            if worker is not None:
+                self._in_flight -= 1
+                self._workers.remove(worker)
+                self._start_workers()
+            self._cond.notify_all()
+
+    def _start_workers(self):
+        # One thread per slot the limit may ever open
+        while len(self._workers) < self.limit.maximum:
+            name = f"llm-scheduler-{next(self._worker_ids)}"
+            worker = threading.Thread(target=self._work, name=name, daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _next(self) -> Optional[_Request]:
+        """Wait for a request that may be sent now (None: shut down)."""
+        with self._cond:
+            while True:
+                if self._closed and not self._queue:
+                    return None
+                now = self.clock()
+                wake = None
+                if self._in_flight < self.limit.current and self._queue:
+                    # Highest priority first, skipping retries still backing off
+                    ready = [request for request in self._queue if request.not_before <= now]
+                    if ready:
+                        request = min(ready)
+                        self._queue.remove(request)
+                        self._in_flight += 1
+                        request.worker = threading.current_thread()
+                        return request
+                    wake = min(request.not_before for request in self._queue)
+                self._cond.wait(None if wake is None else wake - now)
+
+    def _work(self):
+        while True:
+            request = self._next()
+            if request is None:
+                return
+            try:
+                self._send(request)
+            finally:
+                with self._cond:
+                    abandoned = request.worker is None  # its slot already went to a new worker
+                    request.worker = None
+                    if not abandoned:
+                        self._in_flight -= 1
+                        self._cond.notify_all()
+            if abandoned:
+                return
+
+    def _send(self, request: _Request):
+        future = request.future
+        if request.attempt == 0 and not future.set_running_or_notify_cancel():
+            return  # the caller gave up
+
+        wait = self.bucket.reserve()
+        if wait:
+            count("llm.rate_limited")
+            self.sleep(min(wait, max(0.0, request.deadline - self.clock())))
+        remaining = request.deadline - self.clock()
+        if remaining <= 0:
+            count("llm.deadline_exceeded")
+            future.set_exception(DeadlineExceeded())
+            return
+
+        try:
+            result = request.call(remaining)
+        except Exception as e:
+            self._failed(request, e)
+        else:
+            with self._cond:
+                self.limit.on_success()
+            future.set_result(result)
+
+    def _failed(self, request: _Request, error: Exception):
+        if is_throttle(error):
+            count("llm.throttled")
+            with self._cond:
+                self.limit.on_throttle()
+        retry_after = getattr(error, "retry_after", None) or 0.0
+        if retry_after:
+            self.bucket.pause(retry_after)
+
+        request.attempt += 1
+        delay = max(retry_after, self._backoff(request.attempt))
+        now = self.clock()
+        if not is_retryable(error) or request.attempt >= self.max_attempts:
+            request.future.set_exception(error)
+            return
+        if now + delay >= request.deadline:
+            count("llm.deadline_exceeded")
+            request.future.set_exception(DeadlineExceeded(f"deadline exceeded after: {error}"))
+            return
+
+        # Back in the queue, keeping its place by priority and submission order
+        count("llm.retries")
+        request.not_before = now + delay
+        with self._cond:
+            if request.abandoned:
+                return
+            self._queue.append(request)
+            self._cond.notify_all()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(cap, base * 2^attempt))."""
+        return self.rng.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+
+# ------------------------------------
+# Process-wide scheduler
+# ------------------------------------
+_default_scheduler: Optional[LLMScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """
+    Return the process-wide scheduler, created from the environment on
+    first use.
+    """
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = LLMScheduler.from_env()
+        return _default_scheduler
+
+
+def set_scheduler(scheduler: Optional[LLMScheduler]):
+    """
+    Replace the process-wide scheduler (None: recreate it from the
+    environment on next use).
+    """
+    global _default_scheduler
+    with _default_lock:
+        _default_scheduler = scheduler
@@ -1,13 +1,19 @@
+import sys
 from dataclasses import dataclass
-from typing import List, Optional, Literal, Dict, Any
+from typing import Optional, Literal, Dict, Any, Sequence
 
 # Define possible severity levels
 Severity = Literal["info", "warning", "error"]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Finding:
     """
     Represents a single issue or comment found by an agent.
+
+    Immutable and slotted (no per-instance `__dict__`); the short,
+    highly repetitive strings are interned so millions of findings share
+    one copy of each agent, rule ID, severity and path. Use
+    `dataclasses.replace` to derive a changed copy.
     """
     agent: str                # e.g. "static", "security", "llm"
     rule_id: str              # e.g. "S101" or "SEC003"
@@ -20,11 +26,50 @@ class Finding:
     suggestion: Optional[str] = None    # Suggested fix or improvement
     meta: Optional[Dict[str, Any]] = None  # Optional extra metadata
 
+    def __post_init__(self):
+        for name in ("agent", "rule_id", "severity", "filepath"):
+            value = getattr(self, name)
+            if type(value) is str:
+                object.__setattr__(self, name, sys.intern(value))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Field name → value, in declaration order (the JSON report shape)."""
+        return {name: getattr(self, name) for name in FINDING_FIELDS}
+
+
+FINDING_FIELDS = tuple(Finding.__dataclass_fields__)
+
 @dataclass
 class ReviewBundle:
     """
     Stores the combined output of all three agents.
+
+    Each field is a sequence of findings: a list, or a columnar
+    `FindingTable` that never materializes per-finding objects.
+    """
+    static_findings: Sequence[Finding]
+    security_findings: Sequence[Finding]
+    llm_comments: Sequence[Finding]
+
+@dataclass
+class ReviewEvent:
+    """
+    One step of a streaming review, emitted as soon as it happens.
     """
-    static_findings: List[Finding]
-    security_findings: List[Finding]
-    llm_comments: List[Finding]
+    kind: str                 # "agent_started" | "finding" | "llm_text" | "agent_finished" | "done"
+    filepath: str             # File being reviewed
+    agent: Optional[str] = None         # "static" | "security" | "llm"
+    finding: Optional[Finding] = None   # for "finding"
+    text: Optional[str] = None          # for "llm_text": the newly generated text
+    bundle: Optional[ReviewBundle] = None  # for "done": the complete review
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form (the final bundle is omitted: its findings were already sent)."""
+        event: Dict[str, Any] = {"event": self.kind, "filepath": self.filepath}
+        if self.agent is not None:
+            event["agent"] = self.agent
+        if self.finding is not None:
+            event["finding"] = self.finding.to_dict()
+        if self.text is not None:
+            event["text"] = self.text
+        return event
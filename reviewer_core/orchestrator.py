@@ -8,35 +8,86 @@ This module coordinates all agents:
 
 It collects findings from each, merges them,
 and returns a combined review bundle.
+
+The static and security agents run in parallel. The LLM request starts
+as soon as both have finished, because their findings are its prompt
+context. With `eager_llm=True` it starts immediately without that
+context, overlapping the slow network call with the local agents.
+
+`stream_review` yields `ReviewEvent`s instead: each agent's findings as
+soon as that agent finishes, and the LLM's reply text as it streams in.
 """
 
+import asyncio
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import AsyncIterator, Iterator, Optional
+
+from .cache import FindingsCache, run_cached
 from .static_analysis.runner import run_static
 from .security.runner import run_security
 from .llm.gemini_client import review_code
-from .models import ReviewBundle
+from .models import ReviewBundle, ReviewEvent
+from .source import Source, SourceDocument
+
+
+def _static_agent(filepath: str, doc: SourceDocument, cache: Optional[FindingsCache] = None):
+    print("🔍 Running Static Analysis...")
+    findings = run_cached(cache, "static", run_static, filepath, doc)
+    print(f"✅ Static analysis completed — {len(findings)} issues found.")
+    return findings
+
+
+def _security_agent(filepath: str, doc: SourceDocument, cache: Optional[FindingsCache] = None):
+    print("🛡️ Running Security Analysis...")
+    findings = run_cached(cache, "security", run_security, filepath, doc)
+    print(f"✅ Security scan completed — {len(findings)} warnings found.")
+    return findings
+
+
+def _llm_agent(filepath: str, doc: SourceDocument, static_findings, security_findings):
+    print("🤖 Requesting LLM review from Gemini...")
+    comments = review_code(filepath, doc, static_findings, security_findings)
+    print("✅ LLM review completed.")
+    return comments
 
 
-def review_file(filepath: str, code: str) -> ReviewBundle:
+def review_file(
+    filepath: str,
+    code: Source,
+    eager_llm: bool = False,
+    cache: Optional[FindingsCache] = None,
+) -> ReviewBundle:
     """
     Run static analysis, security scanning, and LLM review
     for the provided code, returning a unified ReviewBundle.
+
+    The code is wrapped in a single SourceDocument shared by every
+    agent, so it is split, tokenized and parsed at most once.
+
+    Args:
+        eager_llm (bool): Start the LLM request right away, without
+            the static/security findings as prompt context.
+        cache (FindingsCache): Reuse stored static/security findings
+            for unchanged content.
     """
     print(f"📄 Reviewing file: {filepath}")
+    doc = SourceDocument.of(filepath, code)
 
-    # 1️⃣ Static Analysis
-    print("🔍 Running Static Analysis...")
-    static_findings = run_static(filepath, code)
-    print(f"✅ Static analysis completed — {len(static_findings)} issues found.")
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="review-agent") as pool:
+        # 1️⃣ + 2️⃣ Local agents in parallel (and the LLM too, in eager mode)
+        static_future = pool.submit(_static_agent, filepath, doc, cache)
+        security_future = pool.submit(_security_agent, filepath, doc, cache)
+        llm_future = pool.submit(_llm_agent, filepath, doc, [], []) if eager_llm else None
 
-    # 2️⃣ Security Analysis
-    print("🛡️ Running Security Analysis...")
-    security_findings = run_security(filepath, code)
-    print(f"✅ Security scan completed — {len(security_findings)} warnings found.")
+        static_findings = static_future.result()
+        security_findings = security_future.result()
 
-    # 3️⃣ LLM Review
-    print("🤖 Requesting LLM review from Gemini...")
-    llm_comments = review_code(filepath, code, static_findings, security_findings)
-    print("✅ LLM review completed.")
+        # 3️⃣ LLM Review, as soon as its context is ready
+        if llm_future is None:
+            llm_future = pool.submit(_llm_agent, filepath, doc, static_findings, security_findings)
+        llm_comments = llm_future.result()
 
     # 4️⃣ Combine everything
     bundle = ReviewBundle(
@@ -47,3 +98,137 @@ def review_file(filepath: str, code: str) -> ReviewBundle:
 
     print("\n📦 All agents finished successfully.\n")
     return bundle
+
+
+async def review_file_async(
+    filepath: str,
+    code: Source,
+    eager_llm: bool = False,
+    cache: Optional[FindingsCache] = None,
+) -> ReviewBundle:
+    """
+    Asyncio counterpart of `review_file`; agents run in worker threads.
+    """
+    print(f"📄 Reviewing file: {filepath}")
+    doc = SourceDocument.of(filepath, code)
+
+    local = asyncio.gather(
+        asyncio.to_thread(_static_agent, filepath, doc, cache),
+        asyncio.to_thread(_security_agent, filepath, doc, cache),
+    )
+    llm = asyncio.ensure_future(asyncio.to_thread(_llm_agent, filepath, doc, [], [])) if eager_llm else None
+
+    static_findings, security_findings = await local
+    if llm is None:
+        llm_comments = await asyncio.to_thread(
+            _llm_agent, filepath, doc, static_findings, security_findings
+        )
+    else:
+        llm_comments = await llm
+
+    bundle = ReviewBundle(
+        static_findings=static_findings,
+        security_findings=security_findings,
+        llm_comments=llm_comments,
+    )
+
+    print("\n📦 All agents finished successfully.\n")
+    return bundle
+
+
+# ------------------------------------
+# Streaming review
+# ------------------------------------
+_END = object()
+
+
+def stream_review(
+    filepath: str,
+    code: Source,
+    llm: bool = True,
+    eager_llm: bool = False,
+    cache: Optional[FindingsCache] = None,
+) -> Iterator[ReviewEvent]:
+    """
+    Review like `review_file`, but yield events as they happen.
+
+    Static and security findings are yielded when their agent finishes,
+    the LLM reply as `llm_text` pieces while Gemini generates it, and a
+    final `done` event carries the complete ReviewBundle.
+
+    Closing the iterator early abandons the review without waiting for
+    the agents still running.
+    """
+    doc = SourceDocument.of(filepath, code)
+    events: "queue.Queue" = queue.Queue()
+    put = events.put
+
+    def local_agent(agent, run):
+        put(ReviewEvent("agent_started", filepath, agent))
+        findings = run(filepath, doc, cache)
+        for finding in findings:
+            put(ReviewEvent("finding", filepath, agent, finding=finding))
+        put(ReviewEvent("agent_finished", filepath, agent))
+        return findings
+
+    def llm_agent(static_findings, security_findings):
+        put(ReviewEvent("agent_started", filepath, "llm"))
+        comments = review_code(
+            filepath, doc, static_findings, security_findings,
+            on_text=lambda text: put(ReviewEvent("llm_text", filepath, "llm", text=text)),
+        )
+        for comment in comments:
+            put(ReviewEvent("finding", filepath, "llm", finding=comment))
+        put(ReviewEvent("agent_finished", filepath, "llm"))
+        return comments
+
+    def run_all(pool):
+        try:
+            static_future = pool.submit(local_agent, "static", _static_agent)
+            security_future = pool.submit(local_agent, "security", _security_agent)
+            llm_future = pool.submit(llm_agent, [], []) if llm and eager_llm else None
+            static_findings = static_future.result()
+            security_findings = security_future.result()
+            if llm and llm_future is None:
+                llm_future = pool.submit(llm_agent, static_findings, security_findings)
+            llm_comments = llm_future.result() if llm_future is not None else []
+            bundle = ReviewBundle(static_findings, security_findings, llm_comments)
+            put(ReviewEvent("done", filepath, bundle=bundle))
+        except BaseException as e:
+            put(e)
+        finally:
+            put(_END)
+
+    pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="review-agent")
+    pool.submit(run_all, pool)
+    try:
+        while True:
+            event = events.get()
+            if event is _END:
+                return
+            if isinstance(event, BaseException):
+                raise event
+            yield event
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def stream_review_async(
+    filepath: str,
+    code: Source,
+    llm: bool = True,
+    eager_llm: bool = False,
+    cache: Optional[FindingsCache] = None,
+) -> AsyncIterator[ReviewEvent]:
+    """
+    Asyncio counterpart of `stream_review`.
+    """
+    events = stream_review(filepath, code, llm=llm, eager_llm=eager_llm, cache=cache)
+    try:
+        while True:
+            event = await asyncio.to_thread(next, events, _END)
+            if event is _END:
+                return
+            yield event
+    finally:
+        events.close()
@@ -3,6 +3,7 @@ Parsing Submodule
 -----------------
 Handles code parsing and syntax analysis using Tree-sitter.
 Used by static and security agents for advanced pattern recognition.
+The grammar is only loaded the first time something is parsed.
 """
 
-from .ts_loader import parse_code
+from .ts_loader import TreeSitterUnavailable, get_language, get_parser, parse_python, top_level_spans
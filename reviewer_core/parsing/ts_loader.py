@@ -2,45 +2,91 @@
 Tree-sitter Loader
 ------------------
 This module initializes Tree-sitter for Python parsing.
-It automatically clones the grammar if missing, builds it once,
-and exposes a helper to parse Python source code into an AST.
+
+Nothing is loaded at import time: the grammar is resolved on first use
+and cached for the life of the process. It comes from the prebuilt
+`tree_sitter_python` package, or from a previously built shared library
+(`build.so`, old `tree_sitter` API). No subprocess is run and nothing is
+fetched from the network; when neither grammar is present, parsing
+raises `TreeSitterUnavailable` and callers fall back to the `ast` module.
+
+Parsers are not thread-safe, so each thread gets its own.
 """
 
-import subprocess
+import threading
 from pathlib import Path
-from tree_sitter import Language, Parser
 
 # Paths
 BASE_DIR = Path(__file__).resolve().parent
 LIB_PATH = BASE_DIR / "build.so"
-VENDOR_DIR = BASE_DIR.parent.parent / "vendor"
-PY_LANG_DIR = VENDOR_DIR / "tree-sitter-python"
-
-# Ensure vendor folder exists
-VENDOR_DIR.mkdir(parents=True, exist_ok=True)
-
-# Step 1: Clone tree-sitter-python grammar if not present
-if not PY_LANG_DIR.exists():
-    print("📦 Cloning tree-sitter-python grammar...")
-    subprocess.run(
-        ["git", "clone", "https://github.com/tree-sitter/tree-sitter-python", str(PY_LANG_DIR)],
-        check=True
-    )
 
-# Step 2: Build a language library if not built yet
-if not LIB_PATH.exists():
-    print("🔨 Building Tree-sitter language library...")
-    Language.build_library(
-        str(LIB_PATH),
-        [str(PY_LANG_DIR)]
+
+class TreeSitterUnavailable(RuntimeError):
+    """Raised when no Python grammar can be loaded."""
+
+
+_UNSET = object()
+_language = _UNSET
+_language_lock = threading.Lock()
+_local = threading.local()
+
+
+def _load_language():
+    from tree_sitter import Language
+
+    # 1️⃣ Prebuilt grammar wheel
+    try:
+        import tree_sitter_python
+        return Language(tree_sitter_python.language())
+    except ImportError:
+        pass
+
+    # 2️⃣ Shared library built by an older setup (tree_sitter < 0.22)
+    if LIB_PATH.exists():
+        return Language(str(LIB_PATH), "python")
+
+    raise TreeSitterUnavailable(
+        "no Python grammar found — install it with `pip install tree-sitter-python`"
     )
 
-# Step 3: Load Python language
-PY_LANGUAGE = Language(str(LIB_PATH), "python")
 
-# Step 4: Initialize parser
-_parser = Parser()
-_parser.set_language(PY_LANGUAGE)
+def get_language():
+    """
+    Return the Python grammar, loading it on first call.
+
+    A failure is cached too, so a missing grammar is reported once.
+    """
+    global _language
+    if _language is _UNSET:
+        with _language_lock:
+            if _language is _UNSET:
+                try:
+                    _language = _load_language()
+                except Exception as e:
+                    print(f"⚠️ Tree-sitter unavailable: {e}")
+                    _language = e if isinstance(e, TreeSitterUnavailable) else TreeSitterUnavailable(str(e))
+    if isinstance(_language, TreeSitterUnavailable):
+        raise _language
+    return _language
+
+
+def get_parser():
+    """
+    Return this thread's Tree-sitter parser for Python.
+    """
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        from tree_sitter import Parser
+
+        language = get_language()
+        try:
+            parser = Parser(language)
+        except TypeError:  # tree_sitter < 0.22
+            parser = Parser()
+            parser.set_language(language)
+        _local.parser = parser
+    return parser
+
 
 def parse_python(code: str):
     """
@@ -50,10 +96,24 @@ def parse_python(code: str):
         code (str): Python source code.
     Returns:
         tree (tree_sitter.Tree): The parsed syntax tree.
+    Raises:
+        TreeSitterUnavailable: If no Python grammar is installed.
     """
     if not isinstance(code, bytes):
         code = code.encode("utf-8")
-    return _parser.parse(code)
+    return get_parser().parse(code)
+
+def top_level_spans(tree):
+    """
+    (start_line, end_line) of every top-level node of `tree`, 1-based.
+    """
+    spans = []
+    for node in tree.root_node.children:
+        (start_row, _), (end_row, end_col) = node.start_point, node.end_point
+        if end_col == 0 and end_row > start_row:
+            end_row -= 1  # node ends at the start of the next line
+        spans.append((start_row + 1, end_row + 1))
+    return spans
 
 
 
@@ -0,0 +1,293 @@
+"""
+Profiling
+---------
+Lightweight instrumentation for finding out where a review spends its
+time.
+
+- `span(name, category)` times a block; `@profiled(name)` times every
+  call of a function. Spans nest: each records its total time and its
+  self time (total minus the time of the spans inside it).
+- `count(name, n)` adds to a counter (bytes scanned, matches, cache
+  hits, ...).
+- `add_time(name, seconds, calls)` records time measured elsewhere, e.g.
+  the accumulated matching time of each security regex.
+
+Profiling is off until `enable()` is called. While it is off, `span`
+returns a shared no-op context manager and `count` returns immediately,
+so the hooks cost one global lookup each.
+
+A `Profiler` aggregates per-name statistics and, when created with
+`trace=True`, also keeps every span as a Chrome trace event
+(`chrome://tracing` / Perfetto). Worker processes ship their data to the
+parent with `drain()` / `merge()`.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class SpanStats:
+    """Aggregated timings of every span with one name (nanoseconds)."""
+
+    category: str
+    calls: int = 0
+    total_ns: int = 0
+    self_ns: int = 0
+    max_ns: int = 0
+
+    def add(self, calls: int, total_ns: int, self_ns: int, max_ns: int):
+        self.calls += calls
+        self.total_ns += total_ns
+        self.self_ns += self_ns
+        self.max_ns = max(self.max_ns, max_ns)
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "category", "args", "start", "children")
+
+    def __init__(self, profiler: "Profiler", name: str, category: str, args: Optional[dict]):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+        self.children = 0
+
+    def __enter__(self):
+        self.profiler._stack().append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter_ns() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children += duration
+        self.profiler._record(self, duration)
+
+
+class _NoSpan:
+    """The span handed out while profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Profiler:
+    """
+    Collects span statistics, counters and (optionally) trace events.
+    Safe to use from several threads at once.
+    """
+
+    def __init__(self, trace: bool = False):
+        self.trace = trace
+        self.stats: Dict[str, SpanStats] = {}
+        self.counters: Counter = Counter()
+        self.events: List[dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[_Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str, category: str = "rule", args: Optional[dict] = None) -> _Span:
+        return _Span(self, name, category, args)
+
+    def _record(self, span: _Span, duration: int):
+        with self._lock:
+            stats = self.stats.get(span.name)
+            if stats is None:
+                stats = self.stats[span.name] = SpanStats(span.category)
+            stats.add(1, duration, duration - span.children, duration)
+            if self.trace:
+                event = {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start / 1000,
+                    "dur": duration / 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+                if span.args:
+                    event["args"] = span.args
+                self.events.append(event)
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def add_time(self, name: str, seconds: float, calls: int = 1, category: str = "rule"):
+        ns = int(seconds * 1e9)
+        stack = self._stack()
+        if stack:
+            stack[-1].children += ns  # it was spent inside the open span
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = SpanStats(category)
+            stats.add(calls, ns, ns, ns)
+
+    # ------------------------------------
+    # Moving data between processes
+    # ------------------------------------
+    def drain(self) -> Dict[str, Any]:
+        """Return everything collected so far (picklable) and reset."""
+        with self._lock:
+            data = {
+                "stats": {
+                    name: (s.category, s.calls, s.total_ns, s.self_ns, s.max_ns)
+                    for name, s in self.stats.items()
+                },
+                "counters": dict(self.counters),
+                "events": self.events,
+            }
+            self.stats, self.counters, self.events = {}, Counter(), []
+        return data
+
+    def merge(self, data: Optional[Dict[str, Any]]):
+        """Add what another profiler `drain()`ed."""
+        if not data:
+            return
+        with self._lock:
+            for name, (category, calls, total_ns, self_ns, max_ns) in data["stats"].items():
+                stats = self.stats.get(name)
+                if stats is None:
+                    stats = self.stats[name] = SpanStats(category)
+                stats.add(calls, total_ns, self_ns, max_ns)
+            self.counters.update(data["counters"])
+            if self.trace:
+                self.events.extend(data["events"])
+
+    # ------------------------------------
+    # Reports
+    # ------------------------------------
+    def summary(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-name rows (times in seconds), by self time, slowest first."""
+        with self._lock:
+            items = list(self.stats.items())
+        rows = [
+            {
+                "name": name,
+                "category": s.category,
+                "calls": s.calls,
+                "total": s.total_ns / 1e9,
+                "self": s.self_ns / 1e9,
+                "mean": s.total_ns / s.calls / 1e9 if s.calls else 0.0,
+                "max": s.max_ns / 1e9,
+            }
+            for name, s in items
+            if category is None or s.category == category
+        ]
+        rows.sort(key=lambda row: row["self"], reverse=True)
+        return rows
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        The Chrome trace event format: one complete ("X") event per span,
+        plus the final counter values as metadata.
+        """
+        with self._lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"counters": counters},
+        }
+
+
+# ------------------------------------
+# Process-wide profiler
+# ------------------------------------
+_profiler: Optional[Profiler] = None
+
+
+def enable(trace: bool = False) -> Profiler:
+    """Start profiling this process (replacing any current profiler)."""
+    global _profiler
+    _profiler = Profiler(trace=trace)
+    return _profiler
+
+
+def disable() -> Optional[Profiler]:
+    """Stop profiling and return the profiler that was active."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+@contextmanager
+def profiling(trace: bool = False) -> Iterator[Profiler]:
+    """Profile the enclosed block."""
+    global _profiler
+    previous, _profiler = _profiler, Profiler(trace=trace)
+    try:
+        yield _profiler
+    finally:
+        _profiler = previous
+
+
+def span(name: str, category: str = "rule", **args):
+    """Time the enclosed block as `name` (a no-op while disabled)."""
+    profiler = _profiler
+    if profiler is None:
+        return _NO_SPAN
+    return profiler.span(name, category, args or None)
+
+
+def count(name: str, value: int = 1):
+    """Add `value` to counter `name` (a no-op while disabled)."""
+    profiler = _profiler
+    if profiler is not None:
+        profiler.count(name, value)
+
+
+def add_time(name: str, seconds: float, calls: int = 1, category: str = "rule"):
+    """Record `seconds` measured by the caller under `name`."""
+    profiler = _profiler
+    if profiler is not None:
+        profiler.add_time(name, seconds, calls, category)
+
+
+def enabled() -> bool:
+    return _profiler is not None
+
+
+def profiled(name: str, category: str = "rule") -> Callable:
+    """Decorator: time every call of the function as a span `name`."""
+
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.span(name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
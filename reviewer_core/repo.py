@@ -0,0 +1,357 @@
+"""
+Repository Review
+-----------------
+Reviews many files in one run instead of one interpreter per file.
+
+- `discover_files` expands files, directories and glob patterns into a
+  sorted, de-duplicated list of Python files.
+- `review_paths` runs the local agents (static + security) in a process
+  pool sized to the machine, and the LLM agent in a separate, smaller
+  thread pool, yielding one result per file in input order.
+- With a batch token budget, small files share Gemini requests instead
+  of paying a round-trip each.
+- Gemini requests of a run share one LLM scheduler: at most
+  `llm_concurrency` in flight (fewer while the API pushes back), files
+  with error-severity findings first.
+- With `cross_module`, each worker also summarises its module's taint
+  (from the same parse and taint pass as its findings). The parent links
+  a file over the project call graph as soon as every module it calls
+  has come in, so flows that cross files are reported too without
+  waiting for the whole project. The linked graph is kept in the cache
+  directory, so the next run only relinks changed modules and their
+  dependents.
+- Local findings come back as columnar `FindingTable`s sharing one set
+  of string dictionaries, which keeps repository-scale results compact
+  in memory and cheap to pickle.
+- While the parent is profiling, each worker profiles too and sends its
+  spans and counters back with every result.
+"""
+
+import glob
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing, nullcontext
+from itertools import repeat
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from . import profiling
+from .cache import DEFAULT_MAX_BYTES, FindingsCache, run_cached
+from .llm.gemini_client import estimate_tokens, review_batch, review_code
+from .findings import FindingTable
+from .llm.prompts import BATCH_TEMPLATE
+from .llm.scheduler import LLMScheduler
+from .models import Finding, ReviewBundle
+from .security.project import CallGraph, SummaryIndex, merge_findings, module_name, summarize
+from .security.runner import run_security
+from .source import SourceDocument
+from .static_analysis.runner import run_static
+
+# LLM requests prepared and queued per request slot, so the scheduler
+# has something to choose from when a slot opens
+LLM_QUEUE_FACTOR = 4
+
+# Directories never worth descending into
+SKIP_DIRS = {".git", ".hg", ".svn", ".venv", "venv", "__pycache__", "node_modules", ".tox", ".nox", "build", "dist"}
+
+
+@dataclass
+class FileResult:
+    """
+    Review outcome for one file of a repository run.
+    """
+    filepath: str
+    bundle: ReviewBundle
+    error: Optional[str] = None
+
+
+# ------------------------------------
+# File discovery
+# ------------------------------------
+def _walk_python_files(root: Path) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in filenames:
+            if name.endswith(".py"):
+                yield os.path.join(dirpath, name)
+
+
+def discover_files(targets: Iterable[str]) -> List[str]:
+    """
+    Expand files, directories and glob patterns into Python file paths.
+
+    The result is sorted so repeated runs report files in the same order.
+    """
+    found = set()
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            found.update(_walk_python_files(path))
+        elif path.is_file():
+            found.add(str(path))
+        else:
+            for match in glob.glob(target, recursive=True):
+                match_path = Path(match)
+                if match_path.is_dir():
+                    found.update(_walk_python_files(match_path))
+                elif match.endswith(".py"):
+                    found.add(match)
+    return sorted(found)
+
+
+# ------------------------------------
+# Worker-side jobs
+# ------------------------------------
+_worker_cache: Optional[FindingsCache] = None
+_worker_index: Optional[SummaryIndex] = None
+
+
+def _init_worker(cache_dir: Optional[str], cache_max_bytes: int, profile_trace: Optional[bool] = None):
+    """
+    Open this worker process's own connections to the on-disk caches, and
+    start profiling when the parent is (`profile_trace` is not None).
+    """
+    global _worker_cache, _worker_index
+    _worker_cache = FindingsCache(cache_dir, cache_max_bytes) if cache_dir else None
+    _worker_index = SummaryIndex(cache_dir, cache_max_bytes) if cache_dir else None
+    if profile_trace is not None:
+        profiling.enable(trace=profile_trace)
+
+
+def _read_source(filepath: str) -> str:
+    return Path(filepath).read_text(encoding="utf-8")
+
+
+def _local_review(filepath: str, cross_module: bool = False):
+    """
+    Run the local agents for one file, and summarise its module for
+    cross-module linking if asked (executes in a worker process).
+    """
+    module = None
+    try:
+        doc = SourceDocument(filepath, _read_source(filepath))
+        static_findings = run_cached(_worker_cache, "static", run_static, filepath, doc)
+        security_findings = run_cached(_worker_cache, "security", run_security, filepath, doc)
+        if cross_module:
+            module = summarize(filepath, doc, _worker_index)
+        # Columnar tables pickle compactly and stay small in the parent
+        result = filepath, FindingTable.of(static_findings), FindingTable.of(security_findings), None
+    except Exception as e:  # unreadable file or an agent failure: one file's error, not the run's
+        result = filepath, FindingTable(), FindingTable(), f"{type(e).__name__}: {e}"
+    profiler = profiling.get_profiler()
+    return result, module, profiler.drain() if profiler is not None else None
+
+
+def _llm_review(
+    filepath: str, static_findings: List[Finding], security_findings: List[Finding], scheduler: LLMScheduler
+):
+    """
+    Run the LLM agent for one file (executes in the LLM thread pool).
+    """
+    return review_code(filepath, _read_source(filepath), static_findings, security_findings, scheduler=scheduler)
+
+
+def _llm_review_batch(entries, scheduler: LLMScheduler):
+    """
+    Review several small files in one LLM request (LLM thread pool).
+    """
+    items = [
+        (filepath, _read_source(filepath), static_findings, security_findings)
+        for filepath, static_findings, security_findings in entries
+    ]
+    return review_batch(items, scheduler=scheduler)
+
+
+class _Pending:
+    """
+    One file of a repository run between its local result and its yield:
+    `settled` once its cross-module findings are in and its LLM request
+    (`slot`) is queued.
+    """
+
+    __slots__ = ("result", "module", "slot", "settled")
+
+    def __init__(self, result):
+        self.result = result
+        self.module = None
+        self.slot = None
+        self.settled = False
+
+
+class _LLMSlot:
+    """
+    Where one file's LLM comments will come from: its own request, or
+    its share of a batched request that may not have been sent yet.
+    """
+
+    __slots__ = ("filepath", "future", "batched")
+
+    def __init__(self, filepath: str, future=None, batched: bool = False):
+        self.filepath = filepath
+        self.future = future
+        self.batched = batched
+
+    def ready(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def result(self):
+        comments = self.future.result()
+        return comments[self.filepath] if self.batched else comments
+
+
+# ------------------------------------
+# Repository run
+# ------------------------------------
+def _project_id(files: List[str]) -> str:
+    """What a set of files' linked call graph is stored under."""
+    paths = sorted({os.path.abspath(f) for f in files})
+    try:
+        return os.path.commonpath(paths)
+    except ValueError:  # on different drives (Windows): no common root
+        return "\n".join(paths)
+
+
+def review_paths(
+    files: List[str],
+    workers: Optional[int] = None,
+    llm: bool = True,
+    llm_concurrency: int = 4,
+    chunksize: Optional[int] = None,
+    llm_batch_tokens: int = 0,
+    cache_dir: Optional[str] = None,
+    cache_max_bytes: int = DEFAULT_MAX_BYTES,
+    cross_module: bool = False,
+) -> Iterator[FileResult]:
+    """
+    Review `files`, yielding one FileResult per file in input order.
+
+    Args:
+        workers (int): Local-agent processes (default: CPU count).
+        llm (bool): Also request a Gemini review for each file.
+        llm_concurrency (int): Maximum Gemini requests in flight (the
+            scheduler allows fewer while the API answers 429/5xx).
+        chunksize (int): Files handed to a worker per task (default: sized
+            so each worker receives several chunks).
+        llm_batch_tokens (int): Token budget for packing small files into
+            one Gemini request (0 disables batching). Files above a
+            quarter of the budget are always reviewed alone.
+        cache_dir (str): Findings cache location (None disables caching).
+        cache_max_bytes (int): Cache size before LRU eviction kicks in.
+        cross_module (bool): Link taint summaries across `files` and add
+            flows that cross modules to the security findings. A file
+            is yielded once the modules it calls have been summarised;
+            with `cache_dir`, the linked graph is reused by the next run.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, min(64, len(files) // (workers * 4)))
+    profiler = profiling.get_profiler()
+
+    local_pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(
+            str(cache_dir) if cache_dir else None,
+            cache_max_bytes,
+            profiler.trace if profiler is not None else None,
+        ),
+    )
+    scheduler = LLMScheduler.from_env(max_concurrency=max(1, llm_concurrency))
+    # The linked call graph of this set of files, kept between runs
+    index = SummaryIndex(cache_dir, cache_max_bytes) if cross_module and cache_dir and files else None
+    project = _project_id(files) if index is not None else ""
+    llm_threads = max(1, llm_concurrency) * LLM_QUEUE_FACTOR
+    # The index is closed however the run ends; the graph is saved only if it completes
+    with closing(index) if index is not None else nullcontext(), closing(scheduler), local_pool, \
+            ThreadPoolExecutor(max_workers=llm_threads, thread_name_prefix="review-llm") as llm_pool:
+        pending = deque()
+        batch, batch_slots = [], []
+        batch_used = batch_overhead = estimate_tokens(BATCH_TEMPLATE)
+        small_file_tokens = llm_batch_tokens // 4
+
+        # Cross-module flows: a file is linked once the modules it calls are in
+        graph, unlinked = None, []
+        if cross_module:
+            names = {filepath: module_name(filepath) for filepath in set(files)}
+            graph = CallGraph(names.values(), index.get_link_state(project) if index is not None else None)
+
+        def flush_batch():
+            nonlocal batch, batch_slots, batch_used
+            if batch:
+                future = llm_pool.submit(_llm_review_batch, batch, scheduler)
+                for slot in batch_slots:
+                    slot.future = future
+                batch, batch_slots, batch_used = [], [], batch_overhead
+
+        def settle(entry: _Pending):
+            """Add linked findings and queue the LLM request of one file."""
+            filepath, static_findings, security_findings, error = entry.result
+            if graph is not None:
+                graph.link(entry.module)
+                linked = [f for f in graph.module_findings(entry.module) if f.filepath == filepath]
+                if linked:
+                    security_findings = FindingTable(merge_findings(security_findings, linked)).using(strings)
+                    entry.result = (filepath, static_findings, security_findings, error)
+            entry.settled = True
+            if llm and error is None:
+                nonlocal batch_used
+                cost = estimate_tokens(os.path.getsize(filepath)) + 100  # + findings context
+                if llm_batch_tokens and cost <= small_file_tokens:
+                    if batch_used + cost > llm_batch_tokens:
+                        flush_batch()
+                    entry.slot = _LLMSlot(filepath, batched=True)
+                    batch.append((filepath, static_findings, security_findings))
+                    batch_slots.append(entry.slot)
+                    batch_used += cost
+                else:
+                    future = llm_pool.submit(_llm_review, filepath, static_findings, security_findings, scheduler)
+                    entry.slot = _LLMSlot(filepath, future)
+
+        def finish(entry: _Pending) -> FileResult:
+            filepath, static_findings, security_findings, error = entry.result
+            bundle = ReviewBundle(
+                static_findings=static_findings,
+                security_findings=security_findings,
+                llm_comments=entry.slot.result() if entry.slot is not None else [],
+            )
+            return FileResult(filepath=filepath, bundle=bundle, error=error)
+
+        # One copy of each rule ID, message, path... for the whole run
+        strings = FindingTable()
+
+        # map() keeps input order; LLM requests start as local results arrive
+        reviews = local_pool.map(_local_review, files, repeat(cross_module), chunksize=chunksize)
+        for result, module, worker_profile in reviews:
+            if profiler is not None:
+                profiler.merge(worker_profile)
+            filepath, static_findings, security_findings, error = result
+            result = (filepath, static_findings.using(strings), security_findings.using(strings), error)
+            entry = _Pending(result)
+            pending.append(entry)
+            if graph is None:
+                settle(entry)
+            else:
+                entry.module = names[filepath]
+                graph.add(module, entry.module)
+                unlinked.append(entry)
+                still = []
+                for waiting in unlinked:
+                    if graph.ready(waiting.module):
+                        settle(waiting)
+                    else:
+                        still.append(waiting)
+                unlinked = still
+
+            while pending and pending[0].settled and (pending[0].slot is None or pending[0].slot.ready()):
+                yield finish(pending.popleft())
+
+        for waiting in unlinked:  # everything is in: the rest can be linked
+            settle(waiting)
+        flush_batch()
+        while pending:
+            yield finish(pending.popleft())
+
+        if index is not None:
+            index.put_link_state(project, graph.state())
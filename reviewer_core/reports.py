@@ -0,0 +1,254 @@
+"""
+Report Writers
+--------------
+Streaming writers for the one report of a whole review run.
+
+- `json`   — compact JSON, `{"files": [...]}` (the CLI's report shape)
+- `ndjson` — one JSON object per finding (and per file error) per line
+- `sarif`  — SARIF 2.1.0, for CI code-scanning dashboards
+
+Each file's findings are encoded and written as soon as its result
+arrives and are then dropped, so memory does not grow with the number of
+findings. Only the SARIF rule list (one entry per distinct rule) and
+the file errors are kept until the end.
+
+`orjson` is used for encoding when it is installed. A path ending in
+`.gz` is written gzip-compressed. New formats register with
+`register_writer`.
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Type
+
+from . import __version__
+from .models import Finding, ReviewBundle
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+# Finding severity → SARIF result level
+_SARIF_LEVEL = {"error": "error", "warning": "warning", "info": "note"}
+
+
+def dumps(value) -> bytes:
+    """Compact JSON bytes, with the fastest encoder available."""
+    if orjson is not None:
+        return orjson.dumps(value, default=str)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+class ReportStats:
+    """Running totals of a report, for the end-of-run summary."""
+
+    __slots__ = ("files", "static", "security", "llm", "errors")
+
+    def __init__(self):
+        self.files = self.static = self.security = self.llm = self.errors = 0
+
+    def add(self, bundle: ReviewBundle, error: Optional[str]):
+        self.files += 1
+        self.static += len(bundle.static_findings)
+        self.security += len(bundle.security_findings)
+        self.llm += len(bundle.llm_comments)
+        self.errors += 1 if error else 0
+
+
+# ------------------------------------
+# Writers
+# ------------------------------------
+class ReportWriter:
+    """
+    Base class: subclasses implement `begin`, `write` and `end`, and
+    emit bytes with `self.out`.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.stats = ReportStats()
+
+    def out(self, data: bytes):
+        self.stream.write(data)
+
+    def begin(self):
+        pass
+
+    def add(self, filepath: str, bundle: ReviewBundle, error: Optional[str] = None):
+        """Write one file's results."""
+        self.stats.add(bundle, error)
+        self.write(filepath, bundle, error)
+
+    def write(self, filepath: str, bundle: ReviewBundle, error: Optional[str]):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+    def close(self):
+        try:
+            self.end()
+        finally:
+            self.stream.close()
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JSONReportWriter(ReportWriter):
+    """Compact `{"files": [...]}` JSON, written one file entry at a time."""
+
+    def begin(self):
+        self.out(b'{"files":[')
+        self._first = True
+
+    def write(self, filepath, bundle, error):
+        entry = {
+            "filepath": filepath,
+            "error": error,
+            "static": [f.to_dict() for f in bundle.static_findings],
+            "security": [f.to_dict() for f in bundle.security_findings],
+            "llm": [f.to_dict() for f in bundle.llm_comments],
+        }
+        self.out((b"" if self._first else b",") + dumps(entry))
+        self._first = False
+
+    def end(self):
+        self.out(b"]}\n")
+
+
+class NDJSONReportWriter(ReportWriter):
+    """One finding per line; a file that failed gets an `error` line."""
+
+    def write(self, filepath, bundle, error):
+        lines = [dumps({"filepath": filepath, "error": error})] if error else []
+        for findings in (bundle.static_findings, bundle.security_findings, bundle.llm_comments):
+            lines += [dumps(f.to_dict()) for f in findings]
+        if lines:
+            self.out(b"\n".join(lines) + b"\n")
+
+
+class SarifReportWriter(ReportWriter):
+    """
+    SARIF 2.1.0 with a single run. Results are streamed; the tool's rule
+    list and the error notifications follow them in the same run object.
+    """
+
+    def __init__(self, stream: BinaryIO, root: Optional[str] = None):
+        super().__init__(stream)
+        self.root = Path(root or os.getcwd()).resolve()
+        self._rules: Dict[str, int] = {}
+        self._rule_agents: List[str] = []
+        self._errors: List[dict] = []
+        self._first = True
+
+    def begin(self):
+        self.out(
+            b'{"$schema":' + dumps(SARIF_SCHEMA) + b',"version":"2.1.0","runs":[{"results":['
+        )
+
+    def _uri(self, filepath: str) -> str:
+        path = Path(filepath)
+        if not path.is_absolute():
+            return path.as_posix()
+        try:
+            return path.resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_uri()
+
+    def _result(self, finding: Finding, uri: str) -> dict:
+        index = self._rules.get(finding.rule_id)
+        if index is None:
+            index = self._rules[finding.rule_id] = len(self._rule_agents)
+            self._rule_agents.append(finding.agent)
+        region = {"startLine": max(finding.line, 1), "startColumn": max(finding.col, 1)}
+        if finding.code_snippet:
+            region["snippet"] = {"text": finding.code_snippet}
+        result = {
+            "ruleId": finding.rule_id,
+            "ruleIndex": index,
+            "level": _SARIF_LEVEL.get(finding.severity, "note"),
+            "message": {"text": finding.message},
+            "locations": [{"physicalLocation": {"artifactLocation": {"uri": uri}, "region": region}}],
+            "properties": {"agent": finding.agent},
+        }
+        if finding.suggestion:
+            result["properties"]["suggestion"] = finding.suggestion
+        return result
+
+    def write(self, filepath, bundle, error):
+        uri = self._uri(filepath)
+        if error:
+            self._errors.append({
+                "level": "error",
+                "message": {"text": error},
+                "locations": [{"physicalLocation": {"artifactLocation": {"uri": uri}}}],
+            })
+        chunks = [
+            dumps(self._result(f, uri))
+            for findings in (bundle.static_findings, bundle.security_findings, bundle.llm_comments)
+            for f in findings
+        ]
+        if chunks:
+            self.out((b"" if self._first else b",") + b",".join(chunks))
+            self._first = False
+
+    def end(self):
+        rules = [
+            {"id": rule_id, "properties": {"agent": self._rule_agents[index]}}
+            for rule_id, index in self._rules.items()
+        ]
+        tool = {
+            "driver": {
+                "name": "multi-agent-code-reviewer",
+                "version": __version__,
+                "rules": rules,
+            }
+        }
+        invocation = {"executionSuccessful": not self._errors, "toolExecutionNotifications": self._errors}
+        self.out(b'],"tool":' + dumps(tool) + b',"invocations":[' + dumps(invocation) + b"]}]}\n")
+
+
+WRITERS: Dict[str, Type[ReportWriter]] = {
+    "json": JSONReportWriter,
+    "ndjson": NDJSONReportWriter,
+    "sarif": SarifReportWriter,
+}
+
+
+def register_writer(name: str, writer: Type[ReportWriter]):
+    """Make a report format available to `open_report` and the CLI."""
+    WRITERS[name] = writer
+
+
+def report_format(path: str) -> str:
+    """Format implied by a report path's extension (default: json)."""
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith((".sarif", ".sarif.json")):
+        return "sarif"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "json"
+
+
+def open_report(path: str, fmt: Optional[str] = None, compress: Optional[bool] = None) -> ReportWriter:
+    """
+    Open a streaming report writer for `path`. The format defaults to the
+    one implied by the extension; `compress` defaults to a `.gz` suffix.
+    """
+    fmt = fmt or report_format(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown report format: {fmt} (choose from {', '.join(sorted(WRITERS))})")
+    if compress is None:
+        compress = path.endswith(".gz")
+    stream = gzip.open(path, "wb") if compress else open(path, "wb")
+    return WRITERS[fmt](stream)
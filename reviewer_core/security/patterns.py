@@ -1,12 +1,27 @@
 """
 Security Agent — Pattern Scanner
 --------------------------------
-This module uses regex-based scanning to detect common
-security issues in Python code (e.g., eval, exec, os.system, SQL injection, etc.).
+This module detects common security issues in Python code
+(e.g., eval, exec, os.system, SQL injection, etc.).
+
+Rules with a Tree-sitter query (`QUERIES`) match calls and arguments in
+the syntax tree, all of them in one query pass (see `queries.py`), so
+they do not fire inside comments or string literals. The other rules,
+and every rule when Tree-sitter is unavailable, fall back to regexes.
+
+All regexes are compiled once into a cached scanner. A literal-keyword
+prefilter finds candidate offsets, and each rule's full regex is only
+tried where its keyword occurs instead of over the whole file.
 """
 
+import re as stdlib_re  # plain literal alternations run faster on the stdlib engine
+import time
+from functools import lru_cache
 import regex as re
+from .. import profiling
 from ..models import Finding
+from ..source import Source, SourceDocument
+from .queries import compiled_queries, node_position
 
 # ------------------------------------------------------
 # Known dangerous or suspicious patterns
@@ -38,28 +53,282 @@ PATTERNS = [
     ("SEC010", r"\binput\s*\(", "User input detected — ensure it’s validated before usage."),
 ]
 
+# ------------------------------------------------------
+# Tree-sitter queries
+# ------------------------------------------------------
+# The node to report is captured as `@match`. Rules without a query
+# keep their regex: SEC009 looks for key material anywhere, strings and
+# comments included.
+def _call(name: str) -> str:
+    """A call of the builtin `name`."""
+    return f'''((call function: (identifier) @fn) @match (#eq? @fn "{name}"))'''
+
+
+def _method_call(module: str, methods: str) -> str:
+    """A call of `module.<method>` for methods matching the regex `methods`."""
+    return (
+        f"((call function: (attribute object: (identifier) @obj attribute: (identifier) @attr)) @match"
+        f' (#eq? @obj "{module}") (#match? @attr "^({methods})$"))'
+    )
+
+
+SQL_KEYWORDS = "(?i)(SELECT|INSERT|UPDATE|DELETE)"
+
+QUERIES = {
+    "SEC001": _call("eval"),
+    "SEC002": _call("exec"),
+    "SEC003": _method_call("os", "system"),
+    "SEC004": _method_call("subprocess", "Popen|run|call"),
+    # SQL built at runtime (f-string, `+` / `%`, or `.format()`) passed to `.execute()`
+    "SEC005": f'''
+        ((call
+           function: (attribute attribute: (identifier) @method)
+           arguments: (argument_list . [(string (interpolation)) (binary_operator)] @sql)) @match
+         (#match? @method "^execute(many)?$") (#match? @sql "{SQL_KEYWORDS}"))
+        ((call
+           function: (attribute attribute: (identifier) @method)
+           arguments: (argument_list .
+             (call function: (attribute object: (string) @sql attribute: (identifier) @format)))) @match
+         (#match? @method "^execute(many)?$") (#eq? @format "format") (#match? @sql "{SQL_KEYWORDS}"))
+    ''',
+    "SEC006": _method_call("pickle", "load|loads"),
+    "SEC007": _method_call("hashlib", "md5|sha1"),
+    "SEC008": _method_call("yaml", "load"),
+    "SEC010": _call("input"),
+}
+
+
+# ------------------------------------------------------
+# Literal keyword that every match of a rule starts with
+# ------------------------------------------------------
+# Rules listed here are only attempted where their keyword occurs.
+# Rules without a keyword fall back to a full-file finditer().
+KEYWORDS = {
+    "SEC001": "eval",
+    "SEC002": "exec",
+    "SEC003": "os.system",
+    "SEC004": "subprocess.",
+    "SEC005": "cursor.execute",
+    "SEC006": "pickle.",
+    "SEC007": "hashlib.",
+    "SEC008": "yaml.load",
+    "SEC009": "AKIA",
+    "SEC010": "input",
+}
+
+
+# Non-ASCII characters that `re.I` matches against an ASCII keyword letter
+# but that str.lower() does not map onto it.
+_CASE_FOLD = str.maketrans({"\u017f": "s", "\u0130": "i"})
+
+
+def _trie_pattern(words) -> str:
+    """
+    Build a regex alternation shaped like a trie of `words`.
+
+    Alternatives sharing a prefix are merged, so the matcher follows one
+    branch per character (Aho-Corasick style) and its cost stays flat as
+    keywords are added. Greedy optional tails make it prefer the longest
+    keyword at any offset.
+    """
+    root: dict = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node) -> str:
+        branches = [stdlib_re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(root)
+
+
+class CompiledRules:
+    """
+    The full rule set compiled for a single pass over a file.
+
+    One trie-shaped keyword prefilter locates candidate offsets in the
+    lowercased source; each rule's full regex is only tried at offsets
+    where its own keyword occurs.
+    """
+
+    def __init__(self, patterns, keywords):
+        self.rules = [
+            (rule_id, re.compile(pattern, flags=re.I), message)
+            for rule_id, pattern, message in patterns
+        ]
+
+        rule_keywords = []
+        for rule_id, _, _ in patterns:
+            kw = keywords.get(rule_id)
+            rule_keywords.append(kw.lower() if kw and kw.isascii() else None)
+
+        distinct = {kw for kw in rule_keywords if kw}
+        # The prefilter reports the longest keyword at an offset; every rule
+        # whose keyword is a prefix of it also applies there.
+        self.by_keyword = {
+            kw: [r for r, rule_kw in enumerate(rule_keywords) if rule_kw and kw.startswith(rule_kw)]
+            for kw in distinct
+        }
+        self.unanchored = [r for r, rule_kw in enumerate(rule_keywords) if rule_kw is None]
+        self.prefilter = stdlib_re.compile(_trie_pattern(distinct)) if distinct else None
+
+    def _folded(self, code: str):
+        """
+        Lowercase `code` so that every offset still lines up with the
+        original, or return None when no such folding exists.
+        """
+        if code.isascii():
+            return code.lower()
+        folded = code.translate(_CASE_FOLD).lower()
+        return folded if len(folded) == len(code) else None
+
+    def scan(self, code: str, timings=None):
+        """
+        Return, per rule, the same matches `re.finditer(pattern, code)` yields.
+
+        With a `timings` list (one slot per rule), the seconds spent in
+        each rule's regex are added to it.
+        """
+        hits = [[] for _ in self.rules]
+        folded = self._folded(code) if self.prefilter is not None else None
+
+        if folded is None:
+            for r, (_, pattern, _) in enumerate(self.rules):
+                start = time.perf_counter() if timings is not None else 0
+                hits[r] = list(pattern.finditer(code))
+                if timings is not None:
+                    timings[r] += time.perf_counter() - start
+            return hits
+
+        last_end = [0] * len(self.rules)
+        candidate = self.prefilter.search(folded)
+        while candidate:
+            pos = candidate.start()
+            for r in self.by_keyword[candidate.group()]:
+                # finditer() never reports a match overlapping the previous one
+                if pos < last_end[r]:
+                    continue
+                if timings is None:
+                    match = self.rules[r][1].match(code, pos)
+                else:
+                    start = time.perf_counter()
+                    match = self.rules[r][1].match(code, pos)
+                    timings[r] += time.perf_counter() - start
+                if match:
+                    hits[r].append(match)
+                    last_end[r] = match.end()
+            # Resume one character later so overlapping keywords are not missed
+            candidate = self.prefilter.search(folded, pos + 1)
+
+        for r in self.unanchored:
+            start = time.perf_counter() if timings is not None else 0
+            hits[r] = list(self.rules[r][1].finditer(code))
+            if timings is not None:
+                timings[r] += time.perf_counter() - start
+
+        return hits
+
+
+@lru_cache(maxsize=4)
+def _compile(patterns: tuple, keywords: tuple) -> CompiledRules:
+    return CompiledRules(patterns, dict(keywords))
+
+
+def compiled_rules(rule_ids=None) -> CompiledRules:
+    """
+    Return the process-wide compiled scanner for the current PATTERNS
+    (or for the rules in `rule_ids` only).
+    """
+    patterns = tuple(p for p in PATTERNS if rule_ids is None or p[0] in rule_ids)
+    return _compile(patterns, tuple(sorted(KEYWORDS.items())))
+
+
+def _finding(filepath: str, rule_id: str, message: str, line: int, col: int, snippet: str) -> Finding:
+    return Finding(
+        agent="security",
+        rule_id=rule_id,
+        message=message,
+        severity="warning",
+        filepath=filepath,
+        line=line,
+        col=col,
+        code_snippet=snippet.strip()
+    )
+
+
 # ------------------------------------------------------
 # Function: regex_scan
 # ------------------------------------------------------
-def regex_scan(filepath: str, code: str):
+@profiling.profiled("security.regex_scan")
+def regex_scan(filepath: str, code: Source, rule_ids=None):
     """
-    Scans code using regex for known security patterns.
+    Scans code using regex for known security patterns (all of them, or
+    those in `rule_ids`).
     Returns a list of Finding objects for each detected issue.
+
+    While profiling, each pattern's matching time and match count are
+    recorded as `security.regex.<rule>`.
     """
     findings = []
-    for rule_id, pattern, message in PATTERNS:
-        for match in re.finditer(pattern, code, flags=re.I):
-            line = code.count("\n", 0, match.start()) + 1
-            col = match.start() - (code.rfind("\n", 0, match.start()) + 1) + 1
-            snippet = code.splitlines()[line - 1] if line <= len(code.splitlines()) else ""
-            findings.append(Finding(
-                agent="security",
-                rule_id=rule_id,
-                message=message,
-                severity="warning",
-                filepath=filepath,
-                line=line,
-                col=col,
-                code_snippet=snippet.strip()
-            ))
+    doc = SourceDocument.of(filepath, code)
+    index = doc.line_index
+    compiled = compiled_rules(rule_ids)
+    timings = [0.0] * len(compiled.rules) if profiling.enabled() else None
+    all_matches = compiled.scan(doc.code, timings)
+    if timings is not None:
+        for (rule_id, _, _), seconds, matches in zip(compiled.rules, timings, all_matches):
+            profiling.add_time(f"security.regex.{rule_id}", seconds)
+            if matches:
+                profiling.count(f"security.matches.{rule_id}", len(matches))
+    for (rule_id, _, message), matches in zip(compiled.rules, all_matches):
+        for match in matches:
+            line, col = index.position(match.start())
+            findings.append(_finding(filepath, rule_id, message, line, col, index.line_text(line)))
+    return findings
+
+
+# ------------------------------------------------------
+# Function: pattern_scan
+# ------------------------------------------------------
+@profiling.profiled("security.pattern_scan")
+def pattern_scan(filepath: str, code: Source):
+    """
+    Scans code for known security patterns: rules with a query run in
+    one pass over the shared Tree-sitter tree, the others use regexes.
+    Without Tree-sitter every rule uses its regex.
+
+    Findings are ordered by rule, then position, like `regex_scan`.
+    """
+    doc = SourceDocument.of(filepath, code)
+    queried = [(rule_id, QUERIES[rule_id]) for rule_id, _, _ in PATTERNS if rule_id in QUERIES]
+    tree = doc.ts_tree if queried else None
+    compiled = compiled_queries(queried) if tree is not None else None
+    if compiled is None:
+        return regex_scan(filepath, doc)
+
+    with profiling.span("security.query_scan"):
+        all_nodes = compiled.scan(tree)
+    by_rule = {}
+    for rule_id, nodes in zip(compiled.rule_ids, all_nodes):
+        if nodes:
+            profiling.count(f"security.matches.{rule_id}", len(nodes))
+        by_rule[rule_id] = nodes
+
+    fallback = {rule_id for rule_id, _, _ in PATTERNS if rule_id not in by_rule}
+    regex_findings = regex_scan(filepath, doc, fallback) if fallback else []
+
+    findings = []
+    for rule_id, _, message in PATTERNS:
+        if rule_id in by_rule:
+            for node in by_rule[rule_id]:
+                line, col = node_position(doc, node)
+                findings.append(_finding(filepath, rule_id, message, line, col, doc.lines[line - 1]))
+        else:
+            findings += [f for f in regex_findings if f.rule_id == rule_id]
     return findings
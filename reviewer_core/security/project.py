@@ -0,0 +1,524 @@
+"""
+Security Agent — Cross-Module Taint
+-----------------------------------
+Links the per-module taint summaries of a project, so flows that cross
+files are reported: a `request.args` value read in a view and passed to
+a repository helper that ends in `cursor.execute()`.
+
+- Each module is summarised once per content, from the same parse and
+  taint pass as its findings. The summary and its call edges (every call
+  site resolved to a qualified name) are persisted in `SummaryIndex`,
+  keyed by content hash, next to the findings cache.
+- `CallGraph` links the summaries with a worklist: when a function's
+  summary changes, only its callers are re-evaluated. Modules can be
+  added one at a time. A module can be linked as soon as every project
+  module it calls (directly or not) is in, so a repository run does not
+  wait for the whole project.
+- The linked result (`LinkState`) is persisted per project. The next
+  run reuses it for every module whose content and dependencies did not
+  change; only changed modules and their dependents are relinked.
+"""
+
+import hashlib
+import json
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from ..cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, DiskLRU, agent_fingerprint
+from ..models import Finding
+from ..source import Source, SourceDocument
+from .taint import SOURCE, CallSink, CallSite, FunctionSummary, Taint, analyze_module, sink_finding
+
+
+# ------------------------------------
+# Module summaries
+# ------------------------------------
+@dataclass
+class ProjectModule:
+    """
+    One module of the project: its dotted name, per-scope summaries and
+    the qualified name every call site of each scope refers to.
+    """
+    name: str
+    filepath: str
+    is_package: bool
+    summaries: Dict[str, FunctionSummary]
+    content_hash: str = ""
+    edges: Dict[str, List[Optional[str]]] = field(default_factory=dict)
+
+
+def module_name(filepath: str) -> str:
+    """
+    Dotted module name of `filepath`, walking up through packages.
+    """
+    path = Path(filepath).resolve()
+    parts = [] if path.stem == "__init__" else [path.stem]
+    parent = path.parent
+    while (parent / "__init__.py").exists():
+        parts.insert(0, parent.name)
+        parent = parent.parent
+    return ".".join(parts) or path.parent.name
+
+
+def resolve_callee(module: str, is_package: bool, callee: str) -> str:
+    """
+    Qualified name a call site refers to: `:name` is a function of the
+    module itself, a leading dot a relative import.
+    """
+    if callee.startswith(":"):
+        return f"{module}.{callee[1:]}"
+    if callee.startswith("."):
+        level = len(callee) - len(callee.lstrip("."))
+        package = module.split(".")
+        if not is_package:
+            package = package[:-1]
+        package = package[:len(package) - (level - 1)]
+        return ".".join(package + [callee[level:]])
+    return callee
+
+
+def module_edges(module: str, is_package: bool, summaries: Dict[str, FunctionSummary]) -> Dict[str, List[str]]:
+    return {
+        name: [resolve_callee(module, is_package, site.callee) for site in summary.calls]
+        for name, summary in summaries.items()
+    }
+
+
+def _taint_out(taint: Taint) -> list:
+    return sorted((list(label) if isinstance(label, tuple) else label for label in taint), key=str)
+
+
+def _taint_in(labels: list) -> Taint:
+    return frozenset(tuple(label) if isinstance(label, list) else label for label in labels)
+
+
+def _summary_rows(summaries: Dict[str, FunctionSummary]) -> list:
+    rows = []
+    for summary in summaries.values():
+        rows.append({
+            "name": summary.name,
+            "params": summary.params,
+            "returns": _taint_out(summary.returns),
+            "sinks": {str(i): sinks for i, sinks in summary.sinks.items()},
+            "calls": [
+                {**site.__dict__, "args": [_taint_out(arg) for arg in site.args]}
+                for site in summary.calls
+            ],
+            "call_sinks": [call_sink.__dict__ for call_sink in summary.call_sinks],
+        })
+    return rows
+
+
+def _summaries_from_rows(rows: list) -> Dict[str, FunctionSummary]:
+    summaries = {}
+    for row in rows:
+        summaries[row["name"]] = FunctionSummary(
+            name=row["name"],
+            params=row["params"],
+            returns=_taint_in(row["returns"]),
+            sinks={int(i): sinks for i, sinks in row["sinks"].items()},
+            calls=[
+                CallSite(**{**site, "args": [_taint_in(arg) for arg in site["args"]]})
+                for site in row["calls"]
+            ],
+            call_sinks=[CallSink(**call_sink) for call_sink in row["call_sinks"]],
+        )
+    return summaries
+
+
+def encode_module(summaries: Dict[str, FunctionSummary], edges: Dict[str, List[str]]) -> bytes:
+    return zlib.compress(json.dumps({"summaries": _summary_rows(summaries), "edges": edges}).encode("utf-8"))
+
+
+def decode_module(payload: bytes) -> Tuple[Dict[str, FunctionSummary], Dict[str, List[str]]]:
+    data = json.loads(zlib.decompress(payload))
+    return _summaries_from_rows(data["summaries"]), data["edges"]
+
+
+class SummaryIndex(DiskLRU):
+    """
+    Per-module taint summaries and call edges keyed by content hash (and
+    module name, which relative imports resolve against) and the security
+    agent's fingerprint; plus the last linked state of each project.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(Path(cache_dir) / "taint_summaries.sqlite3", max_bytes)
+
+    @staticmethod
+    def key(content_hash: str, module: str = "") -> str:
+        return f"taint:{agent_fingerprint('security')}:{content_hash}:{module}"
+
+    def get(self, content_hash: str, module: str = "") -> Optional[Tuple[Dict[str, FunctionSummary], dict]]:
+        """(summaries, call edges) stored for this content, or None."""
+        payload = self.get_bytes(self.key(content_hash, module))
+        return None if payload is None else decode_module(payload)
+
+    def put(self, content_hash: str, summaries: Dict[str, FunctionSummary], module: str = "", edges=None):
+        self.put_bytes(self.key(content_hash, module), encode_module(summaries, edges or {}))
+
+    @staticmethod
+    def project_key(project: str) -> str:
+        digest = hashlib.sha256(project.encode("utf-8", "surrogatepass")).hexdigest()[:24]
+        return f"link:{agent_fingerprint('security')}:{digest}"
+
+    def get_link_state(self, project: str) -> Optional["LinkState"]:
+        payload = self.get_bytes(self.project_key(project))
+        return None if payload is None else LinkState.decode(payload)
+
+    def put_link_state(self, project: str, state: "LinkState"):
+        self.put_bytes(self.project_key(project), state.encode())
+
+
+def summarize(filepath: str, code: Source, index: Optional[SummaryIndex] = None) -> ProjectModule:
+    """
+    Summarise one module, through the index when one is given. The taint
+    pass is shared with the document's findings scan.
+    """
+    doc = SourceDocument.of(filepath, code)
+    name = module_name(filepath)
+    is_package = Path(filepath).stem == "__init__"
+    stored = index.get(doc.content_hash, name) if index is not None else None
+    if stored is not None:
+        summaries, edges = stored
+    else:
+        summaries = analyze_module(filepath, doc)[1]
+        edges = module_edges(name, is_package, summaries)
+        if index is not None:
+            index.put(doc.content_hash, summaries, name, edges)
+    return ProjectModule(
+        name=name,
+        filepath=filepath,
+        is_package=is_package,
+        summaries=summaries,
+        content_hash=doc.content_hash,
+        edges=edges,
+    )
+
+
+# ------------------------------------
+# Call graph and linking
+# ------------------------------------
+@dataclass
+class LinkState:
+    """
+    The linked result of a project: per module its content hash and the
+    project modules it calls, per function its linked returns and sinks.
+    """
+    modules: Dict[str, Tuple[str, List[str]]]
+    returns: Dict[str, FrozenSet]
+    sinks: Dict[str, Dict[int, Set[str]]]
+
+    def encode(self) -> bytes:
+        return zlib.compress(json.dumps({
+            "modules": self.modules,
+            "returns": {name: _taint_out(taint) for name, taint in self.returns.items()},
+            "sinks": {
+                name: {str(i): sorted(names) for i, names in sinks.items()} for name, sinks in self.sinks.items()
+            },
+        }).encode("utf-8"))
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "LinkState":
+        data = json.loads(zlib.decompress(payload))
+        return cls(
+            modules={name: (content_hash, deps) for name, (content_hash, deps) in data["modules"].items()},
+            returns={name: _taint_in(labels) for name, labels in data["returns"].items()},
+            sinks={
+                name: {int(i): set(names) for i, names in sinks.items()} for name, sinks in data["sinks"].items()
+            },
+        )
+
+
+class CallGraph:
+    """
+    Project functions, the call sites that reach them, and their linked
+    (cross-module) summaries.
+
+    Modules arrive one at a time (`add`); `expected` names the project
+    modules still to come, so a module is only linked (`link`) once all
+    the project modules it depends on are in. With a `previous` state,
+    modules whose content and dependencies are unchanged reuse their
+    linked summaries instead of being relinked.
+    """
+
+    def __init__(self, expected: Iterable[str] = (), previous: Optional[LinkState] = None):
+        self.modules: Dict[str, ProjectModule] = {}
+        self.functions: Dict[str, tuple] = {}
+        self.targets: Dict[str, List[str]] = {}  # qualified callee of every call site
+        self.returns: Dict[str, FrozenSet] = {}
+        self.sinks: Dict[str, Dict[int, Set[str]]] = {}
+        self.previous = previous
+        self.names: Set[str] = set(expected)  # every project module, arrived or not
+        self.reused: Set[str] = set()
+        self.relinked: Set[str] = set()
+        self._arrived: Set[str] = set()
+        self._deps: Dict[str, Set[str]] = {}
+        self._complete: Set[str] = set()
+
+    # --- building ---
+    def add(self, module: Optional[ProjectModule], name: Optional[str] = None):
+        """
+        Register a module (the first file with a given module name wins),
+        or the arrival of a module that could not be summarised (None).
+        """
+        name = module.name if module is not None else name
+        self.names.add(name)
+        if name in self._arrived:
+            return
+        self._arrived.add(name)
+        if module is None:
+            return
+        self.modules[name] = module
+        for scope, summary in module.summaries.items():
+            qualname = f"{name}.{scope}"
+            self.functions[qualname] = (module, summary)
+            targets = module.edges.get(scope)
+            if targets is None:
+                targets = [resolve_callee(name, module.is_package, site.callee) for site in summary.calls]
+            self.targets[qualname] = targets
+
+    def _live(self, target: Optional[str]) -> Optional[str]:
+        """`target` if it is a project function."""
+        if target in self.functions and not target.endswith(".<module>"):
+            return target
+        return None
+
+    def _module_of(self, qualname: str) -> Optional[str]:
+        parts = qualname.split(".")
+        for end in range(len(parts) - 1, 0, -1):
+            prefix = ".".join(parts[:end])
+            if prefix in self.names:
+                return prefix
+        return None
+
+    def deps(self, name: str) -> Set[str]:
+        """Project modules that module `name` calls into."""
+        found = self._deps.get(name)
+        if found is None:
+            found = set()
+            module = self.modules.get(name)
+            for scope in (module.summaries if module is not None else ()):
+                for target in self.targets[f"{name}.{scope}"]:
+                    dep = self._module_of(target)
+                    if dep is not None and dep != name:
+                        found.add(dep)
+            if name in self._complete:
+                self._deps[name] = found
+        return found
+
+    def _closure(self, name: str) -> List[str]:
+        seen, order, stack = {name}, [], [name]
+        while stack:
+            current = stack.pop()
+            order.append(current)
+            for dep in self.deps(current):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return order
+
+    def ready(self, name: str) -> bool:
+        """Whether module `name` and every project module it reaches are in."""
+        seen, stack = {name}, [name]
+        while stack:
+            current = stack.pop()
+            if current in self._complete:
+                continue
+            if current not in self._arrived:
+                return False
+            for dep in self.deps(current):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        self._complete |= seen
+        return True
+
+    # --- linking ---
+    def _resolve_taint(self, qualname: str, taint: Taint, seen: FrozenSet[int] = frozenset()) -> Set:
+        """Replace ("call", k) labels with what the callee really returns."""
+        summary = self.functions[qualname][1]
+        targets = self.targets[qualname]
+        resolved = set()
+        for label in taint:
+            if not isinstance(label, tuple):
+                resolved.add(label)
+                continue
+            site_index = label[1]
+            target = self._live(targets[site_index])
+            if target is None or site_index in seen:
+                continue
+            site = summary.calls[site_index]
+            for returned in self.returns.get(target, ()):
+                if returned == SOURCE:
+                    resolved.add(SOURCE)
+                elif returned < len(site.args):
+                    resolved |= self._resolve_taint(qualname, site.args[returned], seen | {site_index})
+        return resolved
+
+    def _evaluate(self, qualname: str):
+        summary = self.functions[qualname][1]
+        returns = frozenset(self._resolve_taint(qualname, summary.returns))
+        sinks = {i: set(names) for i, names in summary.sinks.items()}
+        for site, target in zip(summary.calls, self.targets[qualname]):
+            target = self._live(target)
+            if target is None:
+                continue
+            for param, callee_sinks in self.sinks.get(target, {}).items():
+                if param < len(site.args):
+                    for label in self._resolve_taint(qualname, site.args[param]):
+                        if isinstance(label, int):
+                            sinks.setdefault(label, set()).update(callee_sinks)
+        for call_sink in summary.call_sinks:
+            for label in self._resolve_taint(qualname, frozenset([("call", call_sink.site)])):
+                if isinstance(label, int):
+                    sinks.setdefault(label, set()).add(call_sink.sink)
+        return returns, sinks
+
+    def _module_functions(self, name: str) -> List[str]:
+        module = self.modules.get(name)
+        return [f"{name}.{scope}" for scope in (module.summaries if module is not None else ())]
+
+    def _reusable(self, name: str) -> bool:
+        """Whether the previous state still holds for module `name` itself."""
+        if self.previous is None:
+            return False
+        if name not in self.modules:  # not summarised, now or then
+            return name not in self.previous.modules
+        previous = self.previous.modules.get(name)
+        if previous is None or previous[0] != self.modules[name].content_hash:
+            return False
+        if sorted(previous[1]) != sorted(self.deps(name)):
+            return False
+        return all(qualname in self.previous.returns for qualname in self._module_functions(name))
+
+    def link(self, name: str):
+        """
+        Link module `name` and the modules it reaches (all of them in, see
+        `ready`) that are not linked yet.
+        """
+        linked = self.reused | self.relinked
+        closure = [member for member in self._closure(name) if member not in linked]
+        if not closure:
+            return
+
+        # Stale: changed itself, or reaches a module that was relinked
+        stale = {member for member in closure if not self._reusable(member)}
+        changed = True
+        while changed:
+            changed = False
+            for member in closure:
+                if member not in stale and self.deps(member) & (stale | self.relinked):
+                    stale.add(member)
+                    changed = True
+
+        for member in closure:
+            if member not in stale:
+                for qualname in self._module_functions(member):
+                    self.returns[qualname] = self.previous.returns[qualname]
+                    self.sinks[qualname] = self.previous.sinks.get(qualname, {})
+                self.reused.add(member)
+
+        # Worklist over the stale functions only, from empty summaries
+        functions = [
+            qualname for member in closure if member in stale for qualname in self._module_functions(member)
+        ]
+        callers: Dict[str, Set[str]] = {}
+        for qualname in functions:
+            self.returns.pop(qualname, None)
+            self.sinks.pop(qualname, None)
+            for target in self.targets[qualname]:
+                target = self._live(target)
+                if target is not None:
+                    callers.setdefault(target, set()).add(qualname)
+        worklist = deque(functions)
+        queued = set(worklist)
+        while worklist:
+            qualname = worklist.popleft()
+            queued.discard(qualname)
+            returns, sinks = self._evaluate(qualname)
+            if returns == self.returns.get(qualname) and sinks == self.sinks.get(qualname):
+                continue
+            self.returns[qualname], self.sinks[qualname] = returns, sinks
+            for caller in callers.get(qualname, ()):
+                if caller not in queued:
+                    queued.add(caller)
+                    worklist.append(caller)
+        self.relinked |= stale
+
+    def link_all(self):
+        for name in sorted(self.modules):
+            self.link(name)
+
+    def state(self) -> LinkState:
+        """The linked result, for the next run's `previous`."""
+        linked = self.reused | self.relinked
+        return LinkState(
+            modules={
+                name: (self.modules[name].content_hash, sorted(self.deps(name)))
+                for name in sorted(linked) if name in self.modules
+            },
+            returns={name: self.returns[name] for name in sorted(self.returns)},
+            sinks={name: self.sinks[name] for name in sorted(self.sinks)},
+        )
+
+    # --- results ---
+    def module_findings(self, name: str) -> List[Finding]:
+        """SEC_T002 findings for every linked flow starting in module `name`."""
+        found = []
+        for qualname in self._module_functions(name):
+            module, summary = self.functions[qualname]
+            targets = [self._live(target) for target in self.targets[qualname]]
+            for site, target in zip(summary.calls, targets):
+                if target is None:
+                    continue
+                for param, callee_sinks in sorted(self.sinks.get(target, {}).items()):
+                    if param < len(site.args) and SOURCE in self._resolve_taint(qualname, site.args[param]):
+                        for sink in sorted(callee_sinks):
+                            found.append(sink_finding(
+                                module.filepath, site.arg_names[param], sink, site.line, site.col,
+                                site.snippet, via=site.name, meta={"callee": target},
+                            ))
+            for call_sink in summary.call_sinks:
+                if SOURCE in self._resolve_taint(qualname, frozenset([("call", call_sink.site)])):
+                    found.append(sink_finding(
+                        module.filepath, call_sink.var, call_sink.sink, call_sink.line, call_sink.col,
+                        call_sink.snippet, via=call_sink.via, meta={"callee": targets[call_sink.site]},
+                    ))
+        return found
+
+    def findings(self) -> Dict[str, List[Finding]]:
+        """SEC_T002 findings for every linked flow, keyed by file path."""
+        by_file: Dict[str, List[Finding]] = {}
+        for name, module in self.modules.items():
+            by_file.setdefault(module.filepath, []).extend(self.module_findings(name))
+        return by_file
+
+
+def merge_findings(local: List[Finding], linked: List[Finding]) -> List[Finding]:
+    """
+    Add linked findings the per-file analysis did not already report.
+    """
+    seen = {(f.rule_id, f.line, f.col, f.message) for f in local}
+    merged = list(local)
+    for finding in linked:
+        key = (finding.rule_id, finding.line, finding.col, finding.message)
+        if key not in seen:
+            seen.add(key)
+            merged.append(finding)
+    merged.sort(key=lambda f: f.line)
+    return merged
+
+
+def cross_module_findings(modules: Iterable[ProjectModule]) -> Dict[str, List[Finding]]:
+    """
+    Link the modules' summaries and return the flows, keyed by file path.
+    """
+    graph = CallGraph()
+    for module in modules:
+        graph.add(module)
+    graph.link_all()
+    return graph.findings()
@@ -0,0 +1,95 @@
+"""
+Security Agent — Tree-sitter Query Engine
+-----------------------------------------
+Runs security rules written as Tree-sitter queries over a document's
+shared Tree-sitter tree.
+
+Every rule's query is concatenated into one `Query`, compiled once per
+process; a single `QueryCursor` pass over the tree then reports the
+matches of all rules, so adding a rule does not add a traversal. Each
+query marks the node to report with the `@match` capture and may use
+`#eq?` / `#match?` predicates on other captures.
+
+Matching syntax instead of text means a rule for `eval(...)` calls does
+not fire on `eval(` inside a comment or a string literal.
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from ..parsing.ts_loader import TreeSitterUnavailable, get_language
+from ..source import SourceDocument
+
+MATCH_CAPTURE = "match"
+
+
+class CompiledQueries:
+    """
+    The queries of several rules compiled into one Tree-sitter query.
+    """
+
+    def __init__(self, language, queries: Sequence[Tuple[str, str]]):
+        from tree_sitter import Query, QueryCursor  # QueryCursor: tree_sitter >= 0.25
+
+        self._cursor = QueryCursor
+        self.rule_ids = [rule_id for rule_id, _ in queries]
+
+        # Each pattern belongs to the rule whose source it starts in
+        sources, starts, offset = [], [], 0
+        for _, source in queries:
+            text = source.strip() + "\n"
+            starts.append(offset)
+            sources.append(text)
+            offset += len(text.encode("utf-8"))
+        self.query = Query(language, "".join(sources))
+        self.pattern_rules = [
+            bisect_right(starts, self.query.start_byte_for_pattern(pattern)) - 1
+            for pattern in range(self.query.pattern_count)
+        ]
+
+    def scan(self, tree) -> List[list]:
+        """
+        Return, per rule, the nodes its query matched (each once, in
+        source order), from one pass over `tree`.
+        """
+        hits: List[list] = [[] for _ in self.rule_ids]
+        seen = set()
+        for pattern, captures in self._cursor(self.query).matches(tree.root_node):
+            rule = self.pattern_rules[pattern]
+            for node in captures.get(MATCH_CAPTURE, ()):
+                key = (rule, node.start_byte, node.end_byte)
+                if key not in seen:
+                    seen.add(key)
+                    hits[rule].append(node)
+        for nodes in hits:
+            nodes.sort(key=lambda node: node.start_byte)
+        return hits
+
+
+@lru_cache(maxsize=4)
+def _compile(queries: Tuple[Tuple[str, str], ...]) -> Optional[CompiledQueries]:
+    try:
+        return CompiledQueries(get_language(), queries)
+    except TreeSitterUnavailable:
+        return None  # already reported once by the loader
+    except Exception as e:
+        print(f"⚠️ Security queries unavailable, using regexes: {e}")  # e.g. an older tree_sitter
+        return None
+
+
+def compiled_queries(queries: Sequence[Tuple[str, str]]) -> Optional[CompiledQueries]:
+    """
+    The process-wide compiled form of `queries` ((rule_id, source)
+    pairs), or None when they cannot be compiled.
+    """
+    return _compile(tuple(queries))
+
+
+def node_position(doc: SourceDocument, node) -> Tuple[int, int]:
+    """1-based (line, column) of a node, the column counted in characters."""
+    row, byte_column = node.start_point
+    line = doc.lines[row] if row < len(doc.lines) else ""
+    if line.isascii():
+        return row + 1, byte_column + 1
+    return row + 1, len(line.encode("utf-8")[:byte_column].decode("utf-8", "ignore")) + 1
@@ -2,29 +2,35 @@
 Security Agent — Runner
 -----------------------
 This module coordinates all security scans:
-1. Regex-based pattern detection (quick rule matching)
+1. Pattern detection (Tree-sitter queries, regex fallback)
 2. Taint analysis (data flow tracking)
 Returns all findings as a single list.
 """
 
-from .patterns import regex_scan
+from .patterns import pattern_scan
 from .taint import taint_scan
 from ..models import Finding
+from ..profiling import count
+from ..source import Source, SourceDocument
 
 
-def run_security(filepath: str, code: str) -> list[Finding]:
+def run_security(filepath: str, code: Source) -> list[Finding]:
     """
     Runs all security-related checks (pattern + taint analysis)
     and returns a unified list of findings.
+
+    `code` may be raw source or a shared SourceDocument.
     """
     findings: list[Finding] = []
+    doc = SourceDocument.of(filepath, code)
+    count("security.bytes_scanned", len(doc.code))
 
-    # 1️⃣ Run regex-based security checks
-    pattern_findings = regex_scan(filepath, code)
+    # 1️⃣ Run pattern-based security checks
+    pattern_findings = pattern_scan(filepath, doc)
     findings.extend(pattern_findings)
 
     # 2️⃣ Run taint flow checks (detect untrusted data flows)
-    taint_findings = taint_scan(filepath, code)
+    taint_findings = taint_scan(filepath, doc)
     findings.extend(taint_findings)
 
     # 3️⃣ Sort findings by line number
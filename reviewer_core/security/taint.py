@@ -1,12 +1,41 @@
 """
 Security Agent — Taint Analysis
 -------------------------------
-This module performs a simple "taint analysis" — it tracks
+This module performs a "taint analysis" — it tracks
 when potentially unsafe user input flows into dangerous functions (sinks).
+
+The analysis runs over the document's `ast` tree, one traversal per
+function. Taint is a set of labels: `SOURCE` for untrusted input and a
+parameter index for "whatever the caller passed here". It propagates
+through assignments, f-strings, concatenation, `%`/`.format()`, calls
+and function parameters. Each function is summarised once (which
+parameters reach which sinks, and what its return value carries), so a
+call to a helper that forwards an argument into `os.system()` is
+reported at the call site. Methods of the module's classes are
+summarised the same way and followed through `Class(...).method()`,
+`self.method()` and a local bound from `Class(...)`; calls on objects of
+any other type are not followed.
+
+Sources, sinks and sanitizers match by their full dotted name after
+import resolution, never by suffix.
+
+Calls to imported functions are kept symbolic in the summaries (a
+`("call", k)` label stands for "whatever call site k returns"), so
+`security.project` can link summaries across modules later.
+
+Files that do not parse fall back to the original line-based tracker.
 """
 
-from ..models import Finding
+import ast
 import re
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+
+from ..models import Finding
+from ..profiling import profiled
+from ..source import Source, SourceDocument
 
 # -------------------------------------
 # Sources (where untrusted data enters)
@@ -35,24 +64,570 @@ SINKS = {
 }
 
 # -------------------------------------
-# Function: taint_scan
+# Sanitizers (calls whose result is no longer tainted)
 # -------------------------------------
-def taint_scan(filepath: str, code: str):
+SANITIZERS = {
+    "int",
+    "float",
+    "bool",
+    "len",
+    "shlex.quote",
+    "html.escape",
+    "os.path.basename",
+}
+
+# Taint labels: untrusted input, the index of a function parameter, or
+# ("call", k) for the return value of the scope's k-th recorded call site
+SOURCE = "source"
+Label = Union[str, int, Tuple[str, int]]
+Taint = FrozenSet[Label]
+CLEAN: Taint = frozenset()
+
+
+# -------------------------------------
+# Lookup
+# -------------------------------------
+def _lookup(names, dotted: Optional[str]) -> Optional[str]:
     """
-    Detects if data from an untrusted source flows into dangerous sinks.
-    This is a lightweight, regex-based taint tracker.
+    Return `dotted` when it is one of `names`. Callers resolve imports
+    first (`from os import system` makes `system` read `os.system`); only
+    the full name matches, so `self.input` or `obj.eval` never do.
+    """
+    return dotted if dotted in names else None
+
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    """`a.b.c` for Name/Attribute chains, else None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _import_aliases(module: ast.Module) -> Dict[str, str]:
+    """
+    Local name → fully qualified name, from the module's imports.
+
+    Relative imports keep their leading dots (`.repo.find`); they are
+    resolved against the module's package when summaries are linked.
+    """
+    aliases = {}
+    for node in ast.walk(module):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+                else:
+                    head = alias.name.split(".", 1)[0]
+                    aliases[head] = head
+        elif isinstance(node, ast.ImportFrom):
+            prefix = "." * node.level + (node.module or "")
+            for alias in node.names:
+                if alias.name == "*":
+                    continue
+                target = f"{prefix}.{alias.name}" if node.module else f"{prefix}{alias.name}"
+                aliases[alias.asname or alias.name] = target
+    return aliases
+
+
+def sink_finding(filepath: str, var: str, sink: str, line: int, col: int, snippet: str,
+                 via: Optional[str] = None, meta=None) -> Finding:
+    """A SEC_T002 finding: tainted `var` reaches `sink` (optionally through `via`)."""
+    route = f" via '{via}()'" if via else ""
+    return Finding(
+        agent="security",
+        rule_id="SEC_T002",
+        message=f"Tainted variable '{var}' flows into dangerous sink '{sink}()'{route} — possible injection risk.",
+        severity="error",
+        filepath=filepath,
+        line=line,
+        col=col,
+        code_snippet=snippet,
+        suggestion=f"Sanitize or validate '{var}' before passing to '{sink}()'.",
+        meta=meta,
+    )
+
+
+# -------------------------------------
+# Function summaries
+# -------------------------------------
+@dataclass
+class CallSite:
     """
-    findings: list[Finding] = []
-    lines = code.splitlines()
+    A call whose target may live elsewhere in the project.
+
+    `callee` is ":name" for a function of the same module, otherwise the
+    import-resolved dotted name; `name` is the call as written.
+    """
+    callee: str
+    name: str
+    line: int
+    col: int
+    args: List[Taint]
+    arg_names: List[str]
+    snippet: str = ""
+
+
+@dataclass
+class CallSink:
+    """The return value of call site `site` reaching `sink`."""
+    site: int
+    sink: str
+    var: str
+    line: int
+    col: int
+    snippet: str = ""
+    via: Optional[str] = None
+
+
+@dataclass
+class FunctionSummary:
+    """
+    What a function does with taint, independent of its callers.
+
+    `returns` holds the labels its return value may carry; `sinks` maps
+    a parameter index to the sinks that parameter reaches. `calls` and
+    `call_sinks` keep cross-module flows symbolic until linking.
+    """
+    name: str
+    params: List[str]
+    returns: Taint = CLEAN
+    sinks: Dict[int, List[str]] = field(default_factory=dict)
+    calls: List[CallSite] = field(default_factory=list)
+    call_sinks: List[CallSink] = field(default_factory=list)
+
+
+def _methods(body) -> Dict[str, ast.AST]:
+    """`Class.method` → node, for the methods of top-level classes."""
+    return {
+        f"{node.name}.{item.name}": item
+        for node in body if isinstance(node, ast.ClassDef)
+        for item in node.body if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+
+
+def _is_static(func) -> bool:
+    return any(isinstance(d, ast.Name) and d.id == "staticmethod" for d in func.decorator_list)
+
+
+def _params(func) -> List[str]:
+    args = func.args
+    names = [a.arg for a in args.posonlyargs + args.args]
+    if args.vararg:
+        names.append(args.vararg.arg)
+    names += [a.arg for a in args.kwonlyargs]
+    if args.kwarg:
+        names.append(args.kwarg.arg)
+    return names
+
+
+class _ModuleAnalysis:
+    """
+    Taint analysis of one module: a summary for every scope (top-level
+    functions by name, methods as `Class.method`, module code as
+    `<module>`) plus the findings of every scope.
+    """
+
+    def __init__(self, filepath: str, doc: SourceDocument, module: Optional[ast.Module],
+                 aliases: Optional[Dict[str, str]] = None, functions: Optional[Dict[str, ast.AST]] = None,
+                 methods: Optional[Dict[str, ast.AST]] = None):
+        self.filepath = filepath
+        self.doc = doc
+        self.aliases = _import_aliases(module) if aliases is None else aliases
+        if functions is None:
+            functions = {
+                node.name: node
+                for node in module.body
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            }
+        self.functions = functions
+        self.methods = _methods(module.body) if methods is None else methods
+        self.classes = {name.split(".", 1)[0] for name in self.methods}
+        self.summaries: Dict[str, FunctionSummary] = {}
+        self.findings: List[Finding] = []
+        self.module = module
+        self._seen = set()
+
+    def run(self) -> List[Finding]:
+        for name in self.functions:
+            self.summary(name)
+        self.scope("<module>", [], "").run(self.module.body)
+        self.findings.sort(key=lambda f: (f.line, f.rule_id))
+        return self.findings
+
+    def scope(self, name: str, params: List[str], prefix: str, owner: Optional[str] = None) -> "_Scope":
+        summary = self.summaries[name] = FunctionSummary(name, params)
+        return _Scope(self, summary, params, prefix, owner)
+
+    # --- helpers used by scopes ---
+    def resolve(self, dotted: Optional[str]) -> Optional[str]:
+        """Expand an import alias on the first component of `dotted`."""
+        if not dotted:
+            return dotted
+        head, _, rest = dotted.partition(".")
+        target = self.aliases.get(head)
+        if target is None:
+            return dotted
+        return f"{target}.{rest}" if rest else target
+
+    def summary(self, name: str) -> FunctionSummary:
+        """The summary of a top-level function or a method (`Class.method`)."""
+        summary = self.summaries.get(name)
+        if summary is None:
+            func = self.functions.get(name) or self.methods[name]
+            owner = name.split(".", 1)[0] if name in self.methods and not _is_static(func) else None
+            # Registered first, so recursion sees an (empty) summary
+            scope = self.scope(name, _params(func), f"{name}.<locals>.", owner)
+            scope.run(func.body)
+            summary = scope.summary
+        return summary
+
+    def snippet(self, line: int) -> str:
+        return self.doc.line_index.line_text(line).strip()
+
+    def emit(self, finding: Finding):
+        # Loop bodies are walked twice; report each flow once
+        key = (finding.rule_id, finding.line, finding.col, finding.message)
+        if key not in self._seen:
+            self._seen.add(key)
+            self.findings.append(finding)
+
+    def report_source(self, var: str, source: str, line: int):
+        self.emit(Finding(
+            agent="security",
+            rule_id="SEC_T001",
+            message=f"Variable '{var}' marked as tainted from source '{source}()'.",
+            severity="info",
+            filepath=self.filepath,
+            line=line,
+            col=1,
+            code_snippet=self.snippet(line),
+        ))
+
+    def report_sink(self, var: str, sink: str, line: int, col: int, via: Optional[str] = None):
+        self.emit(sink_finding(self.filepath, var, sink, line, col, self.snippet(line), via))
+
+
+class _Scope:
+    """
+    One pass over a function (or the module) body, tracking the taint
+    of every local name and attribute path.
+    """
+
+    def __init__(self, analysis: _ModuleAnalysis, summary: FunctionSummary, params: List[str], prefix: str,
+                 owner: Optional[str] = None):
+        self.analysis = analysis
+        self.summary = summary
+        self.prefix = prefix
+        self.env: Dict[str, Taint] = {name: frozenset([i]) for i, name in enumerate(params)}
+        self.sites: Dict[Tuple[int, int], int] = {}
+        # Local name → the module class it is an instance of (`self` in a method)
+        self.instances: Dict[str, str] = {params[0]: owner} if owner and params else {}
+
+    def run(self, body):
+        self.block(body)
+
+    # --- statements ---
+    def block(self, body):
+        for stmt in body:
+            self.stmt(stmt)
+
+    def stmt(self, node: ast.stmt):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            name = self.prefix + node.name
+            if self.analysis.methods.get(name) is node:
+                self.analysis.summary(name)  # may already exist, for a call seen earlier
+            elif self.analysis.functions.get(node.name) is not node:
+                # Nested functions get their own scope; top-level
+                # functions are summarised separately
+                self.analysis.scope(name, _params(node), f"{name}.<locals>.").run(node.body)
+            return
+        if isinstance(node, ast.ClassDef):
+            name = self.prefix + node.name
+            self.analysis.scope(name, [], f"{name}.").run(node.body)
+            return
+
+        if isinstance(node, (ast.If, ast.While)):
+            self.check_sinks(node.test)
+            self.branch(node.body, node.orelse, loop=isinstance(node, ast.While))
+        elif isinstance(node, (ast.For, ast.AsyncFor)):
+            self.check_sinks(node.iter)
+            self.bind(node.target, self.taint(node.iter), node.iter)
+            self.branch(node.body, node.orelse, loop=True)
+        elif isinstance(node, (ast.With, ast.AsyncWith)):
+            for item in node.items:
+                self.check_sinks(item.context_expr)
+                if item.optional_vars is not None:
+                    self.bind(item.optional_vars, self.taint(item.context_expr), item.context_expr)
+            self.block(node.body)
+        elif isinstance(node, ast.Try) or type(node).__name__ == "TryStar":
+            self.block(node.body)
+            for handler in node.handlers:
+                self.block(handler.body)
+            self.block(node.orelse)
+            self.block(node.finalbody)
+        elif isinstance(node, ast.Match):
+            self.check_sinks(node.subject)
+            self.branch(*[case.body for case in node.cases])
+        elif isinstance(node, ast.Assign):
+            self.check_sinks(node.value)
+            taint = self.taint(node.value)
+            for target in node.targets:
+                self.bind(target, taint, node.value)
+        elif isinstance(node, ast.AnnAssign):
+            if node.value is not None:
+                self.check_sinks(node.value)
+                self.bind(node.target, self.taint(node.value), node.value)
+        elif isinstance(node, ast.AugAssign):
+            self.check_sinks(node.value)
+            key = _dotted(node.target)
+            if key:
+                self.env[key] = self.env.get(key, CLEAN) | self.taint(node.value)
+        elif isinstance(node, ast.Return):
+            if node.value is not None:
+                self.check_sinks(node.value)
+                self.summary.returns |= self.taint(node.value)
+        else:
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, ast.expr):
+                    self.check_sinks(child)
+
+    def branch(self, *bodies, loop: bool = False):
+        """Run each body on a copy of the environment and join the results."""
+        before = dict(self.env)
+        merged = dict(before)
+        for body in bodies:
+            self.env = dict(before)
+            for _ in range(2 if loop else 1):  # a second pass reaches loop-carried taint
+                self.block(body)
+            for key, taint in self.env.items():
+                merged[key] = merged.get(key, CLEAN) | taint
+        self.env = merged
+
+    def bind(self, target: ast.expr, taint: Taint, value: ast.expr):
+        if isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self.bind(element, taint, value)
+            return
+        if isinstance(target, ast.Starred):
+            self.bind(target.value, taint, value)
+            return
+        if isinstance(target, ast.Subscript):
+            key = _dotted(target.value)
+            if key:  # d[k] = v taints the container
+                self.env[key] = self.env.get(key, CLEAN) | taint
+            return
+        key = _dotted(target)
+        if key is None:
+            return
+        if isinstance(target, ast.Name):
+            cls = _dotted(value.func) if isinstance(value, ast.Call) else None
+            if cls in self.analysis.classes:
+                self.instances[key] = cls
+            else:
+                self.instances.pop(key, None)
+        if isinstance(target, ast.Attribute):
+            self.env[key] = self.env.get(key, CLEAN) | taint
+        else:
+            self.env[key] = taint
+        source = self.direct_source(value) if SOURCE in taint else None
+        if source is not None and isinstance(target, ast.Name):
+            self.analysis.report_source(target.id, source, target.lineno)
+
+    # --- expressions ---
+    def source_of(self, node: ast.expr) -> Optional[str]:
+        """The source `node` reads directly (`input()`, `request.args`, ...)."""
+        if isinstance(node, ast.Call):
+            node = node.func
+        dotted = self.analysis.resolve(_dotted(node))
+        while dotted:
+            source = _lookup(SOURCES, dotted)
+            if source is not None:
+                return source
+            dotted = dotted.rpartition(".")[0]  # request.args.get → request.args
+        return None
+
+    def direct_source(self, node: ast.expr) -> Optional[str]:
+        """The first source read anywhere inside `node`."""
+        for child in ast.walk(node):
+            if isinstance(child, (ast.Call, ast.Attribute, ast.Name)):
+                source = self.source_of(child)
+                if source is not None:
+                    return source
+        return None
+
+    def taint(self, node: ast.expr) -> Taint:
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            if self.source_of(node) is not None:
+                return frozenset([SOURCE])
+            taint = self.env.get(_dotted(node) or "", CLEAN)
+            if isinstance(node, ast.Attribute):
+                taint |= self.taint(node.value)
+            return taint
+        if isinstance(node, ast.Call):
+            return self.call_taint(node)
+        if isinstance(node, ast.Constant):
+            return CLEAN
+        if isinstance(node, ast.Lambda):
+            return CLEAN
+        taint = CLEAN
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.expr):
+                taint |= self.taint(child)
+            elif isinstance(child, ast.comprehension):
+                taint |= self.taint(child.iter)
+        return taint
+
+    def call_taint(self, node: ast.Call) -> Taint:
+        if self.source_of(node) is not None:
+            return frozenset([SOURCE])
+        written = _dotted(node.func)
+        dotted = self.analysis.resolve(written)
+        if _lookup(SANITIZERS, dotted):
+            return CLEAN
+        arg_taints = [self.taint(arg) for arg in node.args]
+        local = self.local_callee(node)
+        if local is not None:
+            name, offset = local
+            arg_taints = [CLEAN] * offset + arg_taints  # a method's `self` is parameter 0
+            summary = self.analysis.summary(name)
+            taint = frozenset(label for label in summary.returns if label == SOURCE)
+            for label in summary.returns:
+                if isinstance(label, int) and label < len(arg_taints):
+                    taint |= arg_taints[label]
+            # The helper's own imported calls are resolved when linking
+            return taint | self.call_site(node, ":" + name, written, arg_taints, offset)
+        # Unknown calls (str(), x.strip(), "...".format()) pass taint through
+        taint = CLEAN
+        for arg_taint in arg_taints:
+            taint |= arg_taint
+        for keyword in node.keywords:
+            taint |= self.taint(keyword.value)
+        if isinstance(node.func, ast.Attribute):
+            taint |= self.taint(node.func.value)
+        imported = written and written.split(".", 1)[0] in self.analysis.aliases
+        if imported and _lookup(SINKS, dotted) is None:
+            taint |= self.call_site(node, dotted, written, arg_taints)
+        return taint
+
+    def local_callee(self, node: ast.Call) -> Optional[Tuple[str, int]]:
+        """
+        The summary name of a call to this module's function or method,
+        with the number of leading parameters the call does not pass (1
+        for the `self` of a bound method), or None.
+        """
+        dotted = self.analysis.resolve(_dotted(node.func))
+        if dotted in self.analysis.functions:
+            return dotted, 0
+        if not isinstance(node.func, ast.Attribute):
+            return None
+        receiver = node.func.value
+        unbound = isinstance(receiver, ast.Name) and receiver.id in self.analysis.classes  # Class.method(obj, ...)
+        if unbound:
+            cls = receiver.id
+        elif isinstance(receiver, ast.Call):
+            cls = _dotted(receiver.func)
+            cls = cls if cls in self.analysis.classes else None
+        else:
+            cls = self.instances.get(_dotted(receiver) or "")
+        name = f"{cls}.{node.func.attr}"
+        method = self.analysis.methods.get(name) if cls else None
+        if method is None:
+            return None
+        return name, 0 if unbound or _is_static(method) else 1
+
+    def call_site(self, node: ast.Call, callee: str, written: str, arg_taints: List[Taint], offset: int = 0) -> Taint:
+        """Record (or widen, on a second loop pass) a call site; return its label."""
+        key = (node.lineno, node.col_offset)
+        index = self.sites.get(key)
+        if index is None:
+            index = self.sites[key] = len(self.summary.calls)
+            self.summary.calls.append(CallSite(
+                callee=callee,
+                name=written,
+                line=node.lineno,
+                col=node.col_offset + 1,
+                args=list(arg_taints),
+                arg_names=["self"] * offset + [self.tainted_name(arg) for arg in node.args],
+                snippet=self.analysis.snippet(node.lineno),
+            ))
+        else:
+            site = self.summary.calls[index]
+            site.args = [old | new for old, new in zip(site.args, arg_taints)]
+        return frozenset([("call", index)])
+
+    def tainted_name(self, node: ast.expr) -> str:
+        """The name to blame for taint in `node`, for messages."""
+        for child in ast.walk(node):
+            if isinstance(child, (ast.Name, ast.Attribute)):
+                key = _dotted(child)
+                if key and self.env.get(key):
+                    return key
+        return self.direct_source(node) or ast.unparse(node)
+
+    def check_sinks(self, expr: ast.expr):
+        """
+        Report every sink call inside `expr` that receives taint, and
+        record the other calls as sites for cross-module linking.
+        """
+        for node in ast.walk(expr):
+            if not isinstance(node, ast.Call):
+                continue
+            dotted = self.analysis.resolve(_dotted(node.func))
+            sink = _lookup(SINKS, dotted)
+            if sink is not None:
+                for arg in list(node.args) + [k.value for k in node.keywords]:
+                    self.flow(arg, sink, node)
+                continue
+            self.call_taint(node)
+            local = self.local_callee(node)
+            if local is not None:
+                name, offset = local
+                for index, sinks in self.analysis.summary(name).sinks.items():
+                    if 0 <= index - offset < len(node.args):
+                        for sink in sinks:
+                            self.flow(node.args[index - offset], sink, node, via=_dotted(node.func) or name)
+
+    def flow(self, arg: ast.expr, sink: str, call: ast.Call, via: Optional[str] = None):
+        taint = self.taint(arg)
+        if SOURCE in taint:
+            self.analysis.report_sink(self.tainted_name(arg), sink, call.lineno, call.col_offset + 1, via)
+        for label in taint:
+            if isinstance(label, int):
+                sinks = self.summary.sinks.setdefault(label, [])
+                if sink not in sinks:
+                    sinks.append(sink)
+            elif isinstance(label, tuple):
+                call_sink = CallSink(label[1], sink, self.tainted_name(arg), call.lineno,
+                                     call.col_offset + 1, self.analysis.snippet(call.lineno), via)
+                if call_sink not in self.summary.call_sinks:
+                    self.summary.call_sinks.append(call_sink)
+
+
+# -------------------------------------
+# Line-based fallback for unparseable files
+# -------------------------------------
+_SOURCE_ASSIGN = [
+    (source, re.compile(rf"\b(\w+)\s*=\s*{re.escape(source)}\s*\(")) for source in sorted(SOURCES)
+]
+_ASSIGNED_NAME = re.compile(r"^(\w+)\s*=")
+
+
+def _line_taint_scan(filepath: str, doc: SourceDocument) -> List[Finding]:
+    findings: List[Finding] = []
     tainted_vars = set()
 
-    for i, line in enumerate(lines, start=1):
+    for i, line in enumerate(doc.lines, start=1):
         clean_line = line.strip()
 
         # Mark tainted variable (e.g., user = input("..."))
-        for source in SOURCES:
-            if re.search(rf"\b(\w+)\s*=\s*{re.escape(source)}\s*\(", clean_line):
-                var_name = re.findall(r"^(\w+)\s*=", clean_line)
+        for source, pattern in _SOURCE_ASSIGN:
+            if pattern.search(clean_line):
+                var_name = _ASSIGNED_NAME.findall(clean_line)
                 if var_name:
                     tainted_vars.add(var_name[0])
                     findings.append(Finding(
@@ -63,13 +638,15 @@ def taint_scan(filepath: str, code: str):
                         filepath=filepath,
                         line=i,
                         col=1,
-                        code_snippet=line.strip()
+                        code_snippet=clean_line
                     ))
 
         # Check if tainted variable used in dangerous sink
-        for sink in SINKS:
-            for var in tainted_vars:
-                if re.search(rf"{sink}\s*\(.*{var}.*\)", clean_line):
+        for sink in sorted(SINKS):
+            if sink not in clean_line:
+                continue
+            for var in sorted(tainted_vars):
+                if re.search(rf"{re.escape(sink)}\s*\(.*\b{re.escape(var)}\b.*\)", clean_line):
                     findings.append(Finding(
                         agent="security",
                         rule_id="SEC_T002",
@@ -78,8 +655,111 @@ def taint_scan(filepath: str, code: str):
                         filepath=filepath,
                         line=i,
                         col=1,
-                        code_snippet=line.strip(),
+                        code_snippet=clean_line,
                         suggestion=f"Sanitize or validate '{var}' before passing to '{sink}()'."
                     ))
 
     return findings
+
+
+# -------------------------------------
+# Function: taint_scan
+# -------------------------------------
+@dataclass
+class TaintState:
+    """
+    What `reanalyze` needs from an earlier analysis of the same module.
+    """
+    aliases: Dict[str, str]
+    functions: Dict[str, ast.AST]
+    summaries: Dict[str, FunctionSummary]
+    methods: Dict[str, ast.AST] = field(default_factory=dict)
+
+
+# Analyses already run for a document (the findings scan and the
+# cross-module summaries of one file share one)
+_by_document: "weakref.WeakKeyDictionary[SourceDocument, tuple]" = weakref.WeakKeyDictionary()
+_by_document_lock = threading.Lock()
+
+
+def analyze_state(filepath: str, code: Source) -> Tuple[List[Finding], Optional[TaintState]]:
+    """
+    Run the full analysis, returning the findings and the state for
+    later incremental updates (None for files that do not parse). A
+    document is analysed once.
+    """
+    doc = SourceDocument.of(filepath, code)
+    with _by_document_lock:
+        found = _by_document.get(doc)
+    if found is not None and found[0] == filepath:
+        return list(found[1]), found[2]
+
+    module = doc.ast_tree
+    if module is None:
+        findings, state = _line_taint_scan(filepath, doc), None
+    else:
+        analysis = _ModuleAnalysis(filepath, doc, module)
+        findings = analysis.run()
+        state = TaintState(analysis.aliases, analysis.functions, analysis.summaries, analysis.methods)
+    with _by_document_lock:
+        _by_document[doc] = (filepath, findings, state)
+    return list(findings), state
+
+
+def reanalyze(state: TaintState, filepath: str, code: Source, nodes: List[ast.stmt]):
+    """
+    Re-analyse only the edited top-level functions and classes in
+    `nodes` (with absolute line numbers); every other scope is unchanged.
+
+    The caller guarantees the edit touched no imports and no module-level
+    statements. Returns (findings for `nodes`, new state), or None when
+    an edited function's or method's summary changed — its callers must
+    then be re-analysed, so run `analyze_state` instead.
+    """
+    doc = SourceDocument.of(filepath, code)
+    names = {node.name for node in nodes}
+    functions = dict(state.functions)
+    for node in nodes:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions[node.name] = node
+    methods = {name: node for name, node in state.methods.items() if name.split(".", 1)[0] not in names}
+    methods.update(_methods(nodes))
+
+    analysis = _ModuleAnalysis(filepath, doc, None, aliases=state.aliases, functions=functions, methods=methods)
+    # Summaries of untouched scopes are reused; nested scopes go with their parent
+    analysis.summaries = {
+        name: summary for name, summary in state.summaries.items()
+        if name.split(".", 1)[0] not in names
+    }
+    for node in nodes:
+        if isinstance(node, ast.ClassDef):
+            analysis.scope(node.name, [], f"{node.name}.").run(node.body)
+            edited = [name for name in methods if name.split(".", 1)[0] == node.name]
+            edited += [name for name in state.methods if name.split(".", 1)[0] == node.name]
+        else:
+            edited = [node.name]
+        for name in edited:
+            summary = analysis.summary(name) if name in functions or name in methods else None
+            old = state.summaries.get(name)
+            if old is None or summary is None or (old.returns, old.sinks) != (summary.returns, summary.sinks):
+                return None
+
+    analysis.findings.sort(key=lambda f: (f.line, f.rule_id))
+    return analysis.findings, TaintState(state.aliases, functions, analysis.summaries, methods)
+
+
+def analyze_module(filepath: str, code: Source) -> Tuple[List[Finding], Dict[str, FunctionSummary]]:
+    """
+    Run the taint analysis once, returning the findings and the
+    per-scope summaries (empty for files that do not parse).
+    """
+    findings, state = analyze_state(filepath, code)
+    return findings, state.summaries if state is not None else {}
+
+
+@profiled("security.taint_scan")
+def taint_scan(filepath: str, code: Source):
+    """
+    Detects if data from an untrusted source flows into dangerous sinks.
+    """
+    return analyze_module(filepath, code)[0]
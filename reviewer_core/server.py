@@ -0,0 +1,513 @@
+"""
+Review Server
+-------------
+A long-lived reviewer for editors. It speaks a subset of the Language
+Server Protocol (JSON-RPC 2.0 with `Content-Length` framing) over stdio.
+The interpreter, agents, caches and Tree-sitter parser stay warm between
+requests.
+
+- `textDocument/didOpen` / `didChange` keep one `IncrementalReview` per
+  buffer and push `textDocument/publishDiagnostics` after a short
+  debounce. Edits that arrive while a run is pending supersede it, so
+  only the newest version is analysed and published.
+- `review/file` runs the full review (and the LLM when asked) on the
+  current buffer and returns the same JSON shape as the CLI report.
+  A newer `review/file` for the same document cancels the older one, and
+  `$/cancelRequest` is honoured between agents. With a `stream` key in
+  its params, `review/event` notifications carry each agent's findings
+  and the LLM text as they are produced.
+- Requests and diagnostics run concurrently in a thread pool; each
+  buffer has its own lock.
+
+All `print` output goes to stderr while serving, since stdout carries
+the protocol.
+"""
+
+import json
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+from . import __version__
+from .cache import FindingsCache, run_cached
+from .incremental import IncrementalReview, TextEdit
+from .llm.gemini_client import review_code
+from .models import Finding, ReviewBundle, ReviewEvent
+from .security.runner import run_security
+from .source import LineIndex, SourceDocument
+from .static_analysis.runner import run_static
+
+# Seconds to wait for more typing before analysing a changed buffer
+DEBOUNCE_SECONDS = 0.15
+
+# JSON-RPC / LSP error codes
+PARSE_ERROR = -32700
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+REQUEST_CANCELLED = -32800
+
+# Finding severity → LSP DiagnosticSeverity
+_SEVERITY = {"error": 1, "warning": 2, "info": 3}
+
+
+# ------------------------------------
+# Framing
+# ------------------------------------
+def read_message(stream: BinaryIO) -> Optional[dict]:
+    """
+    Read one framed JSON-RPC message; None at end of stream.
+    """
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            if length is None:
+                continue  # stray blank line between messages
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = stream.read(length)
+    return json.loads(body.decode("utf-8"))
+
+
+def write_message(stream: BinaryIO, message: dict):
+    """
+    Write one framed JSON-RPC message.
+    """
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    stream.flush()
+
+
+# ------------------------------------
+# Positions and diagnostics
+# ------------------------------------
+def uri_to_path(uri: str) -> str:
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
+        return uri
+    return url2pathname(unquote(parsed.path))
+
+
+def _utf16_units(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _from_utf16(line_text: str, character: int) -> int:
+    """Python string index of a UTF-16 column on one line."""
+    units = 0
+    for i, ch in enumerate(line_text):
+        if units >= character:
+            return i
+        units += 2 if ord(ch) > 0xFFFF else 1
+    return len(line_text)
+
+
+def _has_astral(text: str) -> bool:
+    """True when UTF-16 and Python columns can differ in `text`."""
+    return not text.isascii() and max(text) > "\uffff"
+
+
+def to_diagnostic(finding: Finding, index: LineIndex, utf16: bool = False) -> dict:
+    """
+    LSP Diagnostic for a finding, spanning the rest of its line.
+    """
+    line = max(finding.line, 1)
+    text = index.line_text(line) if line <= len(index) else ""
+    start = min(max(finding.col, 1) - 1, len(text))
+    end = len(text)
+    if utf16 and not text.isascii():
+        start, end = _utf16_units(text[:start]), _utf16_units(text)
+    diagnostic = {
+        "range": {
+            "start": {"line": line - 1, "character": start},
+            "end": {"line": line - 1, "character": max(end, start)},
+        },
+        "severity": _SEVERITY.get(finding.severity, 3),
+        "code": finding.rule_id,
+        "source": f"code-reviewer ({finding.agent})",
+        "message": finding.message,
+    }
+    if finding.suggestion:
+        diagnostic["message"] += f"\n💡 {finding.suggestion}"
+    return diagnostic
+
+
+def bundle_report(filepath: str, bundle: ReviewBundle) -> dict:
+    """
+    The CLI's per-file JSON report shape.
+    """
+    return {
+        "filepath": filepath,
+        "static": [f.to_dict() for f in bundle.static_findings],
+        "security": [f.to_dict() for f in bundle.security_findings],
+        "llm": [f.to_dict() for f in bundle.llm_comments],
+    }
+
+
+# ------------------------------------
+# Server state
+# ------------------------------------
+class RequestCancelled(Exception):
+    """Raised inside a request handler once its request was cancelled."""
+
+
+class _Token:
+    """Cancellation flag of one in-flight request."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise RequestCancelled()
+
+
+@dataclass
+class _Document:
+    """
+    One open buffer. `pending` holds edits not yet applied to `review`.
+    """
+    uri: str
+    filepath: str
+    text: Optional[str]  # initial text, until `review` is built
+    version: int = 0
+    review: Optional[IncrementalReview] = None
+    pending: List[TextEdit] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    closed: bool = False
+
+    def flush(self, utf16: bool) -> IncrementalReview:
+        """Bring `review` up to date (call with `lock` held)."""
+        if self.review is None:
+            self.review = IncrementalReview(self.filepath, self.text or "")
+            self.text = None
+        if self.pending:
+            edits, self.pending = self.pending, []
+            if utf16:
+                edits = self._convert_utf16(edits)
+            self.review.apply(edits)
+        return self.review
+
+    def _convert_utf16(self, edits: List[TextEdit]) -> List[TextEdit]:
+        """Rewrite UTF-16 columns as Python string indices, edit by edit."""
+        code = self.review.code
+        if not _has_astral(code) and not any(_has_astral(edit.text) for edit in edits):
+            return edits  # every column means the same in both encodings
+        converted = []
+        for edit in edits:
+            if edit.start_line is not None and _has_astral(code):
+                lines = code.split("\n")
+
+                def column(line, character):
+                    return _from_utf16(lines[line], character) if line < len(lines) else character
+
+                edit = TextEdit(
+                    edit.text,
+                    edit.start_line,
+                    column(edit.start_line, edit.start_character),
+                    edit.end_line,
+                    column(edit.end_line, edit.end_character),
+                )
+            code = _apply_text_edit(code, edit)
+            converted.append(edit)
+        return converted
+
+
+def _apply_text_edit(code: str, edit: TextEdit) -> str:
+    if edit.start_line is None:
+        return edit.text
+    index = LineIndex(code)
+
+    def offset(line, character):
+        if line >= len(index.starts):
+            return len(code)
+        line_end = index.starts[line + 1] - 1 if line + 1 < len(index.starts) else len(code)
+        return min(index.starts[line] + character, line_end)
+
+    start = offset(edit.start_line, edit.start_character)
+    end = max(offset(edit.end_line, edit.end_character), start)
+    return code[:start] + edit.text + code[end:]
+
+
+def _text_edit(change: dict) -> TextEdit:
+    """TextEdit for an LSP TextDocumentContentChangeEvent."""
+    if "range" not in change:
+        return TextEdit(change["text"])
+    start, end = change["range"]["start"], change["range"]["end"]
+    return TextEdit(change["text"], start["line"], start["character"], end["line"], end["character"])
+
+
+# ------------------------------------
+# The server
+# ------------------------------------
+class ReviewServer:
+    """
+    JSON-RPC review server over a pair of binary streams.
+    """
+
+    def __init__(
+        self,
+        reader: BinaryIO,
+        writer: BinaryIO,
+        workers: int = 4,
+        debounce: float = DEBOUNCE_SECONDS,
+        cache: Optional[FindingsCache] = None,
+    ):
+        self.reader = reader
+        self.writer = writer
+        self.debounce = debounce
+        self.cache = cache
+        self.utf16 = True  # LSP default position encoding
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="review-server")
+        self._write_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._documents: Dict[str, _Document] = {}
+        self._requests: Dict[object, _Token] = {}   # in-flight request id → token
+        self._reviews: Dict[str, object] = {}       # uri → id of its newest review/file
+        self._shutdown = False
+
+        self._handlers = {
+            "initialize": self.initialize,
+            "shutdown": self.shutdown,
+            "review/file": self.review_file,
+        }
+        self._notifications = {
+            "initialized": lambda params: None,
+            "exit": lambda params: None,
+            "$/cancelRequest": self.cancel_request,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didClose": self.did_close,
+            "textDocument/didSave": lambda params: None,
+        }
+
+    # ------------------------------------
+    # Main loop
+    # ------------------------------------
+    def serve_forever(self) -> int:
+        """
+        Handle messages until `exit` or end of input. Returns the exit
+        code LSP expects (0 only after a `shutdown` request).
+        """
+        try:
+            while True:
+                try:
+                    message = read_message(self.reader)
+                except (ValueError, UnicodeDecodeError) as e:
+                    self._send({"jsonrpc": "2.0", "id": None, "error": {"code": PARSE_ERROR, "message": str(e)}})
+                    continue
+                if message is None or message.get("method") == "exit":
+                    break
+                self._dispatch(message)
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        return 0 if self._shutdown else 1
+
+    def _send(self, message: dict):
+        with self._write_lock:
+            write_message(self.writer, message)
+
+    def _notify(self, method: str, params: dict):
+        self._send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def _dispatch(self, message: dict):
+        method = message.get("method")
+        params = message.get("params") or {}
+        if "id" not in message:
+            handler = self._notifications.get(method)
+            if handler is not None:
+                handler(params)
+            return
+
+        request_id = message["id"]
+        handler = self._handlers.get(method)
+        if handler is None:
+            self._send({
+                "jsonrpc": "2.0", "id": request_id,
+                "error": {"code": METHOD_NOT_FOUND, "message": f"Unknown method: {method}"},
+            })
+            return
+        token = _Token()
+        with self._state_lock:
+            self._requests[request_id] = token
+        self._pool.submit(self._run_request, request_id, handler, params, token)
+
+    def _run_request(self, request_id, handler, params: dict, token: _Token):
+        try:
+            token.check()
+            response = {"result": handler(params, request_id, token)}
+        except RequestCancelled:
+            response = {"error": {"code": REQUEST_CANCELLED, "message": "Request cancelled"}}
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            response = {"error": {"code": INTERNAL_ERROR, "message": f"{type(e).__name__}: {e}"}}
+        finally:
+            with self._state_lock:
+                self._requests.pop(request_id, None)
+        self._send({"jsonrpc": "2.0", "id": request_id, **response})
+
+    # ------------------------------------
+    # Lifecycle
+    # ------------------------------------
+    def initialize(self, params: dict, request_id, token: _Token) -> dict:
+        encodings = ((params.get("capabilities") or {}).get("general") or {}).get("positionEncodings") or []
+        self.utf16 = "utf-32" not in encodings
+        return {
+            "capabilities": {
+                "positionEncoding": "utf-16" if self.utf16 else "utf-32",
+                "textDocumentSync": {"openClose": True, "change": 2},  # incremental
+            },
+            "serverInfo": {"name": "code-reviewer", "version": __version__},
+        }
+
+    def shutdown(self, params: dict, request_id, token: _Token):
+        self._shutdown = True
+        return None
+
+    def cancel_request(self, params: dict):
+        with self._state_lock:
+            token = self._requests.get(params.get("id"))
+        if token is not None:
+            token.cancel()
+
+    # ------------------------------------
+    # Documents and diagnostics
+    # ------------------------------------
+    def did_open(self, params: dict):
+        item = params["textDocument"]
+        uri = item["uri"]
+        document = _Document(uri, uri_to_path(uri), item.get("text", ""), item.get("version", 0))
+        with self._state_lock:
+            self._documents[uri] = document
+        self._pool.submit(self._publish, document, document.version, 0.0)
+
+    def did_change(self, params: dict):
+        item = params["textDocument"]
+        with self._state_lock:
+            document = self._documents.get(item["uri"])
+        if document is None:
+            return
+        with document.lock:
+            # Applied lazily by the next diagnostics or review run
+            document.pending += [_text_edit(change) for change in params.get("contentChanges", [])]
+            document.version = version = item.get("version", document.version + 1)
+        self._pool.submit(self._publish, document, version, self.debounce)
+
+    def did_close(self, params: dict):
+        uri = params["textDocument"]["uri"]
+        with self._state_lock:
+            document = self._documents.pop(uri, None)
+        if document is not None:
+            document.closed = True
+            self._notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    def _publish(self, document: _Document, version: int, delay: float):
+        """Analyse and publish one version, unless a newer one superseded it."""
+        try:
+            if delay:
+                time.sleep(delay)
+            if document.closed or document.version != version:
+                return
+            with document.lock:
+                if document.closed or document.version != version:
+                    return
+                review = document.flush(self.utf16)
+                bundle = review.bundle
+                index = LineIndex(review.code)
+                diagnostics = [
+                    to_diagnostic(f, index, self.utf16)
+                    for f in bundle.static_findings + bundle.security_findings
+                ]
+                self._notify("textDocument/publishDiagnostics", {
+                    "uri": document.uri, "version": version, "diagnostics": diagnostics,
+                })
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+
+    # ------------------------------------
+    # Full reviews
+    # ------------------------------------
+    def _current_text(self, uri: str):
+        with self._state_lock:
+            document = self._documents.get(uri)
+        if document is None:
+            filepath = uri_to_path(uri)
+            return filepath, Path(filepath).read_text(encoding="utf-8")
+        with document.lock:
+            return document.filepath, document.flush(self.utf16).code
+
+    def review_file(self, params: dict, request_id, token: _Token) -> dict:
+        """
+        Full review of one document: static, security and (optionally)
+        LLM findings, in the CLI report's JSON shape.
+
+        With `params["stream"]`, progress is also sent as `review/event`
+        notifications tagged with that key.
+        """
+        uri = params["textDocument"]["uri"]
+        stream = params.get("stream")
+
+        def emit(event: ReviewEvent):
+            if stream is not None and not token.cancelled:
+                self._notify("review/event", {"stream": stream, "event": event.to_dict()})
+
+        def emit_findings(agent: str, findings: List[Finding]):
+            for finding in findings:
+                emit(ReviewEvent("finding", filepath, agent, finding=finding))
+
+        with self._state_lock:
+            previous = self._requests.get(self._reviews.get(uri))
+            self._reviews[uri] = request_id
+        if previous is not None:
+            previous.cancel()  # superseded by this request
+
+        filepath, code = self._current_text(uri)
+        doc = SourceDocument(filepath, code)
+        token.check()
+        static_findings = run_cached(self.cache, "static", run_static, filepath, doc)
+        token.check()
+        emit_findings("static", static_findings)
+        security_findings = run_cached(self.cache, "security", run_security, filepath, doc)
+        token.check()
+        emit_findings("security", security_findings)
+        llm_comments = []
+        if params.get("llm", False):
+            llm_comments = review_code(
+                filepath, doc, static_findings, security_findings,
+                on_text=lambda text: emit(ReviewEvent("llm_text", filepath, "llm", text=text)),
+            )
+            token.check()
+            emit_findings("llm", llm_comments)
+
+        with self._state_lock:
+            if self._reviews.get(uri) == request_id:
+                del self._reviews[uri]
+        return bundle_report(filepath, ReviewBundle(static_findings, security_findings, llm_comments))
+
+
+def serve_stdio(workers: int = 4, debounce: float = DEBOUNCE_SECONDS, cache: Optional[FindingsCache] = None) -> int:
+    """
+    Serve over this process's stdin/stdout.
+    """
+    reader, writer = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr  # agents' progress prints must not corrupt the protocol
+    return ReviewServer(reader, writer, workers=workers, debounce=debounce, cache=cache).serve_forever()
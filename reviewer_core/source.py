@@ -0,0 +1,186 @@
+"""
+Source Utilities
+----------------
+Shared, per-file helpers used by every agent.
+
+`LineIndex` records the offset of each line start once, so agents can
+map a match offset to a (line, col) pair with a bisect and fetch a
+single line's text without re-splitting the whole file.
+
+`SourceDocument` wraps one file and lazily derives (and memoizes) its
+lines, line index, token stream, `ast` tree and Tree-sitter tree, so a
+review tokenizes and parses each file at most once.
+"""
+
+import ast
+import hashlib
+import io
+import threading
+import tokenize
+from bisect import bisect_right
+from typing import Iterator, List, Optional, Tuple, Union
+
+from .profiling import span
+
+
+class LineIndex:
+    """
+    Offset → (line, col) lookup table for one source string.
+
+    Lines and columns are 1-based, matching `Finding.line` / `Finding.col`.
+    """
+
+    __slots__ = ("text", "starts")
+
+    def __init__(self, text: str):
+        self.text = text
+        starts: List[int] = [0]
+        find = text.find
+        pos = find("\n")
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find("\n", pos + 1)
+        # A trailing newline does not open a new line (same as str.splitlines)
+        if len(starts) > 1 and starts[-1] == len(text):
+            starts.pop()
+        self.starts = starts
+
+    def __len__(self) -> int:
+        return len(self.starts) if self.text else 0
+
+    def line_of(self, offset: int) -> int:
+        """Return the 1-based line number containing `offset`."""
+        return bisect_right(self.starts, offset)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Return the 1-based (line, col) pair for `offset`."""
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+    def line_start(self, line: int) -> int:
+        """Offset of the first character of `line`."""
+        return self.starts[line - 1]
+
+    def line_end(self, line: int) -> int:
+        """Offset just past the last character of `line` (newline excluded)."""
+        text = self.text
+        start = self.starts[line - 1]
+        if line < len(self.starts):
+            end = self.starts[line] - 1
+        else:
+            end = len(text)
+            if end > start and text[end - 1] == "\n":
+                end -= 1
+        if end > start and text[end - 1] == "\r":
+            end -= 1
+        return end
+
+    def line_text(self, line: int) -> str:
+        """Text of `line` without its line terminator ("" if out of range)."""
+        if line < 1 or line > len(self):
+            return ""
+        return self.text[self.starts[line - 1]:self.line_end(line)]
+
+    def iter_lines(self) -> Iterator[Tuple[int, str]]:
+        """Yield (line_number, text) pairs, one line at a time."""
+        for line in range(1, len(self) + 1):
+            yield line, self.line_text(line)
+
+
+class _memoized:
+    """
+    Like functools.cached_property, but computes at most once even when
+    several agent threads ask for the same view at the same time.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        cache = obj.__dict__
+        if self.name in cache:
+            return cache[self.name]
+        with obj._lock:
+            if self.name not in cache:
+                cache[self.name] = self.func(obj)
+            return cache[self.name]
+
+
+class SourceDocument:
+    """
+    One source file shared by every agent during a review.
+
+    Every derived view is computed on first access and then cached.
+    Parse failures are cached too (as None), so a broken file is not
+    re-parsed by each agent that asks for a tree.
+    """
+
+    def __init__(self, filepath: str, code: str):
+        self.filepath = filepath
+        self.code = code
+        self._lock = threading.RLock()
+
+    @classmethod
+    def of(cls, filepath: str, source: Union[str, "SourceDocument"]) -> "SourceDocument":
+        """Return `source` unchanged if it is already a document, else wrap it."""
+        if isinstance(source, SourceDocument):
+            return source
+        return cls(filepath, source)
+
+    @_memoized
+    def content_hash(self) -> str:
+        """SHA-256 of the source text (the key of content-addressed caches)."""
+        return hashlib.sha256(self.code.encode("utf-8", "surrogatepass")).hexdigest()
+
+    @_memoized
+    def line_index(self) -> LineIndex:
+        return LineIndex(self.code)
+
+    @_memoized
+    def lines(self) -> List[str]:
+        """Source lines without terminators (same numbering as `line_index`)."""
+        lines = self.code.split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        if "\r" in self.code:
+            lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+        return lines
+
+    @_memoized
+    def tokens(self) -> Optional[List[tokenize.TokenInfo]]:
+        """The `tokenize` stream, or None if the file cannot be tokenized."""
+        try:
+            with span("parse.tokens", "parse"):
+                return list(tokenize.generate_tokens(io.StringIO(self.code).readline))
+        except (tokenize.TokenError, SyntaxError):
+            return None
+
+    @_memoized
+    def ast_tree(self) -> Optional[ast.Module]:
+        """The `ast` module tree, or None on a syntax error."""
+        try:
+            with span("parse.ast", "parse"):
+                return ast.parse(self.code, filename=self.filepath)
+        except (SyntaxError, ValueError):
+            return None
+
+    @_memoized
+    def ts_tree(self):
+        """The Tree-sitter tree, or None if Tree-sitter is unavailable."""
+        from .parsing.ts_loader import TreeSitterUnavailable, parse_python
+        try:
+            with span("parse.tree_sitter", "parse"):
+                return parse_python(self.code)
+        except TreeSitterUnavailable:
+            return None  # already reported once by the loader
+        except Exception as e:
+            print(f"⚠️ Tree-sitter parse unavailable: {e}")
+            return None
+
+
+# Agents accept either raw code or an already-shared document
+Source = Union[str, SourceDocument]
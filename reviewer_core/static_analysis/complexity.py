@@ -1,85 +1,125 @@
 """
 Static Analysis — Complexity Checks
 -----------------------------------
-This module calculates code complexity using the Radon library.
-It flags:
-- Functions with high cyclomatic complexity
-- Functions that are too long (LOC threshold)
+This module flags functions and methods whose metrics (see `metrics.py`,
+measured in one pass over the document's shared `ast` tree) cross a
+threshold:
+- High cyclomatic complexity
+- Functions that are too long (real `def`-to-last-line length)
+- Deeply nested blocks
+- Too many parameters
 """
 
-from radon.complexity import cc_visit
+from typing import List
+
 from ..models import Finding
+from ..profiling import profiled
+from ..source import Source, SourceDocument
+from .metrics import FunctionMetrics, function_metrics
+
+COMPLEXITY_THRESHOLD = 10
+LENGTH_THRESHOLD = 60
+DEPTH_THRESHOLD = 5
+PARAMS_THRESHOLD = 7
+
+
+def _metrics(filepath: str, code: Source) -> List[FunctionMetrics]:
+    functions = function_metrics(filepath, code)
+    if functions is None:
+        print("⚠️ Complexity check failed: file could not be parsed")
+        return []
+    return functions
+
+
+def _finding(filepath: str, rule_id: str, message: str, function: FunctionMetrics) -> Finding:
+    return Finding(
+        agent="static",
+        rule_id=rule_id,
+        message=message,
+        severity="warning",
+        filepath=filepath,
+        line=function.line,
+        col=1,
+    )
+
 
 # ------------------------------------
 # Cyclomatic Complexity Checker
 # ------------------------------------
-def check_cyclomatic_complexity(filepath: str, code: str, threshold: int = 10):
+@profiled("static.check_cyclomatic_complexity")
+def check_cyclomatic_complexity(filepath: str, code: Source, threshold: int = COMPLEXITY_THRESHOLD):
     """
     Detect functions with cyclomatic complexity above a threshold.
     """
-    findings = []
-    try:
-        blocks = cc_visit(code)
-    except Exception as e:
-        print(f"⚠️ Complexity check failed: {e}")
-        return findings
-
-    for block in blocks:
-        if block.complexity >= threshold:
-            findings.append(Finding(
-                agent="static",
-                rule_id="C200",
-                message=f"High cyclomatic complexity ({block.complexity}) in function '{block.name}'.",
-                severity="warning",
-                filepath=filepath,
-                line=block.lineno,
-                col=1
-            ))
-    return findings
+    return [
+        _finding(filepath, "C200", f"High cyclomatic complexity ({f.complexity}) in function '{f.qualname}'.", f)
+        for f in _metrics(filepath, code)
+        if f.complexity >= threshold
+    ]
 
 
 # ------------------------------------
 # Function Length Checker
 # ------------------------------------
-def check_function_length(filepath: str, code: str, threshold: int = 60):
+@profiled("static.check_function_length")
+def check_function_length(filepath: str, code: Source, threshold: int = LENGTH_THRESHOLD):
     """
     Detect functions longer than `threshold` lines of code.
     """
-    findings = []
-    lines = code.splitlines()
-    func_starts = []
-
-    # Find 'def' lines
-    for i, line in enumerate(lines, start=1):
-        if line.strip().startswith("def "):
-            func_starts.append(i)
-    func_starts.append(len(lines) + 1)  # end marker
-
-    for i in range(len(func_starts) - 1):
-        start = func_starts[i]
-        end = func_starts[i + 1]
-        length = end - start
-        if length > threshold:
-            findings.append(Finding(
-                agent="static",
-                rule_id="C201",
-                message=f"Function length {length} lines exceeds {threshold}. Consider refactoring.",
-                severity="warning",
-                filepath=filepath,
-                line=start,
-                col=1
-            ))
-    return findings
+    return [
+        _finding(
+            filepath, "C201", f"Function length {f.length} lines exceeds {threshold}. Consider refactoring.", f
+        )
+        for f in _metrics(filepath, code)
+        if f.length > threshold
+    ]
+
+
+# ------------------------------------
+# Nesting Depth Checker
+# ------------------------------------
+@profiled("static.check_nesting_depth")
+def check_nesting_depth(filepath: str, code: Source, threshold: int = DEPTH_THRESHOLD):
+    """
+    Detect functions whose blocks nest deeper than `threshold` levels.
+    """
+    return [
+        _finding(filepath, "C202", f"Blocks nested {f.depth} levels deep in function '{f.qualname}'.", f)
+        for f in _metrics(filepath, code)
+        if f.depth > threshold
+    ]
+
+
+# ------------------------------------
+# Parameter Count Checker
+# ------------------------------------
+@profiled("static.check_parameter_count")
+def check_parameter_count(filepath: str, code: Source, threshold: int = PARAMS_THRESHOLD):
+    """
+    Detect functions that take more than `threshold` parameters.
+    """
+    return [
+        _finding(filepath, "C203", f"Function '{f.qualname}' takes {f.params} parameters (max {threshold}).", f)
+        for f in _metrics(filepath, code)
+        if f.params > threshold
+    ]
 
 
 # ------------------------------------
 # Combine all complexity checks
 # ------------------------------------
-def run_complexity_checks(filepath: str, code: str):
+def run_complexity_checks(filepath: str, code: Source):
     """
-    Runs all complexity-related checks and returns findings.
+    Runs all complexity-related checks and returns findings. The file is
+    measured once; every check reads the same metrics.
     """
     findings = []
-    findings += check_cyclomatic_complexity(filepath, code)
-    findings += check_function_length(filepath, code)
+    doc = SourceDocument.of(filepath, code)
+    if function_metrics(filepath, doc) is None:
+        print("⚠️ Complexity check failed: file could not be parsed")
+        return findings
+    findings += check_cyclomatic_complexity(filepath, doc)
+    findings += check_function_length(filepath, doc)
+    findings += check_nesting_depth(filepath, doc)
+    findings += check_parameter_count(filepath, doc)
     return findings
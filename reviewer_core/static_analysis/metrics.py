@@ -0,0 +1,221 @@
+"""
+Static Analysis — Function Metrics
+----------------------------------
+Measures every function and method of a file in one pass over the
+document's shared `ast` tree:
+
+- cyclomatic complexity (decision points + 1, counted like radon: nested
+  functions and classes do not add to the enclosing function)
+- length (from the `def` line to the function's real last line)
+- block nesting depth (`elif` chains count as one level)
+- parameter count
+
+Measurements are memoized by the hash of each function's source text,
+so a function that did not change is never re-measured, wherever it
+moved to in the file. A document's metrics are computed once and shared
+by every rule that asks for them.
+"""
+
+import ast
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Iterable, List, Optional, Tuple
+
+from ..source import Source, SourceDocument
+
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+# Statements that open a nested block
+BLOCK_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try, ast.Match)
+TRY_NODES = (ast.Try,) + ((ast.TryStar,) if hasattr(ast, "TryStar") else ())
+BLOCK_NODES += TRY_NODES
+
+# Measured function bodies kept for reuse
+MEMO_SIZE = 16384
+
+
+@dataclass(frozen=True)
+class FunctionMetrics:
+    """
+    Metrics of one function or method (1-based, inclusive lines).
+    """
+    name: str
+    qualname: str
+    line: int
+    end_line: int
+    complexity: int
+    depth: int
+    params: int
+
+    @property
+    def length(self) -> int:
+        return self.end_line - self.line + 1
+
+
+# ------------------------------------
+# Memo: body hash → metrics of the function and its nested functions,
+# with lines relative to the `def` line and qualnames relative to it
+# ------------------------------------
+_memo: "OrderedDict[bytes, Tuple[FunctionMetrics, ...]]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+# Metrics already computed for a document
+_by_document: "weakref.WeakKeyDictionary[SourceDocument, List[FunctionMetrics]]" = weakref.WeakKeyDictionary()
+
+
+def _memo_get(key: bytes) -> Optional[Tuple[FunctionMetrics, ...]]:
+    with _memo_lock:
+        found = _memo.get(key)
+        if found is not None:
+            _memo.move_to_end(key)
+        return found
+
+
+def _memo_put(key: bytes, value: Tuple[FunctionMetrics, ...]):
+    with _memo_lock:
+        _memo[key] = value
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+
+
+def clear_memo():
+    with _memo_lock:
+        _memo.clear()
+
+
+# ------------------------------------
+# Counting
+# ------------------------------------
+def _decisions(node: ast.AST) -> int:
+    """Decision points a node adds by itself (radon's counting)."""
+    if isinstance(node, TRY_NODES):
+        return len(node.handlers) + bool(node.orelse)
+    if isinstance(node, ast.BoolOp):
+        return len(node.values) - 1
+    if isinstance(node, (ast.If, ast.IfExp)):
+        return 1
+    if isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+        return bool(node.orelse) + 1
+    if isinstance(node, ast.comprehension):
+        return len(node.ifs) + 1
+    if isinstance(node, ast.Match):
+        # A trailing `case _:` is the else branch
+        wildcard = any(isinstance(case.pattern, ast.MatchAs) and case.pattern.pattern is None for case in node.cases)
+        return max(0, len(node.cases) - wildcard)
+    return 0
+
+
+def _is_elif(parent: ast.AST, child: ast.AST) -> bool:
+    return (
+        isinstance(parent, ast.If)
+        and isinstance(child, ast.If)
+        and len(parent.orelse) == 1
+        and parent.orelse[0] is child
+        and child.col_offset == parent.col_offset
+    )
+
+
+def _param_count(args: ast.arguments) -> int:
+    return (
+        len(args.posonlyargs) + len(args.args) + len(args.kwonlyargs)
+        + (args.vararg is not None) + (args.kwarg is not None)
+    )
+
+
+class _Measurer:
+    """One walk over a module tree, collecting every function's metrics."""
+
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+
+    def find(self, node: ast.AST, prefix: str, out: List[FunctionMetrics]):
+        """Collect the functions below `node` (module or class level)."""
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, FUNCTION_NODES):
+                out += self.function(child, prefix)
+            elif isinstance(child, ast.ClassDef):
+                self.find(child, f"{prefix}{child.name}.", out)
+            else:
+                self.find(child, prefix, out)
+
+    def function(self, node: ast.AST, prefix: str) -> List[FunctionMetrics]:
+        """Metrics of one function and the functions nested in it."""
+        text = "\n".join(self.lines[node.lineno - 1:node.end_lineno])
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        relative = _memo_get(key)
+
+        if relative is None:
+            nested: List[FunctionMetrics] = []
+            decisions, depth = self.body(node.body, node, 0, f"{node.name}.", nested)
+            own = FunctionMetrics(
+                name=node.name,
+                qualname=node.name,
+                line=node.lineno,
+                end_line=node.end_lineno,
+                complexity=1 + decisions,
+                depth=depth,
+                params=_param_count(node.args),
+            )
+            offset = node.lineno
+            relative = tuple(
+                replace(m, line=m.line - offset, end_line=m.end_line - offset) for m in [own, *nested]
+            )
+            _memo_put(key, relative)
+
+        offset = node.lineno
+        return [
+            replace(m, line=m.line + offset, end_line=m.end_line + offset, qualname=prefix + m.qualname)
+            for m in relative
+        ]
+
+    def body(
+        self, children: Iterable[ast.AST], parent: ast.AST, depth: int, prefix: str, nested: List[FunctionMetrics]
+    ) -> Tuple[int, int]:
+        """
+        Decision points and deepest block nesting of `children` (of
+        `parent`, inside a function). Nested functions and classes are
+        measured on their own.
+        """
+        decisions, deepest = 0, depth
+        for child in children:
+            if isinstance(child, FUNCTION_NODES):
+                nested += self.function(child, prefix)
+                continue
+            if isinstance(child, ast.ClassDef):
+                self.find(child, f"{prefix}{child.name}.", nested)
+                continue
+            if isinstance(child, ast.Assert):
+                decisions += 1  # like radon, conditions inside an assert are not counted
+                continue
+            level = depth + 1 if isinstance(child, BLOCK_NODES) and not _is_elif(parent, child) else depth
+            below, child_deepest = self.body(ast.iter_child_nodes(child), child, level, prefix, nested)
+            decisions += _decisions(child) + below
+            deepest = max(deepest, level, child_deepest)
+        return decisions, deepest
+
+
+# ------------------------------------
+# Public entry point
+# ------------------------------------
+def function_metrics(filepath: str, code: Source) -> Optional[List[FunctionMetrics]]:
+    """
+    Metrics of every function and method, in source order, or None when
+    the file does not parse.
+    """
+    doc = SourceDocument.of(filepath, code)
+    with _memo_lock:
+        found = _by_document.get(doc)
+    if found is not None:
+        return found
+    if doc.ast_tree is None:
+        return None
+
+    functions: List[FunctionMetrics] = []
+    _Measurer(doc.lines).find(doc.ast_tree, "", functions)
+    functions.sort(key=lambda m: (m.line, m.end_line))
+    with _memo_lock:
+        _by_document[doc] = functions
+    return functions
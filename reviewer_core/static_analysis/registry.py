@@ -0,0 +1,211 @@
+"""
+Static Analysis — Rule Registry
+-------------------------------
+Style rules register here and declare what they need to see:
+
+- `lines=True`      — every physical line (optionally only lines that
+                      contain a literal, `contains="def"`)
+- `nodes=(...)`     — `ast` nodes of the given types
+- `tokens=(...)`    — `tokenize` tokens of the given kinds
+- `finish=...`      — called once after the walks, for rules that
+                      collect first and report at the end (a rule that
+                      listens to nothing is itself its `finish`)
+
+A `Dispatcher` groups the rules by what they listen to and makes one
+pass over each source view that at least one rule wants: one loop over
+the lines, one `ast.walk`, one pass over the tokens. Each item is handed
+to every interested rule, so adding a rule adds a call per relevant
+item, not another full-file pass.
+
+Rules report through the `RuleContext`, which also holds per-file
+options and a scratch `state` dict for rules that keep data between
+calls.
+"""
+
+import ast
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .. import profiling
+from ..models import Finding
+from ..source import Source, SourceDocument
+
+
+@dataclass
+class RuleContext:
+    """
+    What a rule sees while one file is dispatched.
+    """
+    filepath: str
+    doc: SourceDocument
+    options: Dict[str, Any] = field(default_factory=dict)
+    findings: List[Finding] = field(default_factory=list)
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    def report(
+        self,
+        rule_id: str,
+        message: str,
+        line: int,
+        col: int = 1,
+        severity: str = "warning",
+        code_snippet: Optional[str] = None,
+    ):
+        self.findings.append(Finding(
+            agent="static",
+            rule_id=rule_id,
+            message=message,
+            severity=severity,
+            filepath=self.filepath,
+            line=line,
+            col=col,
+            code_snippet=code_snippet,
+        ))
+
+
+@dataclass(frozen=True)
+class StyleRule:
+    """
+    One registered rule. `check` is called as `check(ctx, lineno, line)`
+    for line rules, `check(ctx, node)` for node rules and
+    `check(ctx, token)` for token rules.
+
+    `scope` is "unit" when the rule's findings depend only on the text
+    they point at (so incremental reviews can re-run it per changed
+    unit) and "file" when it needs the whole file.
+    """
+    rule_id: str
+    name: str
+    check: Optional[Callable] = None
+    lines: bool = False
+    contains: Optional[str] = None
+    nodes: Tuple[type, ...] = ()
+    tokens: Tuple[int, ...] = ()
+    finish: Optional[Callable[[RuleContext], None]] = None
+    scope: str = "unit"
+
+
+# Registration order is the order findings on one line are reported in
+RULES: Dict[str, StyleRule] = {}
+
+
+def register(
+    rule_id: str,
+    name: str,
+    *,
+    lines: bool = False,
+    contains: Optional[str] = None,
+    nodes: Iterable[type] = (),
+    tokens: Iterable[int] = (),
+    finish: Optional[Callable[[RuleContext], None]] = None,
+    scope: str = "unit",
+):
+    """
+    Decorator: register `check` as a style rule. A rule listens to at
+    most one of lines, nodes or tokens; one with none only has `finish`
+    (the decorated function, unless given).
+    """
+    nodes, tokens = tuple(nodes), tuple(tokens)
+    if (lines, bool(nodes), bool(tokens)).count(True) > 1:
+        raise ValueError(f"Rule {rule_id} must listen to one of lines, nodes or tokens")
+    if contains is not None and not lines:
+        raise ValueError(f"Rule {rule_id}: 'contains' only applies to line rules")
+    if scope not in ("unit", "file"):
+        raise ValueError(f"Rule {rule_id}: unknown scope {scope!r}")
+
+    def decorate(check: Callable) -> Callable:
+        listens = lines or nodes or tokens
+        RULES[rule_id] = StyleRule(
+            rule_id, name, check if listens else None, lines, contains, nodes, tokens,
+            finish if listens or finish is not None else check, scope,
+        )
+        return check
+
+    return decorate
+
+
+def _timed(check: Callable, timings: Dict[str, float], key: str) -> Callable:
+    """`check`, adding the time of each call to `timings[key]` (profiling)."""
+    def run(*args):
+        start = time.perf_counter()
+        try:
+            check(*args)
+        finally:
+            timings[key] += time.perf_counter() - start
+    return run
+
+
+class Dispatcher:
+    """
+    Runs a set of rules with one walk over each source view they need.
+    """
+
+    def __init__(self, rules: Iterable[StyleRule]):
+        self.rules = list(rules)
+        self.line_rules = [rule for rule in self.rules if rule.lines]
+        self.node_rules = [rule for rule in self.rules if rule.nodes]
+        self.token_rules = [rule for rule in self.rules if rule.tokens]
+        self.finishers = [rule for rule in self.rules if rule.finish is not None]
+
+    def run(self, filepath: str, code: Source, options: Optional[Dict[str, Any]] = None) -> List[Finding]:
+        doc = SourceDocument.of(filepath, code)
+        ctx = RuleContext(filepath, doc, dict(options or {}))
+
+        # While profiling, each rule's calls are timed separately
+        timings = {rule.rule_id: 0.0 for rule in self.rules} if profiling.enabled() else None
+
+        def handler(rule: StyleRule, check: Callable) -> Callable:
+            return check if timings is None else _timed(check, timings, rule.rule_id)
+
+        # 1️⃣ One loop over the lines; literal prefilters skip most calls
+        if self.line_rules:
+            checks = [(rule.contains, handler(rule, rule.check)) for rule in self.line_rules]
+            for lineno, line in enumerate(doc.lines, start=1):
+                for needle, check in checks:
+                    if needle is None or needle in line:
+                        check(ctx, lineno, line)
+
+        # 2️⃣ One walk over the tree
+        if self.node_rules and doc.ast_tree is not None:
+            by_type: Dict[type, List[Callable]] = {}
+            for rule in self.node_rules:
+                for node_type in rule.nodes:
+                    by_type.setdefault(node_type, []).append(handler(rule, rule.check))
+            for node in ast.walk(doc.ast_tree):
+                for check in by_type.get(type(node), ()):
+                    check(ctx, node)
+
+        # 3️⃣ One pass over the tokens
+        if self.token_rules and doc.tokens is not None:
+            by_kind: Dict[int, List[Callable]] = {}
+            for rule in self.token_rules:
+                for kind in rule.tokens:
+                    by_kind.setdefault(kind, []).append(handler(rule, rule.check))
+            for token in doc.tokens:
+                for check in by_kind.get(token.type, ()):
+                    check(ctx, token)
+
+        # 4️⃣ Rules that report once everything has been seen
+        for rule in self.finishers:
+            handler(rule, rule.finish)(ctx)
+
+        if timings is not None:
+            for rule in self.rules:
+                profiling.add_time(f"static.{rule.name}", timings[rule.rule_id])
+        return ctx.findings
+
+
+@lru_cache(maxsize=32)
+def _dispatcher(rules: Tuple[StyleRule, ...]) -> Dispatcher:
+    return Dispatcher(rules)
+
+
+def dispatcher(rule_ids: Optional[Iterable[str]] = None, scope: Optional[str] = None) -> Dispatcher:
+    """
+    The (cached) dispatcher for the given registered rules, or for all of
+    them, optionally only those of one scope.
+    """
+    selected = RULES.values() if rule_ids is None else [RULES[rule_id] for rule_id in rule_ids]
+    return _dispatcher(tuple(rule for rule in selected if scope is None or rule.scope == scope))
@@ -6,22 +6,28 @@ and provides a unified function to run them together.
 """
 
 from ..models import Finding
+from ..profiling import count
+from ..source import Source, SourceDocument
 from .style_rules import run_style_rules
 from .complexity import run_complexity_checks
 
-def run_static(filepath: str, code: str) -> list[Finding]:
+def run_static(filepath: str, code: Source) -> list[Finding]:
     """
     Runs all static analysis rules (style + complexity)
     and returns a combined list of findings.
+
+    `code` may be raw source or a shared SourceDocument.
     """
     findings: list[Finding] = []
+    doc = SourceDocument.of(filepath, code)
+    count("static.bytes_scanned", len(doc.code))
 
     # 1️⃣ Style checks (naming, line length, mutable defaults, etc.)
-    style_findings = run_style_rules(filepath, code)
+    style_findings = run_style_rules(filepath, doc)
     findings.extend(style_findings)
 
     # 2️⃣ Complexity checks (long functions, nested logic, etc.)
-    complexity_findings = run_complexity_checks(filepath, code)
+    complexity_findings = run_complexity_checks(filepath, doc)
     findings.extend(complexity_findings)
 
     # 3️⃣ Sort by line number for cleaner output
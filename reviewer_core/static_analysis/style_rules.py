@@ -7,138 +7,212 @@ Checks include:
 - Function naming conventions
 - Mutable default arguments
 - Bare except statements
-- Unused imports (basic)
+- Unused imports
+- Undefined names
+- Locals shadowing a builtin or an imported name
+- Unused local variables
+
+The last four answer from the file's symbol table (see `symbols.py`).
+Every rule is registered with the rule registry and runs inside one
+shared walk over the file (see `registry.py`). The `check_*` functions
+run a single rule on its own.
 """
 
+import os
 import re
+from typing import Optional
 from ..models import Finding
+from ..source import Source
+from .registry import RuleContext, dispatcher, register
+from .symbols import symbol_table
+
+MAX_LINE_LENGTH = 100
 
 # -------------------------------
 # Rule: Maximum line length
 # -------------------------------
-def check_line_length(filepath: str, code: str, max_len: int = 100):
-    findings = []
-    for i, line in enumerate(code.splitlines(), start=1):
-        if len(line) > max_len:
-            findings.append(Finding(
-                agent="static",
-                rule_id="S100",
-                message=f"Line exceeds {max_len} characters",
-                severity="warning",
-                filepath=filepath,
-                line=i,
-                col=max_len + 1,
-                code_snippet=line
-            ))
-    return findings
+@register("S100", "line_length", lines=True)
+def _line_length(ctx: RuleContext, lineno: int, line: str):
+    max_len = ctx.options.get("max_len", MAX_LINE_LENGTH)
+    if len(line) > max_len:
+        ctx.report("S100", f"Line exceeds {max_len} characters", lineno, col=max_len + 1, code_snippet=line)
 
 
 # -------------------------------
 # Rule: Function names (snake_case)
 # -------------------------------
 SNAKE_CASE = re.compile(r"^[a-z_][a-z0-9_]*$")
+FUNCTION_DEF = re.compile(r"^\s*def\s+([A-Za-z_][A-Za-z0-9_]*)\s*\(")
 
-def check_function_names(filepath: str, code: str):
-    findings = []
-    pattern = re.compile(r"^\\s*def\\s+([A-Za-z_][A-Za-z0-9_]*)\\s*\\(")
-    for i, line in enumerate(code.splitlines(), start=1):
-        match = pattern.search(line)
-        if match:
-            func_name = match.group(1)
-            if not SNAKE_CASE.match(func_name):
-                findings.append(Finding(
-                    agent="static",
-                    rule_id="S101",
-                    message=f"Function '{func_name}' should follow snake_case naming",
-                    severity="warning",
-                    filepath=filepath,
-                    line=i,
-                    col=line.find(func_name) + 1,
-                    code_snippet=line.strip()
-                ))
-    return findings
+@register("S101", "function_names", lines=True, contains="def")
+def _function_names(ctx: RuleContext, lineno: int, line: str):
+    match = FUNCTION_DEF.search(line)
+    if match:
+        func_name = match.group(1)
+        if not SNAKE_CASE.match(func_name):
+            ctx.report(
+                "S101",
+                f"Function '{func_name}' should follow snake_case naming",
+                lineno,
+                col=line.find(func_name) + 1,
+                code_snippet=line.strip(),
+            )
 
 
 # -------------------------------
 # Rule: Mutable default arguments
 # -------------------------------
-def check_mutable_defaults(filepath: str, code: str):
-    findings = []
-    # Detect functions with list/dict/set as default args
-    pattern = re.compile(r"def\\s+\\w+\\s*\\([^)]*(=\\s*(\\[|\\{|set\\())")
-    for i, line in enumerate(code.splitlines(), start=1):
-        if pattern.search(line):
-            findings.append(Finding(
-                agent="static",
-                rule_id="S104",
-                message="Avoid mutable default arguments (use None and assign inside function).",
-                severity="warning",
-                filepath=filepath,
-                line=i,
-                col=1,
-                code_snippet=line.strip()
-            ))
-    return findings
+# Detect functions with list/dict/set as default args
+MUTABLE_DEFAULT = re.compile(r"def\s+\w+\s*\([^)]*(=\s*(\[|\{|set\())")
+
+@register("S104", "mutable_defaults", lines=True, contains="def")
+def _mutable_defaults(ctx: RuleContext, lineno: int, line: str):
+    if MUTABLE_DEFAULT.search(line):
+        ctx.report(
+            "S104",
+            "Avoid mutable default arguments (use None and assign inside function).",
+            lineno,
+            code_snippet=line.strip(),
+        )
 
 
 # -------------------------------
 # Rule: Bare except clauses
 # -------------------------------
-def check_bare_except(filepath: str, code: str):
-    findings = []
-    for i, line in enumerate(code.splitlines(), start=1):
-        if re.search(r"except\\s*:\\s*$", line.strip()):
-            findings.append(Finding(
-                agent="static",
-                rule_id="S105",
-                message="Avoid bare 'except:' — catch specific exceptions instead.",
-                severity="warning",
-                filepath=filepath,
-                line=i,
-                col=1,
-                code_snippet=line.strip()
-            ))
-    return findings
-
-
-# -------------------------------
-# Rule: Unused imports (simple version)
-# -------------------------------
-def check_unused_imports(filepath: str, code: str):
-    findings = []
-    imports = []
-    lines = code.splitlines()
-
-    # Collect all imported names
-    for i, line in enumerate(lines, start=1):
-        match = re.match(r"\\s*import\\s+([A-Za-z0-9_]+)", line)
-        if match:
-            imports.append((match.group(1), i))
-
-    # Check if they appear later
-    for name, lineno in imports:
-        if name not in code.split(name, 1)[-1]:  # crude check
-            findings.append(Finding(
-                agent="static",
-                rule_id="S106",
-                message=f"Imported module '{name}' appears unused.",
-                severity="info",
-                filepath=filepath,
-                line=lineno,
-                col=1,
-                code_snippet=lines[lineno - 1].strip()
-            ))
-    return findings
+BARE_EXCEPT = re.compile(r"except\s*:\s*$")
+
+@register("S105", "bare_except", lines=True, contains="except")
+def _bare_except(ctx: RuleContext, lineno: int, line: str):
+    if BARE_EXCEPT.search(line.strip()):
+        ctx.report(
+            "S105",
+            "Avoid bare 'except:' — catch specific exceptions instead.",
+            lineno,
+            code_snippet=line.strip(),
+        )
+
+
+# -------------------------------
+# Rule: Unused imports
+# -------------------------------
+@register("S106", "unused_imports", scope="file")
+def _unused_imports(ctx: RuleContext):
+    table = symbol_table(ctx.filepath, ctx.doc)
+    if table is None:
+        return
+    # A package's `__init__.py` imports to re-export
+    package_init = os.path.basename(ctx.filepath) == "__init__.py"
+    for binding in table.unused_imports(module_level=not package_init):
+        ctx.report(
+            "S106",
+            f"Imported name '{binding.name}' appears unused.",
+            binding.line,
+            col=binding.col,
+            severity="info",
+            code_snippet=ctx.doc.lines[binding.line - 1].strip(),
+        )
+
+
+# -------------------------------
+# Rule: Undefined names
+# -------------------------------
+@register("S107", "undefined_names", scope="file")
+def _undefined_names(ctx: RuleContext):
+    table = symbol_table(ctx.filepath, ctx.doc)
+    if table is None:
+        return
+    for name, line, col in table.undefined_names():
+        ctx.report(
+            "S107",
+            f"Name '{name}' is not defined.",
+            line,
+            col=col,
+            code_snippet=ctx.doc.lines[line - 1].strip(),
+        )
+
+
+# -------------------------------
+# Rule: Shadowed names
+# -------------------------------
+@register("S108", "shadowed_names", scope="file")
+def _shadowed_names(ctx: RuleContext):
+    table = symbol_table(ctx.filepath, ctx.doc)
+    if table is None:
+        return
+    for binding, hidden in table.shadowed_names():
+        if hidden is None:
+            message = f"'{binding.name}' shadows a builtin."
+        else:
+            message = f"'{binding.name}' shadows the name imported on line {hidden.line}."
+        ctx.report(
+            "S108",
+            message,
+            binding.line,
+            col=binding.col,
+            severity="info",
+            code_snippet=ctx.doc.lines[binding.line - 1].strip(),
+        )
+
+
+# -------------------------------
+# Rule: Unused local variables
+# -------------------------------
+@register("S109", "unused_variables", scope="file")
+def _unused_variables(ctx: RuleContext):
+    table = symbol_table(ctx.filepath, ctx.doc)
+    if table is None:
+        return
+    for binding in table.unused_variables():
+        ctx.report(
+            "S109",
+            f"Local variable '{binding.name}' is assigned but never used.",
+            binding.line,
+            col=binding.col,
+            code_snippet=ctx.doc.lines[binding.line - 1].strip(),
+        )
+
+
+# -------------------------------
+# Single rules
+# -------------------------------
+def check_line_length(filepath: str, code: Source, max_len: int = MAX_LINE_LENGTH):
+    return dispatcher(["S100"]).run(filepath, code, {"max_len": max_len})
+
+
+def check_function_names(filepath: str, code: Source):
+    return dispatcher(["S101"]).run(filepath, code)
+
+
+def check_mutable_defaults(filepath: str, code: Source):
+    return dispatcher(["S104"]).run(filepath, code)
+
+
+def check_bare_except(filepath: str, code: Source):
+    return dispatcher(["S105"]).run(filepath, code)
+
+
+def check_unused_imports(filepath: str, code: Source):
+    return dispatcher(["S106"]).run(filepath, code)
+
+
+def check_undefined_names(filepath: str, code: Source):
+    return dispatcher(["S107"]).run(filepath, code)
+
+
+def check_shadowed_names(filepath: str, code: Source):
+    return dispatcher(["S108"]).run(filepath, code)
+
+
+def check_unused_variables(filepath: str, code: Source):
+    return dispatcher(["S109"]).run(filepath, code)
 
 
 # -------------------------------
 # Combine all static checks
 # -------------------------------
-def run_style_rules(filepath: str, code: str):
-    findings = []
-    findings += check_line_length(filepath, code)
-    findings += check_function_names(filepath, code)
-    findings += check_mutable_defaults(filepath, code)
-    findings += check_bare_except(filepath, code)
-    findings += check_unused_imports(filepath, code)
-    return findings
+def run_style_rules(filepath: str, code: Source, scope: Optional[str] = None) -> list[Finding]:
+    """
+    Run every registered style rule (or those of one `scope`) in a
+    single pass over the file.
+    """
+    return dispatcher(scope=scope).run(filepath, code)
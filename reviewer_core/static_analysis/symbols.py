@@ -0,0 +1,564 @@
+"""
+Static Analysis — Symbol Table
+------------------------------
+Builds a per-file symbol table in one pass over the document's shared
+`ast` tree. Every scope (module, class, function, lambda, comprehension)
+records:
+
+- its bindings: imports (with their alias), assignments, parameters,
+  loop and `with`/`except` targets, `def`/`class` names, ...
+- the names it references
+- its `global` / `nonlocal` declarations
+
+References are then resolved with Python's rules (local scope, enclosing
+functions — skipping class bodies —, module, builtins), so every scope
+knows which of its names are used. Rules ask the table questions
+(unused imports, undefined names, shadowing, unused locals) that cost a
+dictionary lookup per symbol instead of a search through the file.
+
+Everything below module level is resolved per unit (a run of top-level
+statements, see `UnitSymbols`); the file's table only joins the units'
+module-level bindings and references. A full review builds one unit
+from the whole tree; an incremental review keeps one per top-level
+unit and rebuilds only the edited ones.
+
+Shadowing means a function-local name that hides a builtin or an
+imported name; locals that reuse an outer variable's name are common and
+harmless enough (think pytest fixtures) to be left alone.
+
+Names listed in a module's `__all__`, and names used only inside string
+annotations (`"OrderedDict[str, int]"`), count as used.
+"""
+
+import ast
+import builtins
+import threading
+import weakref
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ..source import Source, SourceDocument
+
+BUILTINS = frozenset(dir(builtins))
+
+# Names every module (and class body) has without binding them
+MODULE_NAMES = frozenset({
+    "__name__", "__file__", "__doc__", "__spec__", "__loader__", "__package__",
+    "__builtins__", "__path__", "__annotations__", "__dict__", "__cached__",
+})
+CLASS_NAMES = frozenset({"__module__", "__qualname__", "__class__"})
+IMPLICIT_NAMES = BUILTINS | MODULE_NAMES | CLASS_NAMES
+
+# Binding kinds of a plain local variable (not unpacking, loops, params, ...)
+LOCAL_KINDS = frozenset({"assign", "annotation", "with", "except"})
+
+
+@dataclass
+class Binding:
+    """
+    One place a name is bound. `kind` is one of "import", "assign",
+    "unpack", "augassign", "annotation", "param", "loop", "with",
+    "except", "match", "def" or "class".
+    """
+    name: str
+    kind: str
+    line: int
+    col: int
+    module: Optional[str] = None  # what an import binding imports
+    reexport: bool = False        # `import x as x` / `from m import x as x`
+
+
+@dataclass(eq=False)
+class Scope:
+    """A module, class, function, lambda or comprehension scope."""
+    kind: str
+    name: str
+    line: int
+    parent: Optional["Scope"] = None
+    bindings: Dict[str, List[Binding]] = field(default_factory=dict)
+    globals: Set[str] = field(default_factory=set)
+    nonlocals: Set[str] = field(default_factory=set)
+    # Names of this scope's bindings that something references
+    used: Set[str] = field(default_factory=set)
+    # Names referenced from here, with the position of their first use
+    references: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    star_import: bool = False
+    uses_locals: bool = False  # calls `locals()` / `vars()`
+
+    def bind(self, binding: Binding):
+        self.bindings.setdefault(binding.name, []).append(binding)
+
+    def reference(self, name: str, line: int, col: int):
+        self.references.setdefault(name, (line, col))
+
+    def first(self, name: str) -> Binding:
+        return self.bindings[name][0]
+
+
+# ------------------------------------
+# Building: one pass over the tree
+# ------------------------------------
+def _all_args(args: ast.arguments) -> List[ast.arg]:
+    every = args.posonlyargs + args.args + [args.vararg] + args.kwonlyargs + [args.kwarg]
+    return [arg for arg in every if arg is not None]
+
+
+class _Builder(ast.NodeVisitor):
+    """Scopes of a run of top-level statements, in one walk."""
+
+    def __init__(self, statements: Sequence[ast.stmt]):
+        self.scope = self.module = Scope("module", "<module>", 1)
+        self.scopes: List[Scope] = [self.module]
+        self.kind = "assign"  # kind given to Name nodes in a Store context
+        self.visit_body(statements)
+
+    # Helpers
+    def visit_body(self, nodes):
+        for node in nodes:
+            self.visit(node)
+
+    def visit_opt(self, node):
+        if node is not None:
+            self.visit(node)
+
+    def push(self, kind: str, name: str, line: int) -> Scope:
+        scope = Scope(kind, name, line, parent=self.scope)
+        self.scopes.append(scope)
+        self.scope = scope
+        return scope
+
+    def pop(self):
+        self.scope = self.scope.parent
+
+    def bind(self, name: str, kind: str, node: ast.AST, **extra):
+        scope = self.scope
+        if name in scope.globals:
+            scope = self.module
+        elif name in scope.nonlocals:
+            scope = self.enclosing_binder(scope, name)
+        scope.bind(Binding(name, kind, node.lineno, node.col_offset + 1, **extra))
+
+    @staticmethod
+    def enclosing_binder(scope: Scope, name: str) -> Scope:
+        """The enclosing function scope a `nonlocal name` refers to."""
+        functions = []
+        current = scope.parent
+        while current is not None and current.kind != "module":
+            if current.kind != "class":
+                if name in current.bindings:
+                    return current
+                functions.append(current)
+            current = current.parent
+        return functions[0] if functions else scope
+
+    def target(self, node: ast.AST, kind: str):
+        previous, self.kind = self.kind, kind
+        self.visit(node)
+        self.kind = previous
+
+    def annotation(self, node: Optional[ast.AST]):
+        if node is None:
+            return
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            try:
+                parsed = ast.parse(node.value, mode="eval").body
+            except SyntaxError:
+                return
+            for child in ast.walk(parsed):
+                if isinstance(child, ast.Name):
+                    self.scope.reference(child.id, node.lineno, node.col_offset + 1)
+            return
+        self.visit(node)
+
+    # Names
+    def visit_Name(self, node: ast.Name):
+        if isinstance(node.ctx, ast.Store):
+            self.bind(node.id, self.kind, node)
+        else:
+            self.scope.reference(node.id, node.lineno, node.col_offset + 1)
+
+    def visit_Starred(self, node: ast.Starred):
+        self.visit(node.value)
+
+    # Imports
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            name = alias.asname or alias.name.split(".")[0]
+            self.bind(name, "import", alias, module=alias.name, reexport=alias.asname == alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module == "__future__":
+            return
+        base = "." * node.level + (node.module or "")
+        for alias in node.names:
+            if alias.name == "*":
+                self.scope.star_import = True
+                continue
+            module = f"{base}.{alias.name}" if node.module else base + alias.name
+            reexport = alias.asname == alias.name
+            self.bind(alias.asname or alias.name, "import", alias, module=module, reexport=reexport)
+
+    # Declarations
+    def visit_Global(self, node: ast.Global):
+        self.scope.globals.update(node.names)
+
+    def visit_Nonlocal(self, node: ast.Nonlocal):
+        self.scope.nonlocals.update(node.names)
+
+    # Statements that bind
+    def visit_Assign(self, node: ast.Assign):
+        self.visit(node.value)
+        for target in node.targets:
+            self.target(target, "assign" if isinstance(target, ast.Name) else "unpack")
+        names = [target.id for target in node.targets if isinstance(target, ast.Name)]
+        if self.scope is self.module and "__all__" in names:
+            self.dunder_all(node.value)
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        self.visit(node.value)
+        if isinstance(node.target, ast.Name):
+            self.scope.reference(node.target.id, node.target.lineno, node.target.col_offset + 1)
+            self.bind(node.target.id, "augassign", node.target)
+            if self.scope is self.module and node.target.id == "__all__":
+                self.dunder_all(node.value)
+        else:
+            self.visit(node.target)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        self.annotation(node.annotation)
+        self.visit_opt(node.value)
+        self.target(node.target, "assign" if node.value is not None else "annotation")
+
+    def visit_NamedExpr(self, node: ast.NamedExpr):
+        self.visit(node.value)
+        # The target binds in the nearest enclosing non-comprehension scope
+        scope = self.scope
+        while scope.kind == "comprehension":
+            scope = scope.parent
+        scope.bind(Binding(node.target.id, "assign", node.target.lineno, node.target.col_offset + 1))
+
+    def visit_For(self, node):
+        self.visit(node.iter)
+        self.target(node.target, "loop")
+        self.visit_body(node.body)
+        self.visit_body(node.orelse)
+
+    visit_AsyncFor = visit_For
+
+    def visit_With(self, node):
+        for item in node.items:
+            self.visit(item.context_expr)
+            if item.optional_vars is not None:
+                kind = "with" if isinstance(item.optional_vars, ast.Name) else "unpack"
+                self.target(item.optional_vars, kind)
+        self.visit_body(node.body)
+
+    visit_AsyncWith = visit_With
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        self.visit_opt(node.type)
+        if node.name:
+            self.bind(node.name, "except", node)
+        self.visit_body(node.body)
+
+    def visit_Delete(self, node: ast.Delete):
+        for target in node.targets:
+            self.visit(target)  # a `del name` reads the binding
+
+    # Match statement captures
+    def visit_MatchAs(self, node: ast.MatchAs):
+        self.visit_opt(node.pattern)
+        if node.name:
+            self.bind(node.name, "match", node)
+
+    def visit_MatchStar(self, node: ast.MatchStar):
+        if node.name:
+            self.bind(node.name, "match", node)
+
+    def visit_MatchMapping(self, node: ast.MatchMapping):
+        self.visit_body(node.keys)
+        self.visit_body(node.patterns)
+        if node.rest:
+            self.bind(node.rest, "match", node)
+
+    # Calls that read the local namespace
+    def visit_Call(self, node: ast.Call):
+        if isinstance(node.func, ast.Name) and node.func.id in ("locals", "vars") and not node.args:
+            self.scope.uses_locals = True
+        self.generic_visit(node)
+
+    # Scopes
+    def arguments(self, args: ast.arguments):
+        """Defaults and annotations, evaluated in the enclosing scope."""
+        self.visit_body(args.defaults)
+        self.visit_body([default for default in args.kw_defaults if default is not None])
+
+    def parameters(self, node: ast.AST):
+        """Type parameters and parameters, bound in the new scope."""
+        for param in getattr(node, "type_params", ()):
+            self.scope.bind(Binding(param.name, "param", param.lineno, param.col_offset + 1))
+        for arg in _all_args(node.args) if hasattr(node, "args") else ():
+            self.scope.bind(Binding(arg.arg, "param", arg.lineno, arg.col_offset + 1))
+
+    def visit_FunctionDef(self, node):
+        self.visit_body(node.decorator_list)
+        self.arguments(node.args)
+        for arg in _all_args(node.args):
+            self.annotation(arg.annotation)
+        self.annotation(node.returns)
+        self.bind(node.name, "def", node)
+
+        self.push("function", node.name, node.lineno)
+        self.parameters(node)
+        self.visit_body(node.body)
+        self.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.Lambda):
+        self.arguments(node.args)
+        self.push("lambda", "<lambda>", node.lineno)
+        self.parameters(node)
+        self.visit(node.body)
+        self.pop()
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.visit_body(node.decorator_list)
+        self.visit_body(node.bases)
+        for keyword in node.keywords:
+            self.visit(keyword.value)
+        self.bind(node.name, "class", node)
+
+        self.push("class", node.name, node.lineno)
+        self.parameters(node)
+        self.visit_body(node.body)
+        self.pop()
+
+    def comprehension(self, node, *elements):
+        # The first iterable is evaluated in the enclosing scope
+        self.visit(node.generators[0].iter)
+        self.push("comprehension", f"<{type(node).__name__.lower()}>", node.lineno)
+        for index, generator in enumerate(node.generators):
+            if index:
+                self.visit(generator.iter)
+            self.target(generator.target, "loop")
+            self.visit_body(generator.ifs)
+        for element in elements:
+            self.visit(element)
+        self.pop()
+
+    def visit_ListComp(self, node):
+        self.comprehension(node, node.elt)
+
+    visit_SetComp = visit_GeneratorExp = visit_ListComp
+
+    def visit_DictComp(self, node: ast.DictComp):
+        self.comprehension(node, node.key, node.value)
+
+    # `__all__`
+    def dunder_all(self, value: ast.AST):
+        if isinstance(value, (ast.List, ast.Tuple)):
+            for element in value.elts:
+                if isinstance(element, ast.Constant) and isinstance(element.value, str):
+                    self.module.reference(element.value, element.lineno, element.col_offset + 1)
+
+
+# ------------------------------------
+# One unit: a run of top-level statements
+# ------------------------------------
+def _resolve(scope: Scope, name: str) -> Optional[Scope]:
+    """
+    The scope inside the unit whose binding `name` refers to from
+    `scope`, or None when it refers to the module (or a builtin).
+    """
+    if name in scope.globals:
+        return None
+    current, first = scope, True
+    if name in scope.nonlocals:
+        current, first = scope.parent, False
+    while current is not None and current.kind != "module":
+        # Class bodies are only visible to their own statements
+        if (first or current.kind != "class") and name in current.bindings:
+            return current
+        current, first = current.parent, False
+    return None
+
+
+def _hides_import(binding: Binding, hidden: Binding) -> bool:
+    # Importing again what was imported outside is not hiding it
+    return hidden.kind == "import" and not (binding.kind == "import" and binding.module == hidden.module)
+
+
+@dataclass
+class UnitSymbols:
+    """
+    What a run of top-level statements contributes to its file's symbol
+    table, with lines relative to the unit. Everything that does not
+    depend on the rest of the file is answered here already; module-level
+    names are resolved when units are put together.
+    """
+    bindings: Dict[str, List[Binding]] = field(default_factory=dict)  # module level
+    references: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # to module level
+    star_import: bool = False
+    unused_imports: List[Binding] = field(default_factory=list)    # in functions and classes
+    unused_variables: List[Binding] = field(default_factory=list)
+    shadows: List[Tuple[Binding, Binding]] = field(default_factory=list)
+    # Function locals that hide nothing inside the unit (maybe a module
+    # import or a builtin)
+    free_locals: List[Binding] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, statements: Sequence[ast.stmt]) -> "UnitSymbols":
+        builder = _Builder(statements)
+        module = builder.module
+        unit = cls(bindings=module.bindings, star_import=module.star_import)
+
+        # Resolve every reference: inside the unit, or to module level
+        for scope in builder.scopes:
+            for name, position in scope.references.items():
+                owner = _resolve(scope, name)
+                if owner is not None:
+                    owner.used.add(name)
+                elif name not in unit.references or position < unit.references[name]:
+                    unit.references[name] = position
+
+        for scope in builder.scopes[1:]:
+            unit._collect(scope)
+        return unit
+
+    def _collect(self, scope: Scope):
+        for name, bindings in scope.bindings.items():
+            if name not in scope.used:
+                self.unused_imports += [b for b in bindings if b.kind == "import" and not b.reexport]
+        if scope.kind not in ("function", "lambda"):
+            return
+
+        # Shadowing: what the name means just outside this function
+        enclosing = scope.parent
+        while enclosing.kind == "class":
+            enclosing = enclosing.parent
+        for name, bindings in scope.bindings.items():
+            if name == "_" or name in scope.globals or name in scope.nonlocals:
+                continue
+            outer = _resolve(enclosing, name)
+            if outer is None:
+                self.free_locals.append(bindings[0])
+            elif _hides_import(bindings[0], outer.first(name)):
+                self.shadows.append((bindings[0], outer.first(name)))
+
+        # Locals assigned but never read
+        if scope.kind != "function" or scope.uses_locals:
+            return
+        for name, bindings in scope.bindings.items():
+            if name in scope.used or name.startswith("_"):
+                continue
+            kinds = {binding.kind for binding in bindings}
+            if kinds <= LOCAL_KINDS and kinds != {"annotation"}:
+                self.unused_variables.append(next(b for b in bindings if b.kind != "annotation"))
+
+
+# ------------------------------------
+# The table
+# ------------------------------------
+def _at(binding: Binding, offset: int) -> Binding:
+    return replace(binding, line=binding.line + offset) if offset else binding
+
+
+class SymbolTable:
+    """
+    Bindings and references of one file, put together from its units
+    (`(line offset, UnitSymbols)` pairs, in source order).
+    """
+
+    def __init__(self, units: Sequence[Tuple[int, UnitSymbols]]):
+        self.units = list(units)
+        self.bindings: Dict[str, List[Binding]] = {}     # module level
+        self.references: Dict[str, Tuple[int, int]] = {}  # to module level
+        self.star_import = False
+        for offset, unit in self.units:
+            for name, bindings in unit.bindings.items():
+                self.bindings.setdefault(name, []).extend(_at(b, offset) for b in bindings)
+            for name, (line, col) in unit.references.items():
+                self.references.setdefault(name, (line + offset, col))
+            self.star_import |= unit.star_import
+
+    @classmethod
+    def of_module(cls, module: ast.Module) -> "SymbolTable":
+        return cls([(0, UnitSymbols.build(module.body))])
+
+    # ------------------------------------
+    # Questions rules ask
+    # ------------------------------------
+    def unused_imports(self, module_level: bool = True) -> Iterator[Binding]:
+        """Imports nothing reads (optionally leaving out module-level ones)."""
+        if module_level:
+            for name, bindings in self.bindings.items():
+                if name not in self.references:
+                    yield from (b for b in bindings if b.kind == "import" and not b.reexport)
+        for offset, unit in self.units:
+            for binding in unit.unused_imports:
+                yield _at(binding, offset)
+
+    def undefined_names(self) -> Iterator[Tuple[str, int, int]]:
+        """Names read (first use of each) that nothing binds."""
+        if self.star_import:
+            return  # anything may come from the `*` import
+        for name, (line, col) in self.references.items():
+            if name not in self.bindings and name not in IMPLICIT_NAMES:
+                yield name, line, col
+
+    def shadowed_names(self) -> Iterator[Tuple[Binding, Optional[Binding]]]:
+        """
+        Function-local bindings that hide a builtin (paired with None) or
+        a name an enclosing scope imported (paired with the import).
+        """
+        for offset, unit in self.units:
+            for binding, hidden in unit.shadows:
+                yield _at(binding, offset), _at(hidden, offset)
+            for binding in unit.free_locals:
+                outer = self.bindings.get(binding.name)
+                if outer is None:
+                    if binding.name in BUILTINS:
+                        yield _at(binding, offset), None
+                elif _hides_import(binding, outer[0]):
+                    yield _at(binding, offset), outer[0]
+
+    def unused_variables(self) -> Iterator[Binding]:
+        """Function locals that are assigned but never read."""
+        for offset, unit in self.units:
+            for binding in unit.unused_variables:
+                yield _at(binding, offset)
+
+
+# ------------------------------------
+# Public entry points
+# ------------------------------------
+_lock = threading.Lock()
+_by_document: "weakref.WeakKeyDictionary[SourceDocument, SymbolTable]" = weakref.WeakKeyDictionary()
+
+
+def symbol_table(filepath: str, code: Source) -> Optional[SymbolTable]:
+    """
+    The symbol table of a file (built once per document and shared by
+    every rule), or None when the file does not parse.
+    """
+    doc = SourceDocument.of(filepath, code)
+    with _lock:
+        found = _by_document.get(doc)
+    if found is not None:
+        return found
+    if doc.ast_tree is None:
+        return None
+    table = SymbolTable.of_module(doc.ast_tree)
+    with _lock:
+        _by_document[doc] = table
+    return table
+
+
+def set_symbol_table(doc: SourceDocument, table: SymbolTable):
+    """
+    Use `table` for `doc` (built from its units by an incremental review)
+    instead of parsing the whole document.
+    """
+    with _lock:
+        _by_document[doc] = table
@@ -0,0 +1,85 @@
+"""
+Test — Benchmarks
+-----------------
+Verifies the synthetic corpus generator and the baseline comparison
+of the benchmark runner.
+"""
+
+import ast
+import json
+
+from benchmarks.corpus import CorpusSpec, generate_corpus, generate_module, write_corpus
+from benchmarks.run import RULES, compare, run_benchmarks
+from reviewer_core.security.runner import run_security
+from reviewer_core.static_analysis.runner import run_static
+
+
+def test_corpus_has_the_requested_size_and_patterns():
+    spec = CorpusSpec(lines=3000, eval_density=3, sql_density=2, taint_density=1, long_line_density=4)
+    code = generate_module(spec)
+
+    assert 3000 <= code.count("\n") < 3020
+    ast.parse(code)
+    assert code == generate_module(spec)  # seeded
+
+    static = [f.rule_id for f in run_static("m.py", code)]
+    security = [f.rule_id for f in run_security("m.py", code)]
+    assert static.count("S100") == 12
+    assert security.count("SEC001") == 9 and security.count("SEC005") == 6
+    assert security.count("SEC_T002") == 3
+
+
+def test_deep_nesting_stays_valid_python():
+    code = generate_module(CorpusSpec(lines=500, deep_nesting_density=10, nesting_depth=40))
+    ast.parse(code)
+    assert "C200" in {f.rule_id for f in run_static("m.py", code)}
+
+
+def test_corpus_splits_over_files(tmp_path):
+    spec = CorpusSpec(lines=2000, files=4)
+    assert len(generate_corpus(spec)) == 4
+    paths = write_corpus(spec, tmp_path)
+    assert all(400 <= p.read_text().count("\n") < 520 for p in paths)
+
+
+def test_run_covers_every_rule_and_agent():
+    results = run_benchmarks(CorpusSpec(), [200], repeat=1)
+    names = [row["name"] for row in results["results"]]
+    assert set(RULES) <= set(names)
+    assert {"parse", "run_static", "run_security", "orchestrator"} <= set(names)
+    assert json.loads(json.dumps(results))["meta"]["sizes"] == [200]
+
+
+def test_every_timed_run_starts_cold(monkeypatch):
+    from benchmarks import run
+    from reviewer_core.static_analysis import metrics, symbols
+
+    seen = []
+
+    def probe(name, doc):
+        cached = doc in metrics._by_document or doc in symbols._by_document
+        seen.append((doc, len(metrics._memo), cached))
+        # What a rule before it might have left behind
+        metrics.function_metrics(name, doc)
+        symbols.symbol_table(name, doc)
+        return []
+
+    monkeypatch.setitem(run.RULES, "probe", probe)
+    results = run_benchmarks(CorpusSpec(files=1), [200], repeat=3)
+
+    docs = [doc for doc, _, _ in seen]
+    assert len(seen) == 3 and len({id(doc) for doc in docs}) == 3
+    assert all(memo == 0 and not cached for _, memo, cached in seen)
+    assert "run_static.warm" in {row["name"] for row in results["results"]}
+
+
+def test_compare_flags_only_slowdowns_beyond_the_threshold():
+    def results(**medians):
+        return {"results": [{"name": n, "lines": 1000, "median": m} for n, m in medians.items()]}
+
+    baseline = results(fast=0.100, steady=0.100, tiny=0.0001, gone=0.1)
+    current = results(fast=0.130, steady=0.110, tiny=0.0009, new=5.0)
+
+    [regression] = compare(current, baseline, threshold=0.2)
+    assert (regression.name, regression.baseline, regression.current) == ("fast", 0.100, 0.130)
+    assert compare(current, baseline, threshold=0.5) == []
@@ -0,0 +1,67 @@
+"""
+Test — Findings Cache
+---------------------
+Verifies that cached findings round-trip per agent, that a cache
+hit skips the agent, and that the store is bounded by LRU eviction.
+"""
+
+from reviewer_core.cache import FindingsCache, run_cached
+from reviewer_core.security.runner import run_security
+from reviewer_core.source import SourceDocument
+
+
+def test_cache_hit_skips_agent(tmp_path):
+    cache = FindingsCache(tmp_path)
+    calls = []
+
+    def agent(filepath, doc):
+        calls.append(filepath)
+        return run_security(filepath, doc)
+
+    code = "import os\nos.system(input())\n"
+    first = run_cached(cache, "security", agent, "a.py", SourceDocument("a.py", code))
+    second = run_cached(cache, "security", agent, "copy/a.py", SourceDocument("copy/a.py", code))
+
+    assert calls == ["a.py"]
+    assert [(f.rule_id, f.line) for f in second] == [(f.rule_id, f.line) for f in first]
+    assert all(f.filepath == "copy/a.py" for f in second)
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Entries are per agent: the static agent has nothing stored yet
+    assert cache.get("static", SourceDocument("a.py", code).content_hash, "a.py") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = FindingsCache(tmp_path, max_bytes=2000)
+    docs = [SourceDocument(f"f{i}.py", f"eval({i})\n" * 20 + f"# {i}\n") for i in range(40)]
+    for doc in docs:
+        run_cached(cache, "security", run_security, doc.filepath, doc)
+
+    assert cache._stored_bytes() <= 2000
+    assert cache.get("security", docs[-1].content_hash, "last.py") is not None
+    assert cache.get("security", docs[0].content_hash, "first.py") is None
+
+
+def test_warm_hits_do_not_write_and_replacements_keep_the_size(tmp_path, monkeypatch):
+    import reviewer_core.cache as cache_module
+
+    cache = FindingsCache(tmp_path)
+    docs = [SourceDocument(f"{name}.py", f"import os\nos.system({name}())\n") for name in ("a", "b")]
+    for doc in docs:
+        run_cached(cache, "security", run_security, doc.filepath, doc)
+    written = cache._db.total_changes
+    for _ in range(50):
+        run_cached(cache, "security", run_security, "a.py", docs[0])
+    assert cache._db.total_changes == written
+
+    # Stale recency is refreshed in batches, not per hit
+    monkeypatch.setattr(cache_module, "TOUCH_INTERVAL", -1.0)
+    monkeypatch.setattr(cache_module, "TOUCH_BATCH", 2)
+    for doc in (docs[0], docs[0], docs[0]):
+        run_cached(cache, "security", run_security, doc.filepath, doc)
+    assert cache._db.total_changes == written
+    run_cached(cache, "security", run_security, "b.py", docs[1])
+    assert cache._db.total_changes == written + 2  # both keys, one commit
+
+    for size in (500, 100, 300):
+        cache.put_bytes("key", b"x" * size)
+    assert cache._total == cache._stored_bytes()
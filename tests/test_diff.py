@@ -0,0 +1,151 @@
+"""
+Test — Diff-Scoped Review
+-------------------------
+Verifies unified-diff parsing, that findings are limited to changed
+lines, and that the LLM is sent only the changed hunks.
+"""
+
+import subprocess
+
+from reviewer_core.diff import git_diff, git_reader, parse_unified_diff, review_diff
+from reviewer_core.llm import gemini_client
+
+SAMPLE_DIFF = """\
+diff --git a/app.py b/app.py
+index 1111111..2222222 100644
+--- a/app.py
++++ b/app.py
+@@ -1,3 +1,4 @@
+ import os
++import sys
+
+-x = 1
++x = 2
+@@ -10 +11,2 @@ def f():
+--- old comment
++--- new comment
++y = 3
+\\ No newline at end of file
+diff --git a/new.py b/new.py
+new file mode 100644
+--- /dev/null
++++ b/new.py
+@@ -0,0 +1,2 @@
++a = 1
++b = 2
+diff --git a/gone.py b/gone.py
+deleted file mode 100644
+--- a/gone.py
++++ /dev/null
+@@ -1 +0,0 @@
+-print('bye')
+"""
+
+
+def test_parse_unified_diff():
+    app, new, gone = parse_unified_diff(SAMPLE_DIFF)
+
+    assert app.path == app.old_path == "app.py"
+    assert len(app.hunks) == 2
+    assert app.added_lines == {2, 4, 11, 12}
+    assert app.removal_points == {4, 11}
+    assert app.hunks[1].lines[1] == "--- old comment"
+
+    assert (new.path, new.old_path, new.added_lines) == ("new.py", None, {1, 2})
+    assert (gone.path, gone.old_path, gone.added_lines) == (None, "gone.py", set())
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def _make_repo(tmp_path):
+    """A two-commit repo: the second commit changes one function only."""
+    base = (
+        "import os\n"
+        "\n"
+        "def OldName():\n"
+        "    eval('1')\n"
+        "\n"
+        + "".join(f"\ndef helper_{i}(x):\n    return x + {i}\n" for i in range(40))
+        + "\ndef touched(items):\n    return len(items)\n"
+    )
+    head = base.replace(
+        "def touched(items):\n    return len(items)\n",
+        "def touched(items=[]):\n    try:\n        return len(items)\n    except:\n        return 0\n",
+    )
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "dev@example.com")
+    _git(tmp_path, "config", "user.name", "dev")
+    (tmp_path / "mod.py").write_text(base, encoding="utf-8")
+    _git(tmp_path, "add", "mod.py")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    (tmp_path / "mod.py").write_text(head, encoding="utf-8")
+    _git(tmp_path, "commit", "-q", "-am", "head")
+    return head
+
+
+def test_findings_are_limited_to_changed_lines(tmp_path):
+    head = _make_repo(tmp_path)
+    diffs = parse_unified_diff(git_diff("HEAD~1..HEAD", cwd=str(tmp_path)))
+    [result] = review_diff(diffs, git_reader("HEAD~1..HEAD", cwd=str(tmp_path)), llm=False)
+
+    assert result.filepath == "mod.py" and result.error is None
+    rules = {f.rule_id for f in result.bundle.static_findings}
+    assert rules == {"S104", "S105"}  # mutable default, bare except (new code)
+    assert "S101" not in rules  # OldName was not touched
+    assert not result.bundle.security_findings  # nor was its eval()
+
+    changed = diffs[0].added_lines
+    assert all(f.line in changed for f in result.bundle.static_findings)
+    assert head.splitlines()[min(changed) - 1].startswith("def touched")
+
+
+def test_diff_from_a_subdirectory_covers_the_whole_repository(tmp_path):
+    _make_repo(tmp_path)
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "sub.py").write_text("def f():\n    return 1\n", encoding="utf-8")
+    _git(tmp_path, "add", "pkg/sub.py")
+    _git(tmp_path, "commit", "-q", "-m", "sub")
+    (tmp_path / "pkg" / "sub.py").write_text("def f(items=[]):\n    return items\n", encoding="utf-8")
+
+    top = tmp_path / "mod.py"
+    top.write_text(top.read_text(encoding="utf-8") + "\ndef Late():\n    return 2\n", encoding="utf-8")
+
+    # Changes outside the subdirectory are reviewed too
+    subdir = str(tmp_path / "pkg")
+    diffs = parse_unified_diff(git_diff("HEAD", cwd=subdir))
+    results = list(review_diff(diffs, git_reader("HEAD", cwd=subdir), llm=False))
+
+    assert [(r.filepath, r.error) for r in results] == [("mod.py", None), ("pkg/sub.py", None)]
+    assert {f.rule_id for f in results[0].bundle.static_findings} == {"S101"}
+    assert {f.rule_id for f in results[1].bundle.static_findings} == {"S104"}
+
+
+def test_agent_failure_is_reported_for_its_file_only(tmp_path, monkeypatch):
+    import reviewer_core.diff as diff
+
+    _make_repo(tmp_path)
+    diffs = parse_unified_diff(git_diff("HEAD~1..HEAD", cwd=str(tmp_path)))
+    read = git_reader("HEAD~1..HEAD", cwd=str(tmp_path))
+
+    def broken(filepath, doc):
+        raise RecursionError("maximum recursion depth exceeded")
+
+    monkeypatch.setattr(diff, "taint_scan", broken)
+    [result] = review_diff(diffs, read, llm=False)
+    assert result.filepath == "mod.py" and result.error == "RecursionError: maximum recursion depth exceeded"
+
+
+def test_llm_sees_only_the_hunks(tmp_path, monkeypatch):
+    _make_repo(tmp_path)
+    prompts = []
+    monkeypatch.setattr(gemini_client, "_generate", lambda prompt, **_: (prompts.append(prompt) or "ok", True))
+
+    diffs = parse_unified_diff(git_diff("HEAD~1..HEAD", cwd=str(tmp_path)))
+    [result] = review_diff(diffs, git_reader("HEAD~1..HEAD", cwd=str(tmp_path)))
+
+    [prompt] = prompts
+    assert "+def touched(items=[]):" in prompt
+    assert "OldName" not in prompt and "helper_0" not in prompt
+    assert result.bundle.llm_comments[0].line == min(diffs[0].added_lines)
@@ -0,0 +1,102 @@
+"""
+Test — Finding Storage
+----------------------
+Verifies the immutable, interned Finding and the columnar FindingTable:
+round-trips, queries, pickling, and its memory footprint.
+"""
+
+import dataclasses
+import pickle
+import tracemalloc
+
+import pytest
+
+from reviewer_core.cache import FindingsCache, run_cached
+from reviewer_core.findings import FindingTable
+from reviewer_core.models import Finding
+from reviewer_core.security.runner import run_security
+from reviewer_core.source import SourceDocument
+
+
+def _findings(count, files=10):
+    return [
+        Finding(
+            agent="static",
+            rule_id=("S101", "S104", "S105")[i % 3],
+            message=f"Function 'f{i % 50}' should follow snake_case naming",
+            severity=("info", "warning", "error")[i % 3],
+            filepath=f"pkg/module_{i % files}.py",
+            line=count - i,
+            col=1 + i % 7,
+            code_snippet=f"def f{i % 50}():",
+            meta={"row": i} if i % 100 == 0 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def test_finding_is_frozen_slotted_and_interned():
+    a, b = _findings(2)
+    assert not hasattr(a, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        a.line = 3
+    built = Finding("static", "".join(["S1", "04"]), "m", "warning", "pkg/module_1.py", 1, 1)
+    assert built.rule_id is b.rule_id and built.filepath is b.filepath
+    assert dataclasses.replace(a, line=7).line == 7
+    assert list(a.to_dict()) == [f.name for f in dataclasses.fields(Finding)]
+
+
+def test_table_round_trips_and_answers_queries():
+    findings = _findings(300)
+    table = FindingTable(findings)
+
+    assert len(table) == 300 and table == findings and findings == table
+    assert table[5] == findings[5] and table[-1] == findings[-1]
+    assert list(table[10:13]) == findings[10:13]
+
+    errors = table.filter(severity="error", filepath={"pkg/module_2.py", "pkg/module_5.py"})
+    assert list(errors) == [
+        f for f in findings if f.severity == "error" and f.filepath in ("pkg/module_2.py", "pkg/module_5.py")
+    ]
+    assert list(table.sort()) == sorted(findings, key=lambda f: (f.filepath, f.line, f.col))
+    rank = ("info", "warning", "error").index
+    assert list(table.sort("severity", "line")) == sorted(findings, key=lambda f: (rank(f.severity), f.line))
+
+    groups = table.group_by("rule_id")
+    assert list(groups) == ["S101", "S104", "S105"]
+    assert all(all(f.rule_id == rule for f in group) for rule, group in groups.items())
+    assert table.count_by("filepath")["pkg/module_0.py"] == 30
+    assert table.column("line")[:2].tolist() == [300, 299]
+    assert table.to_dicts()[0] == findings[0].to_dict()
+
+
+def test_tables_pickle_and_share_dictionaries():
+    shared = FindingTable()
+    first = pickle.loads(pickle.dumps(FindingTable(_findings(40)))).using(shared)
+    second = pickle.loads(pickle.dumps(FindingTable(_findings(40)))).using(shared)
+
+    assert first == second == _findings(40)
+    assert first._dictionaries is second._dictionaries is shared._dictionaries
+    assert len(shared._dictionaries["rule_id"].values) == 3
+
+
+def test_cache_hits_decode_straight_into_a_table(tmp_path):
+    cache = FindingsCache(tmp_path)
+    doc = SourceDocument("a.py", "import os\nos.system(input())\n")
+    fresh = run_cached(cache, "security", run_security, "a.py", doc)
+    cached = run_cached(cache, "security", run_security, "a.py", doc)
+    assert isinstance(cached, FindingTable) and cached == fresh
+
+
+def test_table_is_much_smaller_than_finding_objects():
+    def allocated(build):
+        tracemalloc.start()
+        try:
+            kept = build()
+            return tracemalloc.get_traced_memory()[0], kept
+        finally:
+            tracemalloc.stop()
+
+    objects, _ = allocated(lambda: _findings(20000))
+    columns, _ = allocated(lambda: FindingTable(Finding(**f.to_dict()) for f in _findings(20000)))
+    assert columns * 4 < objects
@@ -0,0 +1,90 @@
+"""
+Test — Incremental Review
+-------------------------
+After every edit, the incremental findings must equal a full review of
+the new text, while only the edited units are re-checked.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("tree_sitter_python")
+
+from reviewer_core import incremental
+from reviewer_core.incremental import IncrementalReview, TextEdit
+from reviewer_core.security.runner import run_security
+from reviewer_core.source import SourceDocument
+from reviewer_core.static_analysis.runner import run_static
+
+
+def _module(functions):
+    header = "import os\nimport sys\nfrom flask import request\n\n"
+    body = "".join(
+        f"def func_{i}(value, items=None):\n"
+        "    total = 0\n"
+        "    for x in items or []:\n"
+        "        if x > value:\n"
+        "            total += x\n"
+        "    os.system('echo ' + str(total))\n"
+        "    return total\n\n\n"
+        for i in range(functions)
+    )
+    return header + body + "def run(cmd):\n    os.system(cmd)\n\nrun(input())\n"
+
+
+def _key(findings):
+    return sorted((f.line, f.col, f.rule_id, f.message) for f in findings)
+
+
+def _assert_matches_full_review(review):
+    doc = SourceDocument(review.filepath, review.code)
+    bundle = review.bundle
+    assert _key(bundle.static_findings) == _key(run_static(review.filepath, doc))
+    assert _key(bundle.security_findings) == _key(run_security(review.filepath, doc))
+
+
+def test_edits_match_a_full_review(monkeypatch):
+    review = IncrementalReview("inc.py", _module(20))
+    _assert_matches_full_review(review)
+
+    rechecked = []
+    run_unit_rules = incremental._run_unit_rules
+    monkeypatch.setattr(
+        incremental, "_run_unit_rules",
+        lambda filepath, text, start: rechecked.append(start) or run_unit_rules(filepath, text, start),
+    )
+
+    # Insert a line inside func_3: one unit re-checked, later findings shift
+    review.apply([TextEdit("    total = eval(value)\n", 33, 0, 33, 0)])
+    assert rechecked == [30]  # func_3 and the blank lines before it
+    _assert_matches_full_review(review)
+
+    edits = [
+        [TextEdit("BadName", 4, 4, 4, 10)],                            # rename func_0
+        [TextEdit("", 5, 0, 6, 0)],                                    # delete a line
+        [TextEdit("x = eval(input())\n", 3, 0, 3, 0)],                 # module-level statement
+        [TextEdit("    return request.args['q']\n", 186, 0, 186, 0)],  # run() summary changes
+        [TextEdit("def broken(:\n", 9, 0, 9, 0)],                      # syntax error
+        [TextEdit("", 9, 0, 10, 0), TextEdit("é", 20, 10, 20, 10)],    # fix it, non-ASCII
+    ]
+    for batch in edits:
+        review.apply(batch)
+        _assert_matches_full_review(review)
+
+
+def test_one_line_edit_is_much_faster_than_a_full_review():
+    code = _module(560)  # ~5k lines
+    review = IncrementalReview("big.py", code)
+
+    start = time.perf_counter()
+    run_static("big.py", SourceDocument("big.py", code))
+    run_security("big.py", SourceDocument("big.py", code))
+    full = time.perf_counter() - start
+
+    timings = []
+    for i in range(5):
+        start = time.perf_counter()
+        review.apply([TextEdit(str(i), 2005, 12, 2005, 13)])
+        timings.append(time.perf_counter() - start)
+    assert sorted(timings)[2] < full / 5
@@ -0,0 +1,60 @@
+"""
+Test — Tree-sitter Loader
+-------------------------
+Importing the package must stay cheap: no grammar load, no subprocess,
+no network. The grammar is resolved on first parse, once per process.
+"""
+
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from reviewer_core.parsing import ts_loader
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_PROBE = """
+import json, sys
+import reviewer_core.parsing, reviewer_core.source
+print(json.dumps({name: name in sys.modules for name in ("tree_sitter", "google.generativeai")}))
+"""
+
+
+def test_import_does_not_load_tree_sitter():
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True, timeout=60,
+    )
+    probe = json.loads(out.stdout.strip().splitlines()[-1])
+
+    assert probe == {"tree_sitter": False, "google.generativeai": False}
+    assert not (ROOT / "vendor").exists()
+
+
+def test_parser_is_per_thread_and_language_is_shared():
+    pytest.importorskip("tree_sitter_python")
+
+    parsers = []
+    thread = threading.Thread(target=lambda: parsers.append(ts_loader.get_parser()))
+    thread.start()
+    thread.join()
+
+    assert parsers[0] is not ts_loader.get_parser()
+    assert ts_loader.get_language() is ts_loader.get_language()
+    tree = ts_loader.parse_python("def f(x):\n    return x\n")
+    assert tree.root_node.children[0].type == "function_definition"
+
+
+def test_missing_grammar_falls_back_to_none(monkeypatch):
+    from reviewer_core.source import SourceDocument
+
+    monkeypatch.setattr(ts_loader, "_language", ts_loader.TreeSitterUnavailable("no grammar"))
+    monkeypatch.setattr(ts_loader, "_local", threading.local())
+
+    doc = SourceDocument("a.py", "x = 1\n")
+    assert doc.ts_tree is None
+    assert doc.ast_tree is not None
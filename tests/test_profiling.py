@@ -0,0 +1,84 @@
+"""
+Test — Profiling
+----------------
+Verifies nested span timings, counters, that the hooks are inert while
+profiling is off, and that a process-pool run collects its workers'
+spans into one Chrome trace.
+"""
+
+import os
+import time
+
+from reviewer_core import profiling
+from reviewer_core.cache import FindingsCache, run_cached
+from reviewer_core.repo import review_paths
+from reviewer_core.security.runner import run_security
+from reviewer_core.source import SourceDocument
+from reviewer_core.static_analysis.runner import run_static
+
+CODE = "import os\n\ndef BadName(x=[]):\n    os.system(input())\n    return eval(x)\n"
+
+
+def test_hooks_do_nothing_while_disabled():
+    assert profiling.get_profiler() is None
+    assert profiling.span("anything") is profiling.span("else")
+    profiling.count("nothing")
+    run_static("a.py", CODE)
+    assert profiling.get_profiler() is None
+
+
+def test_nested_spans_record_total_and_self_time():
+    with profiling.profiling() as profiler:
+        with profiling.span("outer", "agent"):
+            time.sleep(0.02)
+            with profiling.span("inner"):
+                time.sleep(0.02)
+        profiling.count("bytes", 10)
+        profiling.count("bytes", 5)
+    assert profiling.get_profiler() is None
+
+    rows = {row["name"]: row for row in profiler.summary()}
+    assert rows["outer"]["total"] >= 0.04 and rows["outer"]["self"] < rows["outer"]["total"] - 0.015
+    assert rows["inner"]["calls"] == 1 and rows["inner"]["category"] == "rule"
+    assert profiler.counters["bytes"] == 15
+    assert profiler.events == []  # only kept with trace=True
+
+
+def test_agents_report_every_rule_and_counter(tmp_path):
+    cache = FindingsCache(tmp_path)
+    with profiling.profiling() as profiler:
+        for _ in range(2):
+            doc = SourceDocument("a.py", CODE)
+            run_cached(cache, "static", run_static, "a.py", doc)
+            run_cached(cache, "security", run_security, "a.py", doc)
+        run_security("a.py", CODE)
+
+    names = {row["name"] for row in profiler.summary()}
+    assert {"agent.static", "agent.security", "parse.ast", "static.line_length",
+            "static.check_cyclomatic_complexity", "security.pattern_scan", "security.query_scan",
+            "security.taint_scan", "security.regex.SEC009"} <= names
+    counters = profiler.counters
+    assert counters["cache.static.misses"] == counters["cache.static.hits"] == 1
+    assert counters["security.bytes_scanned"] == 2 * len(CODE)
+    assert counters["security.matches.SEC003"] == 2 and "security.matches.SEC009" not in counters
+
+
+def test_repository_run_merges_worker_profiles(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"m{i}.py"
+        path.write_text(CODE, encoding="utf-8")
+        paths.append(str(path))
+
+    with profiling.profiling(trace=True) as profiler:
+        results = list(review_paths(paths, workers=2, llm=False))
+
+    assert len(results) == 4
+    rows = {row["name"]: row for row in profiler.summary()}
+    assert rows["agent.static"]["calls"] == rows["agent.security"]["calls"] == 4
+
+    trace = profiler.chrome_trace()
+    events = trace["traceEvents"]
+    assert {e["ph"] for e in events} == {"X"}
+    assert os.getpid() not in {e["pid"] for e in events}  # spans come from the workers
+    assert trace["otherData"]["counters"]["static.bytes_scanned"] == 4 * len(CODE)
@@ -0,0 +1,238 @@
+"""
+Test — Repository Review
+------------------------
+Verifies file discovery (directories and globs) and that a
+process-pool run returns the same findings as a single-file
+review, in deterministic order.
+"""
+
+from reviewer_core.repo import discover_files, review_paths
+from reviewer_core.security.runner import run_security
+from reviewer_core.static_analysis.runner import run_static
+
+
+def _make_tree(tmp_path):
+    (tmp_path / "pkg" / "sub").mkdir(parents=True)
+    (tmp_path / ".venv").mkdir()
+    files = {
+        "pkg/a.py": "def BadName():\n    eval('1')\n",
+        "pkg/sub/b.py": "import os\nos.system('ls')\n",
+        "pkg/notes.txt": "eval(",
+        ".venv/skipped.py": "eval('1')\n",
+    }
+    for name, code in files.items():
+        (tmp_path / name).write_text(code, encoding="utf-8")
+    return files
+
+
+def test_discover_files_expands_dirs_and_globs(tmp_path):
+    _make_tree(tmp_path)
+    from_dir = discover_files([str(tmp_path)])
+    from_glob = discover_files([str(tmp_path / "pkg" / "**" / "*.py")])
+    expected = [str(tmp_path / "pkg" / "a.py"), str(tmp_path / "pkg" / "sub" / "b.py")]
+    assert from_dir == expected
+    assert from_glob == expected
+
+
+def test_review_paths_is_ordered_and_matches_single_file(tmp_path):
+    files = _make_tree(tmp_path)
+    paths = discover_files([str(tmp_path)]) * 3
+    results = list(review_paths(paths, workers=2, llm=False, chunksize=2))
+
+    assert [r.filepath for r in results] == paths
+    for result in results:
+        name = str(result.filepath)[len(str(tmp_path)) + 1:]
+        code = files[name]
+        assert result.error is None
+        assert result.bundle.static_findings == run_static(result.filepath, code)
+        assert result.bundle.security_findings == run_security(result.filepath, code)
+
+
+def _make_project(tmp_path):
+    app = tmp_path / "app"
+    app.mkdir()
+    (app / "__init__.py").write_text("", encoding="utf-8")
+    (app / "repo.py").write_text(
+        "def find(cursor, name):\n"
+        "    cursor.execute(\"SELECT * FROM users WHERE name = '%s'\" % name)\n",
+        encoding="utf-8",
+    )
+    (app / "util.py").write_text(
+        "from flask import request\n\n"
+        "def arg(key):\n"
+        "    return request.args.get(key)\n",
+        encoding="utf-8",
+    )
+    (app / "views.py").write_text(
+        "from . import repo\n"
+        "from .util import arg\n\n"
+        "def view(cursor):\n"
+        "    name = arg('name')\n"
+        "    repo.find(cursor, name)\n",
+        encoding="utf-8",
+    )
+    return app
+
+
+def test_cross_module_taint_flow_is_reported(tmp_path):
+    app = _make_project(tmp_path)
+    files = discover_files([str(app)])
+
+    plain = {r.filepath: r for r in review_paths(files, workers=1, llm=False)}
+    linked = {r.filepath: r for r in review_paths(files, workers=1, llm=False, cross_module=True)}
+
+    views = str(app / "views.py")
+    flows = [f for f in linked[views].bundle.security_findings if f.rule_id == "SEC_T002"]
+    assert not [f for f in plain[views].bundle.security_findings if f.rule_id == "SEC_T002"]
+    assert [(f.line, f.meta["callee"]) for f in flows] == [(6, "app.repo.find")]
+    assert "'cursor.execute()' via 'repo.find()'" in flows[0].message
+
+
+def test_only_changed_modules_are_resummarized(tmp_path):
+    from reviewer_core.security.project import SummaryIndex, cross_module_findings, summarize
+
+    app = _make_project(tmp_path)
+    files = discover_files([str(app)])
+    index = SummaryIndex(tmp_path / "cache")
+
+    def run():
+        modules = [summarize(f, open(f, encoding="utf-8").read(), index) for f in files]
+        return cross_module_findings(modules)
+
+    run()
+    (app / "util.py").write_text("def arg(key):\n    return key\n", encoding="utf-8")
+    findings = run()
+
+    assert (index.hits, index.misses) == (len(files) - 1, len(files) + 1)
+    assert not findings[str(app / "views.py")]
+
+
+def test_agent_failure_is_reported_for_its_file_only(tmp_path, monkeypatch):
+    import reviewer_core.repo as repo
+
+    def broken(filepath, code):
+        raise RecursionError("maximum recursion depth exceeded")
+
+    monkeypatch.setattr(repo, "run_static", broken)
+    path = tmp_path / "deep.py"
+    path.write_text("x = 1\n", encoding="utf-8")
+    (filepath, static_findings, security_findings, error), module, _ = repo._local_review(str(path))
+
+    assert filepath == str(path) and not static_findings and not security_findings and module is None
+    assert error == "RecursionError: maximum recursion depth exceeded"
+
+
+def test_undecodable_file_does_not_stop_the_run(tmp_path):
+    good, bad = tmp_path / "ok.py", tmp_path / "bad.py"
+    good.write_text("eval('1')\n", encoding="utf-8")
+    bad.write_bytes(b"\xff\xfe\x00x = 1\n")
+    results = list(review_paths([str(good), str(bad), str(good)], workers=1, llm=False))
+
+    assert [r.filepath for r in results] == [str(good), str(bad), str(good)]
+    assert results[1].error.startswith("UnicodeDecodeError")
+    assert not results[1].bundle.static_findings and not results[1].bundle.security_findings
+    assert results[2].bundle.security_findings == results[0].bundle.security_findings
+
+
+def test_cross_module_summary_shares_the_findings_parse(tmp_path, monkeypatch):
+    import reviewer_core.repo as repo
+    from reviewer_core.security import taint
+
+    app = _make_project(tmp_path)
+    reads, analyses = [], []
+    read_source, run = repo._read_source, taint._ModuleAnalysis.run
+    monkeypatch.setattr(repo, "_read_source", lambda path: reads.append(path) or read_source(path))
+    monkeypatch.setattr(taint._ModuleAnalysis, "run", lambda self: analyses.append(1) or run(self))
+
+    result, module, _ = repo._local_review(str(app / "views.py"), True)
+    assert result[3] is None and len(reads) == len(analyses) == 1
+    assert module.name == "app.views"
+    assert module.edges["view"] == ["app.util.arg", "app.repo.find"]
+
+
+def test_call_graph_links_a_module_once_its_dependencies_are_in(tmp_path):
+    from reviewer_core.security.project import CallGraph, LinkState, summarize
+
+    app = _make_project(tmp_path)
+
+    def load(name):
+        path = str(app / f"{name}.py")
+        return summarize(path, open(path, encoding="utf-8").read())
+
+    graph = CallGraph(["app", "app.repo", "app.util", "app.views"])
+    graph.add(load("views"))
+    graph.add(load("repo"))
+    assert graph.ready("app.repo") and not graph.ready("app.views")
+    graph.add(load("util"))
+    assert graph.ready("app.views")
+    graph.link("app.views")
+    assert [f.line for f in graph.module_findings("app.views")] == [6]
+
+    # Next run: only the edited module and its dependents are relinked
+    previous = LinkState.decode(graph.state().encode())
+    (app / "util.py").write_text("def arg(key):\n    return key\n", encoding="utf-8")
+    again = CallGraph(["app", "app.repo", "app.util", "app.views"], previous)
+    for name in ("views", "repo", "util"):
+        again.add(load(name))
+    again.link("app.views")
+    assert again.reused == {"app.repo"} and again.relinked == {"app.util", "app.views"}
+    assert not again.module_findings("app.views")
+
+
+def test_cached_cross_module_runs_follow_edits(tmp_path):
+    app = _make_project(tmp_path)
+    files = discover_files([str(app)])
+    views = str(app / "views.py")
+
+    def flows():
+        results = review_paths(files, workers=1, llm=False, cross_module=True, cache_dir=str(tmp_path / "cache"))
+        return [f.line for r in results if r.filepath == views
+                for f in r.bundle.security_findings if f.rule_id == "SEC_T002"]
+
+    assert flows() == flows() == [6]
+    (app / "util.py").write_text("def arg(key):\n    return key\n", encoding="utf-8")
+    assert flows() == []
+
+
+def test_files_without_a_common_root_still_get_a_project_key(tmp_path, monkeypatch):
+    import reviewer_core.repo as repo
+
+    def different_drives(paths):
+        raise ValueError("Paths don't have the same drive")
+
+    files = discover_files([str(_make_project(tmp_path))])
+    monkeypatch.setattr(repo.os.path, "commonpath", different_drives)
+    assert repo._project_id(files) == repo._project_id(list(reversed(files)))
+    results = list(review_paths(files, workers=1, llm=False, cross_module=True, cache_dir=str(tmp_path / "cache")))
+    assert len(results) == len(files) and all(r.error is None for r in results)
+
+
+def test_stopping_early_closes_the_index_without_saving_the_graph(tmp_path, monkeypatch):
+    import reviewer_core.repo as repo
+
+    opened = []
+
+    class TrackedIndex(repo.SummaryIndex):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.saved = self.closed = False
+            opened.append(self)
+
+        def put_link_state(self, project, state):
+            self.saved = True
+            super().put_link_state(project, state)
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    monkeypatch.setattr(repo, "SummaryIndex", TrackedIndex)
+    files = discover_files([str(_make_project(tmp_path))])
+    results = review_paths(files, workers=1, llm=False, cross_module=True, cache_dir=str(tmp_path / "cache"))
+    next(results)
+    results.close()
+    [index] = opened
+    assert index.closed and not index.saved
+
+    list(review_paths(files, workers=1, llm=False, cross_module=True, cache_dir=str(tmp_path / "cache")))
+    assert opened[1].closed and opened[1].saved
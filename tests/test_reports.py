@@ -0,0 +1,106 @@
+"""
+Test — Report Writers
+---------------------
+Verifies the JSON, NDJSON and SARIF writers, gzip output, and that
+writing a report does not hold every finding in memory.
+"""
+
+import gzip
+import json
+import sys
+import tracemalloc
+
+import pytest
+
+from reviewer_core import reports
+from reviewer_core.models import Finding, ReviewBundle
+from reviewer_core.reports import open_report, report_format
+
+
+def _bundle(filepath, count=3):
+    def finding(i, agent, rule):
+        return Finding(agent, rule, f"{rule} message {i}", ("info", "warning", "error")[i % 3], filepath, i + 1, 1)
+
+    return ReviewBundle(
+        static_findings=[finding(i, "static", "S101") for i in range(count)],
+        security_findings=[finding(i, "security", "SEC003") for i in range(count)],
+        llm_comments=[Finding("llm", "LLM000", "Looks fine", "info", filepath, 1, 1)],
+    )
+
+
+def _write(path, fmt=None, files=("a.py", "pkg/b.py")):
+    with open_report(str(path), fmt) as report:
+        for name in files:
+            report.add(name, _bundle(name))
+        report.add("broken.py", ReviewBundle([], [], []), error="UnicodeDecodeError: bad byte")
+    return report
+
+
+def test_json_report_keeps_the_cli_shape(tmp_path):
+    report = _write(tmp_path / "r.json")
+    data = json.loads((tmp_path / "r.json").read_text())
+
+    assert [f["filepath"] for f in data["files"]] == ["a.py", "pkg/b.py", "broken.py"]
+    assert data["files"][0]["static"][0] == _bundle("a.py").static_findings[0].to_dict()
+    assert data["files"][2]["error"].startswith("UnicodeDecodeError")
+    assert (report.stats.files, report.stats.static, report.stats.errors) == (3, 6, 1)
+
+
+def test_ndjson_report_has_one_line_per_finding(tmp_path):
+    _write(tmp_path / "r.ndjson")
+    rows = [json.loads(line) for line in (tmp_path / "r.ndjson").read_text().splitlines()]
+    assert len(rows) == 2 * 7 + 1
+    assert rows[-1] == {"filepath": "broken.py", "error": "UnicodeDecodeError: bad byte"}
+
+
+def test_gzip_sarif_report(tmp_path, monkeypatch):
+    monkeypatch.setattr(reports, "orjson", None)  # the stdlib encoder path
+    path = tmp_path / "r.sarif.gz"
+    assert report_format(str(path)) == "sarif"
+    _write(path)
+    sarif = json.loads(gzip.decompress(path.read_bytes()))
+
+    assert sarif["version"] == "2.1.0"
+    [run] = sarif["runs"]
+    rules = [rule["id"] for rule in run["tool"]["driver"]["rules"]]
+    assert rules == ["S101", "SEC003", "LLM000"]
+    assert len(run["results"]) == 14
+    first = run["results"][0]
+    assert first["ruleId"] == rules[first["ruleIndex"]]
+    assert first["locations"][0]["physicalLocation"]["artifactLocation"]["uri"] == "a.py"
+    assert {r["level"] for r in run["results"]} == {"note", "warning", "error"}
+    [invocation] = run["invocations"]
+    assert invocation["executionSuccessful"] is False  # broken.py failed to review
+    assert invocation["toolExecutionNotifications"][0]["message"]["text"].startswith("Unicode")
+
+
+def test_sarif_run_without_errors_is_successful(tmp_path):
+    path = tmp_path / "r.sarif"
+    with open_report(str(path), "sarif") as report:
+        report.add("a.py", _bundle("a.py"))
+    [invocation] = json.loads(path.read_text())["runs"][0]["invocations"]
+    assert invocation == {"executionSuccessful": True, "toolExecutionNotifications": []}
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_report(str(tmp_path / "r.txt"), "xml")
+
+
+@pytest.mark.parametrize("fmt", ["json", "ndjson", "sarif"])
+def test_memory_does_not_grow_with_the_number_of_findings(tmp_path, fmt):
+    # Interned up front: growing the interpreter's intern table is not the writer's memory
+    names = [sys.intern(f"pkg/m{i}.py") for i in range(400)]
+
+    def peak(files):
+        tracemalloc.start()
+        try:
+            with open_report(str(tmp_path / f"r.{fmt}"), fmt) as report:
+                for name in names[:files]:
+                    report.add(name, _bundle(name, count=50))
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak(20), peak(400)
+    assert large < small * 2
@@ -0,0 +1,187 @@
+"""
+Test — LLM Request Scheduler
+----------------------------
+Drives the scheduler with plain callables and the Gemini client against
+a local fake Gemini endpoint that throttles before it answers.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from reviewer_core.llm import gemini_client
+from reviewer_core.llm.cache import set_response_cache
+from reviewer_core.llm.scheduler import (
+    AIMDLimit,
+    DeadlineExceeded,
+    LLMError,
+    LLMScheduler,
+    TokenBucket,
+    priority_of,
+)
+from reviewer_core.models import Finding
+
+
+class FakeGemini(BaseHTTPRequestHandler):
+    """Answers 429 `throttle` times, then a generateContent reply."""
+
+    throttle = 0
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakeGemini.requests.append((self.path, self.headers.get("x-goog-api-key"), body))
+        if FakeGemini.throttle:
+            FakeGemini.throttle -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        text = json.dumps({"candidates": [{"content": {"parts": [{"text": "Fake review"}]}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(text)))
+        self.end_headers()
+        self.wfile.write(text)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_endpoint(monkeypatch):
+    FakeGemini.throttle = 0
+    FakeGemini.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGemini)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("GEMINI_API_ENDPOINT", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    set_response_cache(None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _scheduler(**settings):
+    settings = dict(rate=1000.0, burst=1000.0, backoff_base=0.01, backoff_cap=0.05, deadline=10.0, **settings)
+    return LLMScheduler(**settings)
+
+
+def test_throttled_requests_are_retried_and_shrink_concurrency(fake_endpoint):
+    FakeGemini.throttle = 2
+    scheduler = _scheduler(max_concurrency=8)
+    [comment] = gemini_client.review_code("a.py", "x = 1\n", [], [], scheduler=scheduler)
+    scheduler.close()
+
+    assert comment.message == "Fake review"
+    assert len(FakeGemini.requests) == 3
+    path, key, body = FakeGemini.requests[-1]
+    assert path.endswith(":generateContent") and key == "test-key"
+    assert any("x = 1" in part["text"] for part in body["contents"][0]["parts"])
+    # Halved twice, then one success adds back a fraction
+    assert 2 <= scheduler.limit.current < 3
+
+
+def test_gives_up_after_max_attempts(fake_endpoint):
+    FakeGemini.throttle = 10
+    scheduler = _scheduler(max_attempts=2)
+    [comment] = gemini_client.review_code("a.py", "x = 1\n", [], [], scheduler=scheduler)
+    scheduler.close()
+
+    assert comment.message.startswith("⚠️ Gemini API error")
+    assert len(FakeGemini.requests) == 2
+
+
+def test_queued_requests_run_highest_priority_first():
+    scheduler = _scheduler(max_concurrency=1)
+    release, order = threading.Event(), []
+    blocker = scheduler.submit(lambda _: release.wait(5))
+    time.sleep(0.05)  # the blocker holds the only slot
+    futures = [
+        scheduler.submit(lambda _, name=name: order.append(name), priority=priority)
+        for name, priority in [("info", 2), ("warning", 1), ("error", 0), ("info-2", 2)]
+    ]
+    release.set()
+    for future in [blocker, *futures]:
+        future.result(timeout=5)
+    scheduler.close()
+
+    assert order == ["error", "warning", "info", "info-2"]
+
+
+def test_slow_request_misses_its_deadline():
+    scheduler, hung = _scheduler(), threading.Event()
+    with pytest.raises(DeadlineExceeded):
+        scheduler.run(lambda _: hung.wait(10), deadline=0.2)  # a transport ignoring its timeout
+    hung.set()
+
+    def always_unavailable(_):
+        raise LLMError("unavailable", status=503, retry_after=1.0)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        scheduler.run(always_unavailable, deadline=0.5)
+    assert time.monotonic() - started < 0.5  # no point waiting out a retry past the deadline
+    scheduler.close()
+
+
+def test_abandoned_request_gives_back_its_slot():
+    scheduler, hung = _scheduler(max_concurrency=1), threading.Event()
+    with pytest.raises(DeadlineExceeded):
+        scheduler.run(lambda _: hung.wait(10), deadline=0.2)
+
+    # The only worker is still blocked, yet the next request is sent at once
+    assert scheduler.in_flight == 0
+    assert scheduler.run(lambda _: "quick", deadline=0.5) == "quick"
+    assert scheduler.in_flight == 0
+
+    hung.set()  # the blocked call returns late without freeing a slot twice
+    time.sleep(0.05)
+    assert scheduler.in_flight == 0
+    assert scheduler.run(lambda _: "again", deadline=0.5) == "again"
+    scheduler.close()
+
+
+def test_non_retryable_errors_fail_at_once():
+    calls = []
+
+    def bad_request(_):
+        calls.append(1)
+        raise LLMError("bad request", status=400)
+
+    scheduler = _scheduler()
+    with pytest.raises(LLMError):
+        scheduler.run(bad_request)
+    scheduler.close()
+    assert len(calls) == 1
+
+
+def test_token_bucket_and_aimd_limit():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, burst=2.0, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    now[0] = 1.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+    limit = AIMDLimit(4, 1, 8)
+    limit.on_throttle()
+    assert limit.current == 2
+    for _ in range(4):
+        limit.on_success()
+    assert limit.current == 3
+    for _ in range(5):
+        limit.on_throttle()
+    assert limit.current == 1
+
+
+def test_priority_follows_the_worst_finding():
+    def finding(severity):
+        return Finding(agent="static", rule_id="X", message="", severity=severity, filepath="a.py", line=1, col=1)
+
+    assert priority_of([finding("info")], [finding("error")]) == 0
+    assert priority_of([finding("warning")], []) == 1
+    assert priority_of([], []) == 2
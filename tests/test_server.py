@@ -0,0 +1,194 @@
+"""
+Test — Review Server
+--------------------
+Drives the JSON-RPC server over in-memory pipes: diagnostics for open
+and edited buffers, superseded edits, full reviews and cancellation.
+"""
+
+import os
+import queue
+import threading
+import time
+
+from reviewer_core import server as server_module
+from reviewer_core.incremental import IncrementalReview
+from reviewer_core.server import REQUEST_CANCELLED, ReviewServer, read_message, write_message
+
+URI = "file:///tmp/example.py"
+CODE = "import os\n\ndef BadName(x=[]):\n    eval(x)\n"
+
+
+class _Client:
+    """Runs a ReviewServer on a thread and collects what it sends."""
+
+    def __init__(self, **options):
+        in_r, self._in_w = os.pipe()
+        out_r, out_w = os.pipe()
+        self._writer = os.fdopen(self._in_w, "wb")
+        self._reader = os.fdopen(out_r, "rb")
+        self.server = ReviewServer(os.fdopen(in_r, "rb"), os.fdopen(out_w, "wb"), **options)
+        self.messages = queue.Queue()
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        threading.Thread(target=self._collect, daemon=True).start()
+
+    def _collect(self):
+        while True:
+            message = read_message(self._reader)
+            if message is None:
+                return
+            self.messages.put(message)
+
+    def send(self, method, params=None, id=None):
+        message = {"jsonrpc": "2.0", "method": method, "params": params or {}}
+        if id is not None:
+            message["id"] = id
+        write_message(self._writer, message)
+
+    def wait_for(self, predicate, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            message = self.messages.get(timeout=max(0.0, deadline - time.monotonic()))
+            if predicate(message):
+                return message
+
+    def close(self):
+        self.send("shutdown", id="bye")
+        self.wait_for(lambda m: m.get("id") == "bye")
+        self.send("exit")
+        self._thread.join(timeout=10)
+
+
+def _diagnostics(version=None):
+    def predicate(message):
+        return message.get("method") == "textDocument/publishDiagnostics" and (
+            version is None or message["params"].get("version") == version
+        )
+    return predicate
+
+
+def test_initialize_and_open_publishes_diagnostics():
+    client = _Client(debounce=0)
+    client.send("initialize", {"capabilities": {}}, id=1)
+    reply = client.wait_for(lambda m: m.get("id") == 1)
+    assert reply["result"]["capabilities"]["textDocumentSync"]["change"] == 2
+
+    client.send("textDocument/didOpen", {"textDocument": {"uri": URI, "version": 1, "text": CODE}})
+    published = client.wait_for(_diagnostics(1))["params"]["diagnostics"]
+
+    codes = {d["code"] for d in published}
+    assert {"S101", "S104"} <= codes
+    naming = next(d for d in published if d["code"] == "S101")
+    assert naming["range"]["start"]["line"] == 2
+    client.close()
+
+
+def test_buffers_are_reviewed_without_tree_sitter(monkeypatch):
+    from reviewer_core.parsing import ts_loader
+
+    monkeypatch.setattr(ts_loader, "_language", ts_loader.TreeSitterUnavailable("no grammar"))
+    monkeypatch.setattr(ts_loader, "_local", threading.local())
+
+    client = _Client(debounce=0)
+    client.send("textDocument/didOpen", {"textDocument": {"uri": URI, "version": 1, "text": CODE}})
+    published = client.wait_for(_diagnostics(1))["params"]["diagnostics"]
+    assert {"S101", "S104"} <= {d["code"] for d in published}
+
+    change = {"range": {"start": {"line": 2, "character": 4}, "end": {"line": 2, "character": 11}}, "text": "good"}
+    client.send("textDocument/didChange", {"textDocument": {"uri": URI, "version": 2}, "contentChanges": [change]})
+    published = client.wait_for(_diagnostics(2))["params"]["diagnostics"]
+    codes = {d["code"] for d in published}
+    assert "S101" not in codes and "S104" in codes
+    client.close()
+
+
+def test_rapid_edits_publish_only_the_latest_state():
+    client = _Client(debounce=0.2)
+    client.send("textDocument/didOpen", {"textDocument": {"uri": URI, "version": 1, "text": CODE}})
+    client.wait_for(_diagnostics(1))
+
+    # Rename the function in quick successive edits
+    text = CODE
+    for version, name in enumerate(["good_name", "good_nam", "good_name"], start=2):
+        start = text.index("def ") + 4
+        end = text.index("(", start)
+        change = {
+            "range": {"start": {"line": 2, "character": 4}, "end": {"line": 2, "character": end - start + 4}},
+            "text": name,
+        }
+        text = text[:start] + name + text[end:]
+        client.send("textDocument/didChange", {
+            "textDocument": {"uri": URI, "version": version}, "contentChanges": [change],
+        })
+
+    published = client.wait_for(_diagnostics())
+    assert published["params"]["version"] == 4  # versions 2 and 3 were superseded
+    expected = IncrementalReview("/tmp/example.py", text).bundle
+    codes = sorted(d["code"] for d in published["params"]["diagnostics"])
+    assert codes == sorted(f.rule_id for f in expected.static_findings + expected.security_findings)
+    assert "S101" not in codes
+    client.close()
+
+
+def test_review_file_returns_the_cli_report_shape():
+    client = _Client(debounce=0)
+    client.send("textDocument/didOpen", {"textDocument": {"uri": URI, "version": 1, "text": CODE}})
+    client.send("review/file", {"textDocument": {"uri": URI}, "llm": False}, id=7)
+    result = client.wait_for(lambda m: m.get("id") == 7)["result"]
+
+    assert result["filepath"] == "/tmp/example.py"
+    assert any(f["rule_id"] == "S101" for f in result["static"])
+    assert result["security"] and result["llm"] == []
+    client.close()
+
+
+def test_cancelled_and_superseded_reviews(monkeypatch):
+    real_run_static = server_module.run_static
+
+    def slow_run_static(filepath, doc):
+        time.sleep(0.3)
+        return real_run_static(filepath, doc)
+
+    monkeypatch.setattr(server_module, "run_static", slow_run_static)
+    client = _Client(debounce=0)
+    client.send("textDocument/didOpen", {"textDocument": {"uri": URI, "version": 1, "text": CODE}})
+
+    client.send("review/file", {"textDocument": {"uri": URI}}, id=1)
+    client.send("$/cancelRequest", {"id": 1})
+    assert client.wait_for(lambda m: m.get("id") == 1)["error"]["code"] == REQUEST_CANCELLED
+
+    client.send("review/file", {"textDocument": {"uri": URI}}, id=2)
+    time.sleep(0.05)
+    client.send("review/file", {"textDocument": {"uri": URI}}, id=3)
+    replies = {}
+    while len(replies) < 2:
+        reply = client.wait_for(lambda m: m.get("id") in (2, 3))
+        replies[reply["id"]] = reply
+    assert replies[2]["error"]["code"] == REQUEST_CANCELLED
+    assert "result" in replies[3]
+    client.close()
+
+
+def test_review_file_streams_events(monkeypatch):
+    def fake_review_code(filepath, code, static_findings, security_findings, on_text=None):
+        on_text("Looks ")
+        on_text("fine")
+        return []
+
+    monkeypatch.setattr(server_module, "review_code", fake_review_code)
+    client = _Client(debounce=0)
+    client.send("textDocument/didOpen", {"textDocument": {"uri": URI, "version": 1, "text": CODE}})
+    client.send("review/file", {"textDocument": {"uri": URI}, "llm": True, "stream": "s1"}, id=9)
+
+    events = []
+    while True:
+        message = client.wait_for(lambda m: m.get("id") == 9 or m.get("method") == "review/event")
+        if message.get("id") == 9:
+            break
+        assert message["params"]["stream"] == "s1"
+        events.append(message["params"]["event"])
+
+    agents = [e["agent"] for e in events if e["event"] == "finding"]
+    assert "static" in agents and "security" in agents
+    assert [e["text"] for e in events if e["event"] == "llm_text"] == ["Looks ", "fine"]
+    client.close()
@@ -0,0 +1,64 @@
+"""
+Test — Source Utilities
+-----------------------
+Verifies that the shared LineIndex maps offsets to the same
+(line, col) pairs and line text that the agents used to derive
+with splitlines() / count() / rfind().
+"""
+
+import ast
+
+from reviewer_core.source import LineIndex, SourceDocument
+from reviewer_core.security.patterns import regex_scan
+from reviewer_core.security.runner import run_security
+from reviewer_core.static_analysis.runner import run_static
+
+
+def test_line_index_matches_splitlines():
+    code = "import os\r\n\nx = eval('1')\n    os.system('ls')\n"
+    index = LineIndex(code)
+    lines = code.splitlines()
+    assert len(index) == len(lines)
+    for i, text in enumerate(lines, start=1):
+        assert index.line_text(i) == text
+    assert index.line_text(len(lines) + 1) == ""
+
+
+def test_line_index_positions():
+    code = "a = 1\nb = eval(a)\n"
+    index = LineIndex(code)
+    offset = code.index("eval")
+    line = code.count("\n", 0, offset) + 1
+    col = offset - (code.rfind("\n", 0, offset) + 1) + 1
+    assert index.position(offset) == (line, col) == (2, 5)
+
+
+def test_regex_scan_lines_and_snippets():
+    code = "x = 1\n\neval('a')  # first\nos.system('ls')"
+    findings = {f.rule_id: f for f in regex_scan("t.py", code)}
+    assert (findings["SEC001"].line, findings["SEC001"].col) == (3, 1)
+    assert findings["SEC001"].code_snippet == "eval('a')  # first"
+    assert findings["SEC003"].line == 4
+    assert findings["SEC003"].code_snippet == "os.system('ls')"
+
+
+def test_source_document_parses_once(monkeypatch):
+    calls = []
+    real_parse = ast.parse
+    monkeypatch.setattr(ast, "parse", lambda *a, **kw: calls.append(1) or real_parse(*a, **kw))
+
+    code = "import os\ndef BadName(x=[]):\n    os.system(input())\n"
+    doc = SourceDocument("doc.py", code)
+    static = run_static("doc.py", doc)
+    security = run_security("doc.py", doc)
+
+    assert len(calls) == 1
+    assert doc.lines == code.splitlines()
+    assert [f.rule_id for f in static] == [f.rule_id for f in run_static("doc.py", code)]
+    assert [f.rule_id for f in security] == [f.rule_id for f in run_security("doc.py", code)]
+
+
+def test_source_document_caches_parse_failures():
+    doc = SourceDocument("broken.py", "def broken(:\n")
+    assert doc.ast_tree is None
+    assert run_static("broken.py", doc) is not None
@@ -5,11 +5,26 @@ Verifies that the static analysis agent correctly detects
 style and complexity issues in Python code.
 """
 
+import ast
+import tokenize
+from pathlib import Path
+
+import pytest
+
+from reviewer_core.static_analysis import metrics, registry, symbols
 from reviewer_core.static_analysis.runner import run_static
+from reviewer_core.static_analysis.style_rules import (
+    check_bare_except,
+    check_function_names,
+    check_line_length,
+    check_mutable_defaults,
+    check_unused_imports,
+    run_style_rules,
+)
 
 
 def test_line_length():
-    code = 'x = "a" * 120\n'
+    code = 'x = "' + "a" * 120 + '"\n'
     findings = run_static("test_line_length.py", code)
     assert any(f.rule_id == "S100" for f in findings), "Should flag long lines"
 
@@ -36,3 +51,201 @@ def test_function_length_and_complexity():
     code = "def big():\n" + "    pass\n" * 70
     findings = run_static("test_function_length.py", code)
     assert any(f.rule_id == "C201" for f in findings), "Should flag long function"
+
+
+def test_style_rules_share_one_pass():
+    code = "import os\nimport sys\n\ndef BadName(x=[]):\n    try:\n        return sys.argv\n    except:\n        pass\n"
+    combined = run_style_rules("one_pass.py", code)
+    separate = [
+        f
+        for check in (check_line_length, check_function_names, check_mutable_defaults,
+                      check_bare_except, check_unused_imports)
+        for f in check("one_pass.py", code)
+    ]
+    assert sorted(combined, key=lambda f: (f.line, f.rule_id)) == sorted(separate, key=lambda f: (f.line, f.rule_id))
+    assert {f.rule_id for f in combined} == {"S101", "S104", "S105", "S106"}
+
+
+def test_registered_rules_plug_into_the_same_walk(monkeypatch):
+    walks = []
+    real_walk = ast.walk
+    monkeypatch.setattr(registry.ast, "walk", lambda tree: walks.append(1) or real_walk(tree))
+    monkeypatch.setattr(registry, "RULES", dict(registry.RULES))
+
+    @registry.register("X900", "no_print", nodes=[ast.Call])
+    def no_print(ctx, node):
+        if isinstance(node.func, ast.Name) and node.func.id == "print":
+            ctx.report("X900", "print() call", node.lineno, node.col_offset + 1)
+
+    @registry.register("X901", "no_globals", nodes=[ast.Global])
+    def no_globals(ctx, node):
+        ctx.report("X901", "global statement", node.lineno)
+
+    @registry.register("X902", "todo", tokens=[tokenize.COMMENT])
+    def todo(ctx, token):
+        if "TODO" in token.string:
+            ctx.report("X902", "TODO comment", token.start[0], token.start[1] + 1, severity="info")
+
+    code = "def f():\n    global g\n    print(g)  # TODO\n"
+    findings = run_static("plugins.py", code)
+    assert [(f.rule_id, f.line) for f in findings if f.rule_id.startswith("X")] == [
+        ("X901", 2), ("X900", 3), ("X902", 3)
+    ]
+    assert len(walks) == 1  # both node rules, one tree walk
+    with pytest.raises(ValueError):
+        registry.register("X903", "both", lines=True, nodes=[ast.Call])
+
+
+METRICS_CODE = '''
+class Service:
+    async def fetch(self, a, b, *args, key=None, **kwargs):
+        if a:
+            for x in b:
+                if x and key:
+                    return x
+        elif b:
+            return b
+        return None
+
+    def helper(self):
+        def inner(y):
+            return [z for z in y if z]
+        return inner
+
+
+def after():
+    pass
+'''
+
+
+def test_function_metrics_cover_methods_async_and_closures():
+    metrics.clear_memo()
+    found = {m.qualname: m for m in metrics.function_metrics("metrics.py", METRICS_CODE)}
+
+    assert list(found) == ["Service.fetch", "Service.helper", "Service.helper.inner", "after"]
+    fetch = found["Service.fetch"]
+    assert (fetch.line, fetch.end_line, fetch.length) == (3, 10, 8)
+    assert (fetch.complexity, fetch.depth, fetch.params) == (6, 3, 6)
+    assert found["Service.helper"].complexity == 1  # the closure is measured on its own
+    assert found["Service.helper.inner"].complexity == 3
+
+
+def test_function_metrics_are_memoized_by_body(monkeypatch):
+    metrics.clear_memo()
+    metrics.function_metrics("a.py", METRICS_CODE)
+
+    counted = []
+    real = metrics._decisions
+    monkeypatch.setattr(metrics, "_decisions", lambda node: counted.append(node) or real(node))
+    moved = "\n\nimport os\n" + METRICS_CODE + "\ndef added(x):\n    return x or 1\n"
+    found = {m.qualname: m for m in metrics.function_metrics("a.py", moved)}
+
+    assert found["Service.fetch"].line == 6 and found["added"].complexity == 2
+    added = moved.splitlines().index("def added(x):") + 1
+    lines = {node.lineno for node in counted if hasattr(node, "lineno")}
+    assert lines and min(lines) > added  # only the new function was measured
+
+
+def test_function_length_uses_real_end_lines():
+    code = "async def long_one():\n" + "    x = 1\n" * 70 + "\n" * 30 + "def short():\n    pass\n"
+    findings = run_static("lengths.py", code)
+    assert [(f.rule_id, f.line) for f in findings if f.rule_id == "C201"] == [("C201", 1)]
+    assert "71 lines" in next(f.message for f in findings if f.rule_id == "C201")
+
+
+def test_nesting_and_parameter_checks():
+    nested = "def deep(a, b, c, d, e, f, g, h):\n"
+    for level in range(7):
+        nested += "    " * (level + 1) + f"if a > {level}:\n"
+    nested += "    " * 8 + "return a\n"
+    rules = {f.rule_id for f in run_static("deep.py", nested)}
+    assert {"C202", "C203"} <= rules
+
+
+def test_complexity_matches_radon():
+    radon = pytest.importorskip("radon.complexity")
+    import reviewer_core.static_analysis.runner as runner_module
+
+    code = Path(runner_module.__file__).parent.parent.joinpath("security", "taint.py").read_text()
+    theirs = {(b.lineno, b.name): b.complexity for b in radon.cc_visit(code) if b.letter in ("F", "M")}
+    ours = {(m.line, m.name): m.complexity for m in metrics.function_metrics("taint.py", code)}
+    assert theirs and all(ours[key] == value for key, value in theirs.items())
+
+
+SYMBOLS_CODE = '''
+import os.path
+import json as js
+import numpy as np
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING
+from .api import exported, helper as helper
+from legacy import *
+
+__all__ = ["exported"]
+
+if TYPE_CHECKING:
+    from decimal import Decimal
+
+
+class Config:
+    limit = 10
+
+    def check(self, value: "Decimal") -> bool:
+        return value < limit
+
+
+def load(path, list=None):
+    import simplejson as js
+    result = np.zeros(3)
+    unused = os.path.join(path, "x")
+    try:
+        total = sum(x for x in result)
+    except ValueError as error:
+        return None
+    return total
+'''
+
+
+def _symbol_findings(code):
+    return {(f.rule_id, f.line, f.message.split("'")[1]) for f in run_style_rules("symbols.py", code)
+            if f.rule_id in ("S106", "S107", "S108", "S109")}
+
+
+def test_symbol_rules_answer_from_the_symbol_table():
+    findings = _symbol_findings(SYMBOLS_CODE)
+    assert {(rule, name) for rule, _, name in findings} == {
+        ("S106", "OrderedDict"), ("S106", "deque"),  # `from` imports, `__all__` and re-exports understood
+        ("S106", "js"),                              # the module import and the one in load()
+        ("S108", "list"), ("S108", "js"),            # a builtin and a module import hidden by locals
+        ("S109", "unused"), ("S109", "error"),
+    }
+    assert ("S106", 3, "js") in findings and ("S106", 24, "js") in findings
+
+    # Without the `*` import, names the class body binds are not visible in methods
+    strict = _symbol_findings(SYMBOLS_CODE.replace("from legacy import *\n", ""))
+    assert ("S107", 19, "limit") in strict
+
+
+def test_symbol_table_scoping():
+    code = (
+        "counter = 0\n"
+        "def bump():\n"
+        "    global counter\n"
+        "    counter += 1\n"
+        "def outer():\n"
+        "    seen = []\n"
+        "    def inner(item):\n"
+        "        nonlocal seen\n"
+        "        seen = seen + [item]\n"
+        "    return inner, [y for y in range(3) if y], (z := 1) and z, undefined_name\n"
+    )
+    findings = _symbol_findings(code)
+    assert findings == {("S107", 10, "undefined_name")}
+
+
+def test_symbol_table_joins_units_like_a_whole_file():
+    tree = ast.parse(SYMBOLS_CODE)
+    whole = symbols.SymbolTable.of_module(tree)
+    units = symbols.SymbolTable([(0, symbols.UnitSymbols.build([node])) for node in tree.body])
+    for question in ("unused_imports", "undefined_names", "shadowed_names", "unused_variables"):
+        assert sorted(map(repr, getattr(whole, question)())) == sorted(map(repr, getattr(units, question)()))
@@ -1,17 +1,116 @@
 /**
  * Multi-Agent Code Review Extension
  * ---------------------------------
- * This file defines the VS Code command that runs your Python
- * review orchestrator and displays results in a webview panel.
+ * This file starts the Python review server once (`cli.main serve`,
+ * a language server over stdio) and keeps it running. It runs in the
+ * workspace folder, or in the reviewed file's folder when none is open.
+ * The server publishes diagnostics while you type, and the review
+ * command asks it for a full review, which is shown in a webview panel.
+ * Findings and the Gemini text are shown as they stream in.
  */
 
 import * as vscode from "vscode";
-import { execFile } from "child_process";
 import * as path from "path";
+import {
+  LanguageClient,
+  LanguageClientOptions,
+  ServerOptions,
+} from "vscode-languageclient/node";
+
+let client: LanguageClient | undefined;
+let starting: Promise<LanguageClient> | undefined;
+
+// Live results of the reviews in progress, keyed by their stream id
+type LiveReview = {
+  static: any[];
+  security: any[];
+  llm: any[];
+  llmText: string;
+  render: () => void;
+};
+const streams = new Map<string, LiveReview>();
+let nextStream = 0;
+
+/**
+ * Directory the server runs in: the workspace folder, or the file's own
+ * folder when no workspace is open.
+ */
+function reviewRoot(filePath?: string): string | undefined {
+  return (
+    vscode.workspace.workspaceFolders?.[0]?.uri.fsPath ||
+    (filePath ? path.dirname(filePath) : undefined)
+  );
+}
+
+/**
+ * Start the review server once; a failed start is retried on next use.
+ */
+function startClient(root: string): Promise<LanguageClient> {
+  if (!starting) {
+    starting = launchClient(root);
+    starting.catch(() => {
+      starting = undefined;
+      client = undefined;
+    });
+  }
+  return starting;
+}
+
+async function launchClient(root: string): Promise<LanguageClient> {
+  // Determine Python path (from virtualenv)
+  const pythonPath =
+    process.platform === "win32"
+      ? path.join(root, ".venv", "Scripts", "python.exe")
+      : path.join(root, ".venv", "bin", "python");
+
+  // One long-lived server process: agents, caches and parser stay warm
+  const serverOptions: ServerOptions = {
+    command: pythonPath,
+    args: ["-m", "cli.main", "serve"],
+    options: { cwd: root },
+  };
+  const clientOptions: LanguageClientOptions = {
+    documentSelector: [{ scheme: "file", language: "python" }],
+    outputChannelName: "Multi-Agent Code Review",
+  };
+  const started = new LanguageClient(
+    "multiAgentReview",
+    "Multi-Agent Code Review",
+    serverOptions,
+    clientOptions
+  );
+  await started.start();
+
+  // Partial results of `review/file` requests
+  started.onNotification("review/event", ({ stream, event }) => {
+    const live = streams.get(stream);
+    if (!live) {
+      return;
+    }
+    if (event.event === "finding") {
+      (live as any)[event.agent]?.push(event.finding);
+    } else if (event.event === "llm_text") {
+      live.llmText += event.text;
+    }
+    live.render();
+  });
+
+  client = started;
+  return started;
+}
+
+function showStartError(e: any) {
+  vscode.window.showErrorMessage(
+    `Could not start the review server: ${e?.message || String(e)}`
+  );
+}
 
 export function activate(context: vscode.ExtensionContext) {
   console.log("🚀 Multi-Agent Code Review Extension Activated");
 
+  // A new review supersedes the one still running
+  let pending: vscode.CancellationTokenSource | undefined;
+
   const disposable = vscode.commands.registerCommand(
     "review.runFile",
     async () => {
@@ -22,11 +121,14 @@ export function activate(context: vscode.ExtensionContext) {
         );
         return;
       }
-
-      const filePath = editor.document.fileName;
-      const workspace =
-        vscode.workspace.workspaceFolders?.[0]?.uri.fsPath ||
-        path.dirname(filePath);
+      const root = reviewRoot(editor.document.fileName) as string;
+      let server: LanguageClient;
+      try {
+        server = await startClient(root);
+      } catch (e: any) {
+        showStartError(e);
+        return;
+      }
 
       // Create a Webview panel to display results
       const panel = vscode.window.createWebviewPanel(
@@ -38,38 +140,57 @@ export function activate(context: vscode.ExtensionContext) {
 
       panel.webview.html = getInitialHTML();
 
-      // Determine Python path (from virtualenv)
-      const pythonPath =
-        process.platform === "win32"
-          ? path.join(workspace, ".venv", "Scripts", "python.exe")
-          : path.join(workspace, ".venv", "bin", "python");
-
-      const entry = path.join(workspace, "cli", "main.py");
-
-      // Run the CLI script
-      execFile(
-        pythonPath,
-        [entry, "review", filePath],
-        { cwd: workspace },
-        (err, stdout, stderr) => {
-          if (err) {
-            panel.webview.postMessage({
-              html: `<pre style="color:red">${stderr || err.message}</pre>`,
-            });
-            return;
-          }
-
-          try {
-            const data = JSON.parse(stdout);
-            const html = renderResults(data);
-            panel.webview.postMessage({ html });
-          } catch (e: any) {
-            panel.webview.postMessage({
-              html: `<pre style="color:red">Error parsing JSON: ${e.message}</pre>`,
-            });
-          }
+      pending?.cancel();
+      const cancellation = new vscode.CancellationTokenSource();
+      pending = cancellation;
+
+      const stream = String(nextStream++);
+      const live: LiveReview = {
+        static: [],
+        security: [],
+        llm: [],
+        llmText: "",
+        render: () => {
+          const llm = live.llm.length
+            ? live.llm
+            : live.llmText
+            ? [{ severity: "info", rule_id: "LLM000", line: 1, message: live.llmText }]
+            : [];
+          panel.webview.postMessage({
+            html: renderResults({ ...live, llm }),
+          });
+        },
+      };
+      streams.set(stream, live);
+
+      try {
+        const data = await server.sendRequest(
+          "review/file",
+          {
+            textDocument: { uri: editor.document.uri.toString() },
+            llm: true,
+            stream,
+          },
+          cancellation.token
+        );
+        panel.webview.postMessage({ html: renderResults(data) });
+      } catch (e: any) {
+        if (cancellation.token.isCancellationRequested) {
+          panel.webview.postMessage({
+            html: "<i>Superseded by a newer review.</i>",
+          });
+          return;
         }
-      );
+        panel.webview.postMessage({
+          html: `<pre style="color:red">${escapeHtml(e.message || String(e))}</pre>`,
+        });
+      } finally {
+        streams.delete(stream);
+        if (pending === cancellation) {
+          pending = undefined;
+        }
+        cancellation.dispose();
+      }
 
       // Listen for messages (if we add interactivity later)
       panel.webview.onDidReceiveMessage((message) => {
@@ -79,10 +200,17 @@ export function activate(context: vscode.ExtensionContext) {
   );
 
   context.subscriptions.push(disposable);
+
+  // Start right away for live diagnostics; the command starts it otherwise
+  const root = reviewRoot(vscode.window.activeTextEditor?.document.fileName);
+  if (root) {
+    startClient(root).catch(showStartError);
+  }
 }
 
-export function deactivate() {
+export function deactivate(): Thenable<void> | undefined {
   console.log("🛑 Multi-Agent Code Review Extension Deactivated");
+  return client?.stop();
 }
 
 /**
@@ -113,7 +241,7 @@ function getInitialHTML(): string {
 }
 
 /**
- * Render formatted results from the Python CLI JSON output
+ * Render formatted results from the review server (CLI JSON report shape)
  */
 function renderResults(data: any): string {
   const section = (title: string, findings: any[]) => `